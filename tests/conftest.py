@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+CSV_HEADER = "timestamp,user_id,event,feature_id,latency_ms\n"
+
+
+class EventTable:
+    """
+    Seeded synthetic telemetry events (the ingest schema), for tests.
+
+    `make_events(n, seed, ...)` returns a DataFrame with tz-aware UTC timestamps spread
+    uniformly over `days` days from `start`; `csv` writes one as ingest's input and
+    `lines` renders its rows as CSV data lines (no header) for tailing tests.
+    """
+
+    def __call__(
+        self,
+        n: int = 3000,
+        seed: int = 0,
+        start: str = "2025-06-01",
+        days: int = 10,
+        users: int = 150,
+        features: Sequence[str] = ("a", "b", "c"),
+        events: Sequence[str] = ("click",),
+        user_format: str = "u{}",
+    ) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        ts = pd.Timestamp(start, tz="UTC") + pd.to_timedelta(
+            rng.integers(0, days * 86_400, n), unit="s"
+        )
+        return pd.DataFrame(
+            {
+                "timestamp": ts,
+                "user_id": [user_format.format(i) for i in rng.integers(0, users, n)],
+                "event": rng.choice(list(events), n),
+                "feature_id": rng.choice(list(features), n),
+                "latency_ms": rng.integers(5, 200, n),
+            }
+        )
+
+    @staticmethod
+    def csv(df: pd.DataFrame, path: Path) -> Path:
+        timestamps = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        df.assign(timestamp=timestamps).to_csv(path, index=False)
+        return path
+
+    @staticmethod
+    def lines(df: pd.DataFrame) -> list[str]:
+        return [
+            f"{t:%Y-%m-%dT%H:%M:%SZ},{u},{e},{f},{lat}\n"
+            for t, u, e, f, lat in df.itertuples(index=False)
+        ]
+
+
+@pytest.fixture
+def make_events() -> EventTable:
+    return EventTable()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from tlt.cli import cli
+from tlt.ingest import ingest_csv
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture
+def events(make_events):
+    def build(seed: int = 5, n: int = 4000) -> pd.DataFrame:
+        df = make_events(
+            n, seed, start="2025-01-01", days=40, users=250, features=("a", "b", "c", "d")
+        )
+        df = df.astype({"user_id": "string", "feature_id": "string", "latency_ms": "float64"})
+        # Missing latencies and a few (date, feature) groups of one or two events
+        df.loc[df.index % 13 == 0, "latency_ms"] = np.nan
+        df.loc[df.index[:3], "feature_id"] = "rare"
+        return df
+
+    return build
+
+
+def _both(raw: Path, tmp_path: Path, **kwargs) -> tuple[pd.DataFrame, pd.DataFrame]:
+    ref = pd.read_parquet(transform_parquet(raw, tmp_path / "pandas.parquet", **kwargs))
+    got = pd.read_parquet(
+        transform_parquet(raw, tmp_path / "arrow.parquet", engine="arrow", **kwargs)
+    )
+    return ref, got
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(approx=True),
+        dict(latency_sketch=True),
+        dict(approx=True, latency_sketch=True, since="2025-01-15", features=["a", "rare"]),
+    ],
+)
+def test_arrow_engine_matches_pandas(tmp_path: Path, events, kwargs: dict) -> None:
+    raw = tmp_path / "events.parquet"
+    events().to_parquet(raw, index=False)
+
+    ref, got = _both(raw, tmp_path, mau_window="7,30", **kwargs)
+    # Counts, sketches and row order are identical; quantiles up to float rounding
+    pd.testing.assert_frame_equal(got, ref, check_exact=False, rtol=1e-9)
+
+
+def test_arrow_engine_on_ingested_dataset(tmp_path: Path, events, make_events) -> None:
+    csv = make_events.csv(events(seed=8), tmp_path / "events.csv")
+    # Dictionary-encoded string columns across many date=... files
+    raw = ingest_csv(csv, tmp_path / "events", partitioned=True)
+
+    ref, got = _both(raw, tmp_path, mau_window="30", latency_sketch=True)
+    pd.testing.assert_frame_equal(got, ref, check_exact=False, rtol=1e-9)
+
+
+def test_arrow_engine_without_latency(tmp_path: Path, events) -> None:
+    raw = tmp_path / "events.parquet"
+    events().drop(columns="latency_ms").to_parquet(raw, index=False)
+
+    ref, got = _both(raw, tmp_path)
+    pd.testing.assert_frame_equal(got, ref)
+
+
+def test_arrow_engine_rejects_unsupported_modes(tmp_path: Path, events) -> None:
+    raw = tmp_path / "events.parquet"
+    events(n=100).to_parquet(raw, index=False)
+    out = tmp_path / "agg.parquet"
+
+    with pytest.raises(ValueError, match="Unknown engine"):
+        transform_parquet(raw, out, engine="polars")
+    with pytest.raises(ValueError, match="arrow engine"):
+        transform_parquet(raw, out, engine="arrow", workers=2)
+
+
+def test_cli_transform_engine(tmp_path: Path, events) -> None:
+    raw = tmp_path / "events.parquet"
+    events().to_parquet(raw, index=False)
+    out = tmp_path / "agg.parquet"
+
+    args = ["transform", "--in", str(raw), "--out", str(out), "--engine", "arrow"]
+    res = CliRunner().invoke(cli, args)
+    assert res.exit_code == 0, res.output
+    ref = pd.read_parquet(transform_parquet(raw, tmp_path / "ref.parquet"))
+    pd.testing.assert_frame_equal(pd.read_parquet(out), ref, check_exact=False, rtol=1e-9)
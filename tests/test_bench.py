@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt.bench import STAGES, compare_results, parse_size, run_benchmarks
+from tlt.ingest import ingest_csv
+from tlt.synth import FEATURES, generate_events, write_events_csv
+
+
+def test_generator_is_seeded_and_chunking_independent() -> None:
+    a = generate_events(5000, seed=1, chunk_rows=5000)
+    b = generate_events(5000, seed=1, chunk_rows=5000)
+    assert a.equals(b)
+    assert not a.equals(generate_events(5000, seed=2, chunk_rows=5000))
+    assert generate_events(5000, seed=1, chunk_rows=1000).num_rows == 5000
+    assert generate_events(0).num_rows == 0
+
+
+def test_generator_model() -> None:
+    df = generate_events(200_000, n_users=500, days=10, feature_skew=1.2, seed=3).to_pandas()
+    counts = df["feature_id"].value_counts()
+    assert counts.index[0] == FEATURES[0]
+    assert counts.iloc[0] > 2 * counts.iloc[-1]
+    assert df["user_id"].nunique() == 500
+
+    # Same latency model as scripts/add_latency.py: base + |N(0, 10)|
+    means = df.groupby("feature_id", observed=True)["latency_ms"].mean()
+    assert means["menu"] == pytest.approx(30 + 10 * np.sqrt(2 / np.pi) - 0.5, abs=0.5)
+    assert means["matchmake"] == pytest.approx(60 + 10 * np.sqrt(2 / np.pi) - 0.5, abs=0.5)
+    assert means["search"] == pytest.approx(45 + 10 * np.sqrt(2 / np.pi) - 0.5, abs=0.5)
+
+    ts = pd.to_datetime(df["timestamp"], utc=True)
+    assert ts.min() >= pd.Timestamp("2025-01-01", tz="UTC")
+    assert ts.max() < pd.Timestamp("2025-01-11", tz="UTC")
+
+
+def test_csv_is_ingestable(tmp_path: Path) -> None:
+    csv = write_events_csv(tmp_path / "events.csv", 3000, chunk_rows=1000, seed=4)
+    assert csv.read_text(encoding="utf-8").splitlines()[0] == (
+        "timestamp,user_id,event,feature_id,latency_ms"
+    )
+    events = pd.read_parquet(ingest_csv(csv, tmp_path / "events.parquet", ts_format="iso8601z"))
+    assert len(events) == 3000
+
+
+def test_parse_size() -> None:
+    assert [parse_size(s) for s in ("1000", "250k", "1M", "1.5m")] == [
+        1000,
+        250_000,
+        1_000_000,
+        1_500_000,
+    ]
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_run_benchmarks_writes_results(tmp_path: Path) -> None:
+    out = tmp_path / "bench.json"
+    doc = run_benchmarks(["2k"], out_path=out, workdir=tmp_path / "work")
+
+    saved = json.loads(out.read_text(encoding="utf-8"))
+    assert saved["results"] == doc["results"]
+    assert [r["stage"] for r in saved["results"]] == list(STAGES)
+    for r in saved["results"]:
+        assert r["size"] == 2000
+        assert r["wall_s"] > 0
+        assert r["rows_out"] > 0
+    assert saved["environment"]["packages"]["pandas"]
+    assert not (tmp_path / "work" / "2k").exists()
+    assert len(compare_results(doc, saved)) == len(STAGES)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import pyarrow as pa
+import pytest
+
+from tlt.cache import StageCache
+
+REPO = Path(__file__).resolve().parents[1]
+SAMPLE = REPO / "sample" / "events.csv"
+
+
+def _producer(calls: list[Path], payload: bytes = b"out", note=None):
+    def produce(out: Path):
+        calls.append(out)
+        out.write_bytes(payload)
+        return note
+
+    return produce
+
+
+def test_hit_skips_work_and_links_output(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("a\n1\n", encoding="utf-8")
+    cache = StageCache(tmp_path / "cache")
+    calls: list[Path] = []
+
+    note, hit = cache.run("s", [src], {"w": 7}, tmp_path / "a.out", _producer(calls, note={"x": 1}))
+    assert (note, hit) == ({"x": 1}, False)
+    note, hit = cache.run("s", [src], {"w": 7}, tmp_path / "b.out", _producer(calls))
+    assert (note, hit) == ({"x": 1}, True)
+    assert len(calls) == 1
+    assert (tmp_path / "b.out").read_bytes() == b"out"
+    assert (tmp_path / "b.out").stat().st_nlink > 1
+
+    # Different params or input bytes are different keys
+    cache.run("s", [src], {"w": 30}, tmp_path / "c.out", _producer(calls))
+    src.write_text("a\n2\n", encoding="utf-8")
+    cache.run("s", [src], {"w": 7}, tmp_path / "d.out", _producer(calls))
+    assert len(calls) == 3
+
+
+def test_content_hash_ignores_mtime(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("a\n1\n", encoding="utf-8")
+    calls: list[Path] = []
+    for hash_content, expected in ((False, 2), (True, 1)):
+        calls.clear()
+        cache = StageCache(tmp_path / f"cache-{hash_content}", hash_content=hash_content)
+        cache.run("s", [src], {}, tmp_path / "out", _producer(calls))
+        os.utime(src, ns=(1, 1))
+        cache.run("s", [src], {}, tmp_path / "out", _producer(calls))
+        assert len(calls) == expected
+
+
+def test_output_rewritten_in_place_invalidates_entry(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("a\n", encoding="utf-8")
+    cache = StageCache(tmp_path / "cache")
+    calls: list[Path] = []
+    out = tmp_path / "out"
+    cache.run("s", [src], {}, out, _producer(calls))
+    with open(out, "wb") as f:  # same inode as the cached copy
+        f.write(b"tampered!")
+
+    cache.run("s", [src], {}, tmp_path / "again", _producer(calls))
+    assert len(calls) == 2
+    assert (tmp_path / "again").read_bytes() == b"out"
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("a\n", encoding="utf-8")
+    cache = StageCache(tmp_path / "cache", max_bytes=2500)
+    calls: list[Path] = []
+    for i in (1, 2):
+        cache.run("s", [src], {"i": i}, tmp_path / "out", _producer(calls, b"x" * 1000))
+    cache.run("s", [src], {"i": 1}, tmp_path / "out", _producer(calls))  # 1 is now newest
+    cache.run("s", [src], {"i": 3}, tmp_path / "out", _producer(calls, b"x" * 1000))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= 2500
+    cache.run("s", [src], {"i": 1}, tmp_path / "out", _producer(calls))
+    assert len(calls) == 3  # 1 survived, 2 was evicted
+    assert cache.clear() == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_directory_output_overlays_partitions(tmp_path: Path) -> None:
+    src = tmp_path / "in.csv"
+    src.write_text("a\n", encoding="utf-8")
+    out = tmp_path / "events"
+    (out / "date=2025-01-01").mkdir(parents=True)
+    (out / "date=2025-01-02").mkdir()
+    (out / "date=2025-01-02" / "part-0.parquet").write_bytes(b"old")
+
+    def produce(staged: Path) -> None:
+        (staged / "date=2025-01-02").mkdir(parents=True)
+        (staged / "date=2025-01-02" / "part-0.parquet").write_bytes(b"new")
+
+    cache = StageCache(tmp_path / "cache")
+    for _ in range(2):
+        cache.run("ingest", [src], {}, out, produce)
+        assert sorted(p.name for p in out.iterdir()) == ["date=2025-01-01", "date=2025-01-02"]
+        assert (out / "date=2025-01-02" / "part-0.parquet").read_bytes() == b"new"
+
+
+def _tlt(*args: str) -> str:
+    return subprocess.check_output([sys.executable, "-m", "tlt.cli", *args], text=True)
+
+
+def test_cli_stage_cache(tmp_path: Path) -> None:
+    cache = ["--cache-dir", str(tmp_path / "cache")]
+    events, agg = tmp_path / "events.parquet", tmp_path / "agg.parquet"
+    for expected in ("Wrote", "Restored from cache"):
+        assert _tlt("ingest", "-i", str(SAMPLE), "-o", str(events), *cache).startswith(expected)
+        out = _tlt("transform", "--in", str(events), "--out", str(agg), *cache)
+        assert out.startswith(expected)
+    out = _tlt("report", "--in", str(agg), "--out", str(tmp_path / "r"), *cache)
+    assert (tmp_path / "r" / "metrics.txt").exists()
+
+    stats = _tlt("cache", "stats", *cache)
+    assert "Entries: 3" in stats
+    assert "Hits: 2" in stats
+    assert "Removed 3 entries" in _tlt("cache", "clear", *cache)
+
+
+def test_cli_stage_cache_keeps_ipc_outputs(tmp_path: Path) -> None:
+    cache = ["--cache-dir", str(tmp_path / "cache")]
+    parquet, ipc = tmp_path / "events.parquet", tmp_path / "events.arrow"
+    _tlt("ingest", "-i", str(SAMPLE), "-o", str(parquet), *cache)
+    for expected in ("Wrote", "Restored from cache"):
+        # Same input and options as the Parquet entry, but a different format
+        assert _tlt("ingest", "-i", str(SAMPLE), "-o", str(ipc), *cache).startswith(expected)
+        with pa.ipc.open_file(pa.memory_map(str(ipc))) as reader:
+            assert reader.num_record_batches >= 1
+        agg = tmp_path / "agg.arrow"
+        assert _tlt("transform", "--in", str(ipc), "--out", str(agg), *cache).startswith(expected)
+        assert agg.read_bytes()[:6] == b"ARROW1"
+    assert parquet.read_bytes()[:4] == b"PAR1"
+
+
+@pytest.mark.parametrize("sub", ["stats", "clear"])
+def test_cache_commands_stay_light(tmp_path: Path, sub: str) -> None:
+    probe = (
+        "import sys\nfrom tlt.cli import cli\n"
+        f"cli(['cache', {sub!r}, '--cache-dir', {str(tmp_path)!r}], standalone_mode=False)\n"
+        "print('pandas' in sys.modules, 'pyarrow' in sys.modules)"
+    )
+    out = subprocess.check_output([sys.executable, "-c", probe], text=True)
+    assert out.strip().splitlines()[-1] == "False False"
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from tlt.charts import Chart, downsample, render_charts, stored_digest
+from tlt.cli import cli
+from tlt.report import _draw_feature_usage, _draw_trends, _user_trend_chart, make_reports
+from tlt.transform import transform_parquet
+
+FEATURES = tuple(f"f{i}" for i in range(6))
+
+
+def _digests(out: Path) -> dict[str, str | None]:
+    return {p.relative_to(out).as_posix(): stored_digest(p) for p in sorted(out.rglob("*.png"))}
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_keeps_shape(method: str) -> None:
+    rng = np.random.default_rng(0)
+    n = 24 * 365 * 3  # three years of hours
+    x = pd.date_range("2023-01-01", periods=n, freq="h").to_numpy()
+    y = np.cumsum(rng.normal(size=n))
+    y[5_000], y[20_000] = 1e3, -1e3
+
+    idx = downsample(x, y, 500, method)
+    assert len(idx) <= 500
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+    assert {5_000, 20_000} <= set(idx.tolist())  # spikes survive
+    # Short series are left alone
+    assert downsample(x[:100], y[:100], 500, method).tolist() == list(range(100))
+
+
+def test_downsample_validation() -> None:
+    with pytest.raises(ValueError, match="Unknown downsampling"):
+        downsample(np.arange(10), np.arange(10), 5, "every-nth")
+    with pytest.raises(ValueError, match="at least 4"):
+        downsample(np.arange(10), np.arange(10), 3)
+
+
+def test_user_trend_chart_is_bounded() -> None:
+    dates = pd.date_range("2020-01-01", periods=2_000, freq="D", tz="UTC")
+    per_day = pd.DataFrame(
+        {"date": dates, "dau": np.arange(2_000), "mau_30d": np.arange(2_000) * 3}
+    )
+    chart = _user_trend_chart(per_day, 100, "lttb")
+    points = chart.args[0]
+    assert points.groupby("series").size().to_dict() == {"dau": 100, "mau_30d": 100}
+
+
+def test_unchanged_charts_are_not_redrawn(tmp_path: Path) -> None:
+    usage = pd.Series([5, 3, 1], index=["a", "b", "c"], name="events")
+    charts = [Chart("usage.png", _draw_feature_usage, (usage,))]
+
+    assert render_charts(charts, tmp_path) == {"usage.png": "rendered"}
+    mtime = (tmp_path / "usage.png").stat().st_mtime_ns
+    assert render_charts(charts, tmp_path) == {"usage.png": "unchanged"}
+    assert (tmp_path / "usage.png").stat().st_mtime_ns == mtime
+    assert render_charts(charts, tmp_path, reuse=False) == {"usage.png": "rendered"}
+
+    changed = [Chart("usage.png", _draw_feature_usage, (usage.replace(1, 2),))]
+    assert render_charts(changed, tmp_path) == {"usage.png": "rendered"}
+    # A deleted file is drawn again even though its inputs are unchanged
+    (tmp_path / "usage.png").unlink()
+    assert render_charts(changed, tmp_path) == {"usage.png": "rendered"}
+
+
+def test_empty_chart_removes_earlier_file(tmp_path: Path) -> None:
+    points = pd.DataFrame(
+        {
+            "x": pd.date_range("2025-01-01", periods=3, tz="UTC"),
+            "y": [1.0, 2.0, 3.0],
+            "series": "dau",
+            "panel": "users",
+        }
+    )
+    assert render_charts([Chart("trend.png", _draw_trends, (points, "t"))], tmp_path) == {
+        "trend.png": "rendered"
+    }
+    empty = [Chart("trend.png", _draw_trends, (points.iloc[:0], "t"))]
+    for _ in range(2):
+        assert render_charts(empty, tmp_path) == {"trend.png": "empty"}
+        assert not (tmp_path / "trend.png").exists()
+
+
+def test_feature_charts_redraw_only_changed_features(tmp_path: Path, make_events) -> None:
+    raw = tmp_path / "events.parquet"
+    df = make_events(seed=1, features=FEATURES)
+    df.to_parquet(raw, index=False)
+    out = tmp_path / "reports"
+    make_reports(transform_parquet(raw, tmp_path / "agg.parquet"), out, feature_charts=True)
+    before = _digests(out)
+    assert [f"features/f{i}.png" for i in range(6)] == [k for k in before if "/" in k]
+
+    # One more day of events for f2 only
+    extra = make_events(50, seed=2, features=FEATURES).assign(
+        feature_id="f2", timestamp=pd.Timestamp("2025-06-12 10:00", tz="UTC")
+    )
+    pd.concat([df, extra]).to_parquet(raw, index=False)
+    make_reports(transform_parquet(raw, tmp_path / "agg.parquet"), out, feature_charts=True)
+    after = _digests(out)
+    changed = {k for k in before if after[k] != before[k]}
+    assert changed == {
+        "features/f2.png",
+        "feature_usage.png",
+        "latency_by_feature.png",
+        "dau_mau.png",
+        "latency_trend.png",
+    }
+
+
+@pytest.mark.parametrize("latency_source", ["summary", "events"])
+def test_pool_rendering_matches_serial(tmp_path: Path, make_events, latency_source: str) -> None:
+    raw = tmp_path / "events.parquet"
+    make_events(seed=3, features=FEATURES[:3]).to_parquet(raw, index=False)
+    agg = transform_parquet(raw, tmp_path / "agg.parquet")
+    kw = dict(events_path=raw, latency_source=latency_source, feature_charts=True)
+
+    make_reports(agg, tmp_path / "serial", **kw)
+    make_reports(agg, tmp_path / "pool", workers=2, **kw)
+    serial, pool = _digests(tmp_path / "serial"), _digests(tmp_path / "pool")
+    assert serial == pool and len(serial) == 7
+
+
+def test_cli_report_feature_charts(tmp_path: Path, make_events) -> None:
+    raw = tmp_path / "events.parquet"
+    make_events(seed=4, features=FEATURES[:4]).to_parquet(raw, index=False)
+    out = tmp_path / "reports"
+
+    args = ["report", "--in", str(raw), "--out", str(out), "--feature-charts", "--redraw"]
+    res = CliRunner().invoke(cli, args)
+    assert res.exit_code == 0, res.output
+    assert sorted(p.name for p in (out / "features").iterdir()) == [f"f{i}.png" for i in range(4)]
+
+
+def test_cli_report_time_series(tmp_path: Path, make_events) -> None:
+    raw = tmp_path / "events.parquet"
+    make_events(seed=5, features=FEATURES).to_parquet(raw, index=False)
+    agg = transform_parquet(raw, tmp_path / "agg.parquet", mau_window="7,30")
+    out = tmp_path / "reports"
+
+    args = ["report", "--in", str(agg), "--out", str(out), "--max-points", "4"]
+    res = CliRunner().invoke(cli, [*args, "--downsample", "minmax"])
+    assert res.exit_code == 0, res.output
+    assert (out / "dau_mau.png").exists() and (out / "latency_trend.png").exists()
+    before = stored_digest(out / "dau_mau.png")
+    # A different point budget is a different chart
+    res = CliRunner().invoke(cli, [*args[:-1], "6"])
+    assert res.exit_code == 0, res.output
+    assert stored_digest(out / "dau_mau.png") != before
+    res = CliRunner().invoke(cli, [*args[:-1], "3"])
+    assert res.exit_code != 0
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+import pytest
+
+HEAVY = ("pandas", "pyarrow", "matplotlib", "numpy")
+
+# Runs the CLI in-process, then prints which heavy modules it pulled in
+PROBE = """
+import sys
+from tlt.cli import cli
+try:
+    cli(sys.argv[1:], prog_name="tlt")
+except SystemExit:
+    pass
+print("LOADED:" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _loaded(*args: str) -> list[str]:
+    cmd = [sys.executable, "-c", PROBE.format(heavy=HEAVY), *args]
+    out = subprocess.check_output(cmd, text=True)
+    line = [ln for ln in out.splitlines() if ln.startswith("LOADED:")][-1]
+    return [m for m in line.removeprefix("LOADED:").split(",") if m]
+
+
+@pytest.mark.parametrize("args", [["--help"], ["ingest", "--help"], ["report", "--help"]])
+def test_help_does_not_import_heavy_modules(args: list[str]) -> None:
+    assert _loaded(*args) == []
+
+
+def test_size_does_not_import_pandas_or_matplotlib(tmp_path: Path) -> None:
+    (tmp_path / "x.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    (tmp_path / "x.parquet").write_bytes(b"PAR1")
+    loaded = _loaded(
+        "size", "--csv", str(tmp_path / "x.csv"), "--parquet", str(tmp_path / "x.parquet")
+    )
+    assert "pandas" not in loaded
+    assert "matplotlib" not in loaded
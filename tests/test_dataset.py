@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt.dataset import as_utc_timestamps, build_filter, open_dataset, read_frame
+from tlt.ingest import ingest_csv
+from tlt.report import make_reports
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture()
+def events_csv(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(5)
+    n = 4000
+    ts = pd.Timestamp("2025-02-01", tz="UTC") + pd.to_timedelta(
+        rng.integers(0, 40 * 86_400, n), unit="s"
+    )
+    path = tmp_path / "events.csv"
+    pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user_id": [f"u{i}" for i in rng.integers(0, 300, n)],
+            "event": "click",
+            "feature_id": rng.choice(["a", "b", "c"], n),
+            "latency_ms": rng.integers(5, 90, n),
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 500])
+def test_partitioned_ingest_roundtrip(tmp_path: Path, events_csv: Path, chunk_rows) -> None:
+    flat = pd.read_parquet(ingest_csv(events_csv, tmp_path / "flat.parquet"))
+    out = ingest_csv(events_csv, tmp_path / "events", chunk_rows=chunk_rows, partitioned=True)
+
+    days = sorted(p.name for p in out.iterdir())
+    assert len(days) == 40
+    assert days[0] == "date=2025-02-01"
+
+    back = read_frame(out).sort_values("timestamp", kind="stable").reset_index(drop=True)
+    assert (back["timestamp"] == flat["timestamp"]).all()
+    assert (back["date"] == back["timestamp"].dt.floor("D")).all()
+    assert back["user_id"].tolist() == flat["user_id"].tolist()
+
+
+def test_filters_prune_partitions(tmp_path: Path, events_csv: Path) -> None:
+    out = ingest_csv(events_csv, tmp_path / "events", partitioned=True)
+    dataset = open_dataset(out)
+    expr = build_filter(dataset.schema, since="2025-02-10", until="2025-02-16")
+    assert len(list(dataset.get_fragments(filter=expr))) == 7
+
+    week = read_frame(out, since="2025-02-10", until="2025-02-16", features=["a"])
+    assert week["timestamp"].min() >= pd.Timestamp("2025-02-10", tz="UTC")
+    assert week["timestamp"].max() < pd.Timestamp("2025-02-17", tz="UTC")
+    assert set(week["feature_id"]) == {"a"}
+
+
+def test_transform_since_keeps_mau_exact(tmp_path: Path, events_csv: Path) -> None:
+    raw = ingest_csv(events_csv, tmp_path / "events", partitioned=True)
+    full = pd.read_parquet(transform_parquet(raw, tmp_path / "full.parquet", mau_window="7,30"))
+    part = transform_parquet(
+        raw, tmp_path / "agg", mau_window="7,30", since="2025-03-01", partitioned=True
+    )
+    got = read_frame(part).sort_values(["date", "feature_id"]).reset_index(drop=True)
+    want = full[full["date"] >= pd.Timestamp("2025-03-01", tz="UTC")].reset_index(drop=True)
+
+    assert got["date"].min() == pd.Timestamp("2025-03-01", tz="UTC")
+    for col in ("events", "dau", "mau_7d", "mau_30d"):
+        assert got[col].tolist() == want[col].tolist(), col
+
+
+def test_report_on_partitioned_with_filters(tmp_path: Path, events_csv: Path) -> None:
+    raw = ingest_csv(events_csv, tmp_path / "events", partitioned=True)
+    agg = transform_parquet(raw, tmp_path / "agg", partitioned=True)
+    out = make_reports(agg, tmp_path / "reports", since="2025-02-10", until="2025-02-16")
+    assert "Aggregated days: 7" in (out / "metrics.txt").read_text(encoding="utf-8")
+
+
+def test_as_utc_timestamps_skips_parsed_columns() -> None:
+    utc = pd.Series(pd.to_datetime(["2025-01-01T05:00:00Z"], utc=True))
+    assert as_utc_timestamps(utc) is utc
+    local = utc.dt.tz_convert("America/New_York")
+    assert as_utc_timestamps(local).tolist() == utc.tolist()
+    assert as_utc_timestamps(pd.Series(["2025-01-01T05:00:00Z", "x"])).isna().tolist() == [
+        False,
+        True,
+    ]
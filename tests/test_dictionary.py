@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt.dictionary import (
+    decode_users,
+    encode_users,
+    load_user_codes,
+    load_user_dictionary,
+    save_user_dictionary,
+    user_dictionary_path,
+)
+from tlt.ingest import ingest_csv
+from tlt.report import make_reports
+from tlt.transform import transform_parquet
+
+# UUID-like ids: what dictionary encoding saves space on
+EVENTS = dict(
+    n=2000,
+    users=250,
+    user_format="3f2c9a1e-{:04d}",
+    events=("open", "click"),
+    features=("menu", "inventory", "matchmake"),
+)
+
+
+def test_encode_users_keeps_existing_codes(tmp_path: Path) -> None:
+    users = {"a": 0}
+    assert encode_users(pd.Series(["b", "a", "b"], dtype="string"), users).tolist() == [1, 0, 1]
+    assert encode_users(pd.Series(["c", "a"], dtype="string"), users).tolist() == [2, 0]
+    assert users == {"a": 0, "b": 1, "c": 2}
+
+    path = save_user_dictionary(users, tmp_path / "users.parquet")
+    assert decode_users([0, 1, 2], load_user_dictionary(path)).tolist() == ["a", "b", "c"]
+    assert load_user_codes(path) == users
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 300])
+def test_dictionary_ingest_roundtrip(tmp_path: Path, make_events, chunk_rows) -> None:
+    csv = make_events.csv(make_events(seed=1, **EVENTS), tmp_path / "events.csv")
+    plain = pd.read_parquet(ingest_csv(csv, tmp_path / "plain.parquet"))
+    out = ingest_csv(csv, tmp_path / "enc.parquet", chunk_rows=chunk_rows, dictionary=True)
+    enc = pd.read_parquet(out)
+
+    assert enc["user_id"].dtype == np.int64
+    assert isinstance(enc["feature_id"].dtype, pd.CategoricalDtype)
+    assert isinstance(enc["event"].dtype, pd.CategoricalDtype)
+    users = load_user_dictionary(user_dictionary_path(out))
+    assert decode_users(enc["user_id"], users).tolist() == plain["user_id"].tolist()
+    assert enc["feature_id"].astype("string").tolist() == plain["feature_id"].tolist()
+
+
+def test_dictionary_codes_stable_across_ingests(tmp_path: Path, make_events) -> None:
+    events = tmp_path / "events"
+    make_events.csv(make_events(seed=1, **EVENTS), tmp_path / "a.csv")
+    make_events.csv(make_events(seed=2, start="2025-06-11", **EVENTS), tmp_path / "b.csv")
+    ingest_csv(tmp_path / "a.csv", events, partitioned=True, dictionary=True)
+    first = load_user_dictionary(user_dictionary_path(events))
+    ingest_csv(tmp_path / "b.csv", events, partitioned=True, dictionary=True)
+    second = load_user_dictionary(user_dictionary_path(events))
+    assert second[: len(first)].tolist() == first.tolist()
+
+
+def test_transform_on_codes_matches_strings(tmp_path: Path, make_events) -> None:
+    csv = make_events.csv(make_events(seed=3, **EVENTS), tmp_path / "events.csv")
+    plain = ingest_csv(csv, tmp_path / "plain.parquet")
+    enc = ingest_csv(csv, tmp_path / "enc.parquet", dictionary=True)
+
+    a = pd.read_parquet(transform_parquet(plain, tmp_path / "a.parquet", mau_window="7,30"))
+    b = pd.read_parquet(transform_parquet(enc, tmp_path / "b.parquet", mau_window="7,30"))
+    pd.testing.assert_frame_equal(a, b, check_dtype=False)
+
+    make_reports(tmp_path / "b.parquet", tmp_path / "reports", events_path=enc)
+    assert (tmp_path / "reports" / "latency_by_feature.png").exists()
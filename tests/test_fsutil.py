@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from pathlib import Path
+import pytest
+
+from tlt.fsutil import atomic_path, write_atomic
+
+
+def test_atomic_writes_replace_whole_files(tmp_path: Path) -> None:
+    path = write_atomic(tmp_path / "sub" / "state.json", "{}")
+    assert path.read_text(encoding="utf-8") == "{}"
+
+    # A failed write leaves the previous file and no temporary behind
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            tmp.write_text("{partial", encoding="utf-8")
+            raise RuntimeError("writer died")
+    assert path.read_text(encoding="utf-8") == "{}"
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+import tlt.incremental as incremental
+from tlt.dataset import read_frame
+from tlt.ingest import ingest_csv
+from tlt.transform import transform_parquet
+
+
+def _write_days(csv: Path, first_day: str, n_days: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    n = 150 * n_days
+    ts = pd.Timestamp(first_day, tz="UTC") + pd.to_timedelta(
+        rng.integers(0, n_days * 86_400, n), unit="s"
+    )
+    pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user_id": [f"u{i}" for i in rng.integers(0, 120, n)],
+            "event": "click",
+            "feature_id": rng.choice(["a", "b", "c"], n),
+            "latency_ms": rng.integers(5, 90, n),
+        }
+    ).to_csv(csv, index=False)
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values(["date", "feature_id"]).reset_index(drop=True)
+    return df[sorted(df.columns)]
+
+
+@pytest.mark.parametrize("approx", [False, True])
+@pytest.mark.parametrize("partitioned", [False, True])
+def test_incremental_matches_full(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, approx: bool, partitioned: bool
+) -> None:
+    events = tmp_path / "events"
+    _write_days(tmp_path / "a.csv", "2025-04-01", 20, seed=1)
+    ingest_csv(tmp_path / "a.csv", events, partitioned=True)
+
+    out = tmp_path / ("agg" if partitioned else "agg.parquet")
+    kwargs = dict(mau_window="3,7", approx=approx, partitioned=partitioned)
+    transform_parquet(events, out, incremental=True, **kwargs)
+    assert (incremental.state_dir_for(out) / incremental.MANIFEST).exists()
+
+    # New day appended + one historical day rewritten
+    _write_days(tmp_path / "b.csv", "2025-04-21", 1, seed=2)
+    ingest_csv(tmp_path / "b.csv", events, partitioned=True)
+    _write_days(tmp_path / "c.csv", "2025-04-10", 1, seed=3)
+    ingest_csv(tmp_path / "c.csv", events, partitioned=True)
+
+    loaded_days = []
+    real_load = incremental._load_events
+
+    def spy(in_path, **kw):
+        loaded_days.append(kw.get("days"))
+        return real_load(in_path, **kw)
+
+    state_days = []
+    real_read = incremental.read_frame
+
+    def read_spy(path, **kw):
+        frame = real_read(path, **kw)
+        if Path(path).name == incremental.ACTIVITY:
+            state_days.extend(frame["date"].drop_duplicates())
+        return frame
+
+    monkeypatch.setattr(incremental, "_load_events", spy)
+    monkeypatch.setattr(incremental, "read_frame", read_spy)
+    transform_parquet(events, out, incremental=True, **kwargs)
+    assert loaded_days == [["2025-04-10", "2025-04-21"]]
+    if not approx:
+        # Activity state is read back only from the 7-day lookback of the first changed day
+        assert min(state_days) == pd.Timestamp("2025-04-04", tz="UTC")
+        store = incremental.state_dir_for(out) / incremental.ACTIVITY
+        assert len(list(store.glob("date=*"))) == 21
+
+    full = transform_parquet(events, tmp_path / "full.parquet", mau_window="3,7", approx=approx)
+    pd.testing.assert_frame_equal(
+        _sorted(read_frame(out)), _sorted(pd.read_parquet(full)), check_dtype=False
+    )
+
+    # Nothing changed: no events are read at all
+    loaded_days.clear()
+    transform_parquet(events, out, incremental=True, **kwargs)
+    assert loaded_days == []
+
+
+def test_incremental_params_change_forces_full_run(tmp_path: Path) -> None:
+    events = tmp_path / "events"
+    _write_days(tmp_path / "a.csv", "2025-04-01", 5, seed=1)
+    ingest_csv(tmp_path / "a.csv", events, partitioned=True)
+    out = tmp_path / "agg.parquet"
+
+    transform_parquet(events, out, mau_window=7, incremental=True)
+    agg = pd.read_parquet(transform_parquet(events, out, mau_window="7,28", incremental=True))
+    assert {"mau_7d", "mau_28d"}.issubset(agg.columns)
+
+
+def test_incremental_rejects_filters(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        transform_parquet(tmp_path, tmp_path / "agg.parquet", incremental=True, since="2025-01-01")
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt.dataset import read_frame
+from tlt.dictionary import decode_users, load_user_dictionary, user_dictionary_path
+from tlt.ingest import ingest_csv, ingest_files
+
+
+def _hourly_files(root: Path, n_files: int = 6, seed: int = 11) -> pd.DataFrame:
+    """Write one CSV per hour (spread over two days) and return all rows."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for h in range(n_files):
+        n = 300
+        start = pd.Timestamp("2025-05-01", tz="UTC") + pd.Timedelta(hours=8 * h)
+        # Collectors overlap a little, so files are not simply concatenable
+        ts = start + pd.to_timedelta(rng.integers(0, 9 * 3600, n), unit="s")
+        df = pd.DataFrame(
+            {
+                "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "user_id": [f"u{i}" for i in rng.integers(0, 80, n)],
+                "event": "click",
+                "feature_id": rng.choice(["a", "b"], n),
+                "latency_ms": rng.integers(5, 90, n),
+            }
+        )
+        path = root / f"day{h // 3}" / f"events-{h:02d}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, index=False)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 100])
+def test_directory_ingest_matches_single_file(tmp_path: Path, chunk_rows) -> None:
+    rows = _hourly_files(tmp_path / "logs")
+    rows.to_csv(tmp_path / "all.csv", index=False)
+    want = pd.read_parquet(ingest_csv(tmp_path / "all.csv", tmp_path / "want.parquet"))
+
+    out, failures = ingest_files(
+        tmp_path / "logs", tmp_path / "got.parquet", chunk_rows=chunk_rows, workers=2
+    )
+    got = pd.read_parquet(out)
+
+    assert failures == {}
+    assert got["timestamp"].is_monotonic_increasing
+    for col in ("timestamp", "user_id", "feature_id", "latency_ms"):
+        assert got[col].tolist() == want[col].tolist(), col
+    assert not any(p.name.startswith("tlt-ingest-") for p in tmp_path.iterdir())
+
+
+def test_bad_file_is_reported_not_fatal(tmp_path: Path) -> None:
+    rows = _hourly_files(tmp_path / "logs")
+    bad = tmp_path / "logs" / "day0" / "events-99.csv"
+    bad.write_text("timestamp,user_id,event,feature_id\nnot-a-time,u1,click,a\n", encoding="utf-8")
+
+    out, failures = ingest_files(
+        [str(tmp_path / "logs" / "day0" / "*.csv"), tmp_path / "logs" / "day1"],
+        tmp_path / "events",
+        partitioned=True,
+        workers=1,
+    )
+    assert list(failures) == [str(bad)]
+    assert "timestamps could not be parsed" in failures[str(bad)]
+    assert len(read_frame(out)) == len(rows)
+
+
+def test_all_files_failing_raises(tmp_path: Path) -> None:
+    bad = tmp_path / "bad.csv"
+    bad.write_text("timestamp,user_id\n2025-01-01T00:00:00Z,u1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="bad.csv"):
+        ingest_files([bad], tmp_path / "out.parquet", workers=1)
+    with pytest.raises(ValueError, match="Input not found"):
+        ingest_files([tmp_path / "missing.csv"], tmp_path / "out.parquet")
+
+
+def test_multi_file_dictionary_partitioned(tmp_path: Path) -> None:
+    rows = _hourly_files(tmp_path / "logs")
+    out, _ = ingest_files(tmp_path / "logs", tmp_path / "events", partitioned=True, dictionary=True)
+    enc = read_frame(out).sort_values("timestamp", kind="stable")
+
+    assert enc["user_id"].dtype == np.int64
+    users = load_user_dictionary(user_dictionary_path(out))
+    assert sorted(decode_users(enc["user_id"], users)) == sorted(rows["user_id"])
+
+
+def test_cli_reports_failed_files(tmp_path: Path) -> None:
+    _hourly_files(tmp_path / "logs", n_files=2)
+    bad = tmp_path / "logs" / "broken.csv"
+    bad.write_text("user_id,event\nu1,click\n", encoding="utf-8")
+    out = tmp_path / "events.parquet"
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "tlt.cli", "ingest", "-i", str(tmp_path / "logs"), "-o", str(out)],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode != 0
+    assert "broken.csv" in proc.stderr
+    assert out.exists()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from tlt.ingest import ingest_csv
+
+
+def _write_events(path: Path, n: int = 500) -> None:
+    # Out-of-order timestamps with ties so the external sort has real work to do
+    ts = pd.Timestamp("2025-01-01", tz="UTC") + pd.to_timedelta(
+        [(i * 7919) % 3600 for i in range(n)], unit="s"
+    )
+    pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user_id": [f"u{i % 17}" for i in range(n)],
+            "event": ["click"] * n,
+            "feature_id": [f"f{i % 3}" for i in range(n)],
+            "latency_ms": [i % 90 for i in range(n)],
+        }
+    ).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 64, 10_000])
+def test_streaming_matches_eager(tmp_path: Path, chunk_rows: int) -> None:
+    csv = tmp_path / "events.csv"
+    _write_events(csv)
+
+    eager = pd.read_parquet(ingest_csv(csv, tmp_path / "eager.parquet"))
+    streamed = pd.read_parquet(ingest_csv(csv, tmp_path / "stream.parquet", chunk_rows=chunk_rows))
+
+    assert streamed["timestamp"].is_monotonic_increasing
+    for col in ("timestamp", "user_id", "event", "feature_id", "latency_ms"):
+        assert (eager[col] == streamed[col]).all(), col
+    # No spill files left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "eager.parquet",
+        "events.csv",
+        "stream.parquet",
+    ]
+
+
+@pytest.mark.parametrize("dictionary", [False, True])
+def test_streaming_schema_matches_eager(tmp_path: Path, dictionary: bool) -> None:
+    csv = tmp_path / "events.csv"
+    _write_events(csv)  # integral latencies, no NaNs
+
+    def schema(name: str, **kwargs) -> pa.Schema:
+        out = ingest_csv(csv, tmp_path / name, dictionary=dictionary, **kwargs)
+        return pq.read_schema(out).remove_metadata()
+
+    eager = schema("eager.parquet")
+    assert eager.field("latency_ms").type == pa.float64()
+    assert schema("stream.parquet", chunk_rows=64) == eager
+    assert schema("unsorted.parquet", chunk_rows=64, sort=False) == eager
+
+
+def test_streaming_no_sort_keeps_input_order(tmp_path: Path) -> None:
+    csv = tmp_path / "events.csv"
+    _write_events(csv, n=50)
+    out = pd.read_parquet(ingest_csv(csv, tmp_path / "out.parquet", chunk_rows=8, sort=False))
+    raw = pd.read_csv(csv)
+    assert list(out["user_id"]) == list(raw["user_id"])
+
+
+def test_streaming_reports_total_bad_timestamps(tmp_path: Path) -> None:
+    csv = tmp_path / "bad_ts.csv"
+    csv.write_text(
+        "timestamp,user_id,event,feature_id\n"
+        "nope,u1,click,f1\n"
+        "2025-01-01T00:00:00Z,u1,click,f1\n"
+        "also-nope,u2,click,f1\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.parquet"
+    with pytest.raises(ValueError) as ei:
+        ingest_csv(csv, out, chunk_rows=1)
+    assert "2 timestamps could not be parsed" in str(ei.value)
+    assert not out.exists()
+
+
+def test_streaming_empty_identifier(tmp_path: Path) -> None:
+    csv = tmp_path / "bad_id.csv"
+    csv.write_text(
+        "timestamp,user_id,event,feature_id\n"
+        "2025-01-01T00:00:00Z,u1,click,f1\n"
+        "2025-01-01T00:00:01Z,u1,click,\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError) as ei:
+        ingest_csv(csv, tmp_path / "out.parquet", chunk_rows=1)
+    assert "Column 'feature_id' contains null/empty values" in str(ei.value)
+
+
+def test_streaming_missing_columns(tmp_path: Path) -> None:
+    csv = tmp_path / "bad.csv"
+    csv.write_text("timestamp,user_id,event\n2025-01-01T00:00:00Z,u1,click\n", encoding="utf-8")
+    with pytest.raises(ValueError) as ei:
+        ingest_csv(csv, tmp_path / "out.parquet", chunk_rows=10)
+    assert "Missing required columns" in str(ei.value)
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 64])
+@pytest.mark.parametrize(
+    "ts_format, fmt",
+    [("iso8601z", "%Y-%m-%dT%H:%M:%SZ"), ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S")],
+)
+def test_declared_ts_format_matches_inferred(
+    tmp_path: Path, chunk_rows, ts_format: str, fmt: str
+) -> None:
+    csv = tmp_path / "events.csv"
+    _write_events(csv)
+    inferred = pd.read_parquet(ingest_csv(csv, tmp_path / "inferred.parquet"))
+
+    df = pd.read_csv(csv)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).dt.strftime(fmt)
+    df.to_csv(tmp_path / "fmt.csv", index=False)
+    out = ingest_csv(
+        tmp_path / "fmt.csv", tmp_path / "fmt.parquet", chunk_rows=chunk_rows, ts_format=ts_format
+    )
+    assert pd.read_parquet(out)["timestamp"].tolist() == inferred["timestamp"].tolist()
+
+
+def test_declared_ts_format_rejects_mismatches(tmp_path: Path) -> None:
+    csv = tmp_path / "events.csv"
+    _write_events(csv, n=10)
+    with pytest.raises(ValueError, match="10 timestamps could not be parsed"):
+        ingest_csv(csv, tmp_path / "out.parquet", ts_format="%d/%m/%Y %H:%M")
+    with pytest.raises(ValueError, match="Unknown ts_format"):
+        ingest_csv(csv, tmp_path / "out.parquet", ts_format="iso")
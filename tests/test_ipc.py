@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from click.testing import CliRunner
+
+from tlt.cli import cli
+from tlt.dataset import read_frame, read_table
+from tlt.ingest import ingest_csv
+from tlt.layout import IpcSink, ParquetSink, Sink, WriteOptions, open_sink, write_frame
+from tlt.report import make_reports
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture
+def csv(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(12)
+    n = 5_000
+    ts = pd.Timestamp("2025-04-01", tz="UTC") + pd.to_timedelta(
+        rng.integers(0, 20 * 86_400, n), unit="s"
+    )
+    path = tmp_path / "events.csv"
+    pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user_id": [f"u{i}" for i in rng.integers(0, 400, n)],
+            "event": rng.choice(["click", "view"], n),
+            "feature_id": rng.choice(["menu", "search", "shop", "cart", "help"], n),
+            "latency_ms": rng.integers(5, 300, n),
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(chunk_rows=700),
+        dict(chunk_rows=700, sort=False),
+        dict(dictionary=True),
+        # Per-chunk categories: written as dictionary deltas
+        dict(dictionary=True, chunk_rows=700, sort=False),
+    ],
+)
+@pytest.mark.parametrize("codec", ["auto", "lz4"])
+def test_ipc_ingest_matches_parquet(tmp_path: Path, csv: Path, kwargs: dict, codec: str) -> None:
+    parquet = ingest_csv(csv, tmp_path / "events.parquet", **kwargs)
+    ipc = ingest_csv(
+        csv, tmp_path / "events.arrow", write_options=WriteOptions(codec=codec), **kwargs
+    )
+    with pa.ipc.open_file(ipc) as reader:
+        assert reader.num_record_batches >= 1
+    pd.testing.assert_frame_equal(read_frame(ipc), read_frame(parquet))
+
+
+def test_uncompressed_ipc_reads_are_zero_copy(tmp_path: Path, csv: Path) -> None:
+    ipc = ingest_csv(csv, tmp_path / "events.feather")
+    before = pa.total_allocated_bytes()
+    table = read_table(ipc, columns=["feature_id", "latency_ms"])
+    assert table.num_rows == 5_000
+    assert pa.total_allocated_bytes() == before
+
+    # Filters still apply (in memory) and match the Parquet pushdown
+    parquet = ingest_csv(csv, tmp_path / "events.parquet")
+    kw = dict(since="2025-04-05", until="2025-04-09", features=["menu", "shop"])
+    assert read_table(ipc, **kw).equals(read_table(parquet, **kw))
+
+
+def test_transform_and_report_from_ipc(tmp_path: Path, csv: Path) -> None:
+    parquet = ingest_csv(csv, tmp_path / "events.parquet")
+    ipc = ingest_csv(csv, tmp_path / "events.arrow")
+    want = transform_parquet(parquet, tmp_path / "agg.parquet", latency_sketch=True)
+    for engine in ("pandas", "arrow"):
+        got = transform_parquet(
+            ipc, tmp_path / f"agg-{engine}.arrow", latency_sketch=True, engine=engine
+        )
+        pd.testing.assert_frame_equal(read_frame(got), read_frame(want))
+
+    out = make_reports(
+        tmp_path / "agg-pandas.arrow",
+        tmp_path / "reports",
+        events_path=ipc,
+        latency_source="events",
+    )
+    assert (out / "latency_by_feature.png").exists()
+
+
+def test_open_sink_by_extension(tmp_path: Path) -> None:
+    table = pa.table({"x": [1, 2, 3]})
+    for name, kind in (("x.parquet", ParquetSink), ("x.arrow", IpcSink)):
+        with open_sink(tmp_path / name, table.schema, row_group_rows=2) as sink:
+            assert type(sink) is kind
+            sink.write(table)
+        assert read_table(tmp_path / name).equals(table)
+    with pytest.raises(TypeError, match="abstract"):
+        Sink(tmp_path / "x.bin", table.schema)
+
+
+def test_ipc_rejects_parquet_only_codecs(tmp_path: Path) -> None:
+    df = pd.DataFrame({"x": [1, 2, 3]})
+    with pytest.raises(ValueError, match="Arrow IPC files support codecs"):
+        write_frame(df, tmp_path / "x.arrow", WriteOptions(codec="snappy"))
+
+
+def test_cli_size_compares_ipc(tmp_path: Path, csv: Path) -> None:
+    parquet, ipc = tmp_path / "events.parquet", tmp_path / "events.arrow"
+    for out in (parquet, ipc):
+        res = CliRunner().invoke(cli, ["ingest", "-i", str(csv), "--out", str(out)])
+        assert res.exit_code == 0, res.output
+
+    args = ["size", "--csv", str(csv), "--parquet", str(parquet), "--ipc", str(ipc)]
+    res = CliRunner().invoke(cli, args)
+    assert res.exit_code == 0, res.output
+    assert "IPC/Parquet ratio" in res.output
+    # Uncompressed IPC trades size for zero-copy reads
+    assert ipc.stat().st_size > parquet.stat().st_size
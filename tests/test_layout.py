@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from tlt.ingest import ingest_csv, ingest_files
+from tlt import layout
+from tlt.layout import WriteOptions
+from tlt.size import bench_codecs, format_codec_bench
+from tlt.synth import write_events_csv
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture()
+def csv_path(tmp_path: Path) -> Path:
+    return write_events_csv(tmp_path / "events.csv", 4000, n_users=300, days=3, seed=5)
+
+
+def _column_meta(path: Path, name: str, group: int = 0):
+    md = pq.ParquetFile(path).metadata
+    return md.row_group(group).column(md.schema.to_arrow_schema().get_field_index(name))
+
+
+def test_options_validation() -> None:
+    assert WriteOptions(sort_by="feature_id, timestamp").sort_by == ("feature_id", "timestamp")
+    assert WriteOptions(codec="none").compression is None
+    assert WriteOptions().params()["codec"] in ("zstd", "snappy", "none")
+    with pytest.raises(ValueError, match="Unknown codec"):
+        WriteOptions(codec="zip")
+    with pytest.raises(ValueError, match="compression levels"):
+        WriteOptions(codec="snappy", level=3)
+    with pytest.raises(ValueError):
+        WriteOptions(row_group_rows=0)
+
+
+def test_bloom_filter_keyword_only_when_requested(monkeypatch) -> None:
+    schema = pa.schema([("user_id", pa.string()), ("feature_id", pa.string())])
+    assert "bloom_filter_options" not in WriteOptions().parquet_kwargs(schema)
+    assert "bloom_filter_options" not in WriteOptions(bloom_filter="missing").parquet_kwargs(schema)
+    got = WriteOptions(bloom_filter="user_id").parquet_kwargs(schema)["bloom_filter_options"]
+    assert list(got) == ["user_id"]
+
+
+def test_bloom_filter_needs_support(tmp_path: Path, csv_path: Path, monkeypatch) -> None:
+    events = ingest_csv(csv_path, tmp_path / "events.parquet")
+    # A pyarrow without bloom filter writes: a clear error, and the benchmark skips them
+    monkeypatch.setattr(layout, "bloom_filters_supported", lambda: False)
+    with pytest.raises(ValueError, match="--bloom-filter requires"):
+        WriteOptions(bloom_filter="user_id")
+    configs = {
+        "zstd": {"codec": "zstd"},
+        "zstd+bloom": {"codec": "zstd", "bloom_filter": "user_id"},
+    }
+    results = bench_codecs(events, sample_rows=1000, configs=configs, repeat=1)
+    assert [r["config"] for r in results] == ["zstd"]
+
+
+@pytest.mark.parametrize("chunk_rows", [None, 1000])
+def test_ingest_layout(tmp_path: Path, csv_path: Path, chunk_rows) -> None:
+    plain = pd.read_parquet(ingest_csv(csv_path, tmp_path / "plain.parquet"))
+    options = WriteOptions(
+        codec="gzip",
+        row_group_rows=500,
+        page_index=True,
+        sort_by=("feature_id", "timestamp"),
+        bloom_filter=("user_id",),
+    )
+    out = ingest_csv(
+        csv_path, tmp_path / "laid.parquet", chunk_rows=chunk_rows, write_options=options
+    )
+
+    pf = pq.ParquetFile(out)
+    assert pf.metadata.num_row_groups >= len(plain) // 500
+    user = _column_meta(out, "user_id")
+    assert user.compression == "GZIP"
+    assert user.to_dict()["bloom_filter_length"] > 0
+    rg = pf.metadata.row_group(0)
+    assert [c.column_index for c in rg.sorting_columns] == [
+        pf.schema_arrow.get_field_index("feature_id"),
+        pf.schema_arrow.get_field_index("timestamp"),
+    ]
+    for i in range(pf.metadata.num_row_groups):
+        group = pf.read_row_group(i, columns=["feature_id", "timestamp"]).to_pandas()
+        assert group.equals(group.sort_values(["feature_id", "timestamp"]).reset_index(drop=True))
+
+    # Same rows, only the layout differs
+    got = pd.read_parquet(out).sort_values(["timestamp", "user_id", "latency_ms"])
+    want = plain.sort_values(["timestamp", "user_id", "latency_ms"])
+    pd.testing.assert_frame_equal(
+        got.reset_index(drop=True), want.reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_multi_file_and_transform_layout(tmp_path: Path, csv_path: Path) -> None:
+    out, _ = ingest_files(
+        [csv_path],
+        tmp_path / "events",
+        partitioned=True,
+        workers=1,
+        write_options=WriteOptions(codec="snappy", statistics=False),
+    )
+    part = next(out.rglob("*.parquet"))
+    assert _column_meta(part, "user_id").compression == "SNAPPY"
+    assert not _column_meta(part, "user_id").is_stats_set
+
+    options = WriteOptions(codec="none", sort_by="feature_id")
+    agg = transform_parquet(out, tmp_path / "agg.parquet", write_options=options)
+    assert _column_meta(agg, "events").compression == "UNCOMPRESSED"
+    assert pd.read_parquet(agg)["feature_id"].is_monotonic_increasing
+
+
+def test_bench_codecs(tmp_path: Path, csv_path: Path) -> None:
+    events = ingest_csv(csv_path, tmp_path / "events.parquet")
+    configs = {"none": {"codec": "none"}, "zstd+sorted": {"codec": "zstd", "sort_by": "feature_id"}}
+    results = bench_codecs(events, sample_rows=1000, configs=configs, repeat=1)
+    assert [r["config"] for r in results] == ["none", "zstd+sorted"]
+    assert all(r["rows"] == 1000 and r["bytes"] > 0 and r["filter_read_s"] for r in results)
+    assert results[1]["bytes"] < results[0]["bytes"]
+    assert "zstd+sorted" in format_codec_bench(results)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import pstats
+import re
+from pathlib import Path
+import subprocess
+import sys
+import pytest
+
+from tlt import metrics
+from tlt.ingest import ingest_csv
+from tlt.transform import transform_parquet
+
+REPO = Path(__file__).resolve().parents[1]
+SAMPLE = REPO / "sample" / "events.csv"
+PROM_LINE = re.compile(r'^tlt_[a-z_]+\{command="\w+"(,phase="[\w.]+")?\} \S+$')
+
+
+def test_phases_cost_nothing_when_not_recording() -> None:
+    assert not metrics.enabled()
+    items = [1, 2, 3]
+    assert metrics.iter_phase("x", items) is items
+    with metrics.phase("x", rows_in=3) as ph:
+        ph.rows_out = 3
+
+
+def test_recording_ingest_and_transform(tmp_path: Path) -> None:
+    json_path, prom_path = tmp_path / "m.json", tmp_path / "m.prom"
+    with metrics.recording("flow", json_path, prom_path) as rec:
+        events = ingest_csv(SAMPLE, tmp_path / "events.parquet")
+        transform_parquet(events, tmp_path / "agg.parquet", mau_window="7,30")
+        with metrics.phase("chunks"):
+            list(metrics.iter_phase("chunk", [[1, 2], [3]]))
+    assert not metrics.enabled()
+    assert rec.success
+
+    doc = json.loads(json_path.read_text(encoding="utf-8"))
+    phases = {p["phase"]: p for p in doc["phases"]}
+    for name in (
+        "ingest.read",
+        "ingest.parse_timestamps",
+        "ingest.validate",
+        "ingest.sort",
+        "ingest.write",
+        "transform.read",
+        "transform.groupby_events",
+        "transform.latency",
+        "transform.dau",
+        "transform.mau",
+        "transform.merge",
+        "transform.write",
+    ):
+        assert phases[name]["wall_s"] >= 0, name
+        assert phases[name]["cpu_s"] >= 0, name
+    n = phases["ingest.read"]["rows_out"]
+    assert n > 0
+    assert phases["ingest.sort"]["rows_in"] == n
+    assert phases["transform.read"]["rows_out"] == n
+    assert phases["transform.mau"]["calls"] == 1
+    assert phases["chunk"]["rows_out"] == 3
+    assert phases["chunk"]["calls"] == 3  # two items + the exhausted next()
+    assert [p["phase"] for p in doc["phases"]][0] == "ingest.read"
+    assert doc["peak_rss_mb"] > 0
+
+    prom = prom_path.read_text(encoding="utf-8").splitlines()
+    samples = [line for line in prom if not line.startswith("#")]
+    assert all(PROM_LINE.match(line) for line in samples), samples
+    assert 'tlt_run_success{command="flow"} 1.0' in samples
+    wall = 'tlt_phase_wall_seconds{command="flow",phase="transform.mau"}'
+    assert any(line.startswith(wall) for line in samples)
+
+
+def test_failed_run_is_recorded(tmp_path: Path) -> None:
+    bad = tmp_path / "bad.csv"
+    bad.write_text("user_id,event\nu1,click\n", encoding="utf-8")
+    json_path = tmp_path / "m.json"
+    with pytest.raises(ValueError):
+        with metrics.recording("ingest", json_path):
+            ingest_csv(bad, tmp_path / "out.parquet")
+    assert json.loads(json_path.read_text(encoding="utf-8"))["success"] is False
+    assert not metrics.enabled()
+
+
+def test_cli_metrics_and_profile(tmp_path: Path) -> None:
+    events = ingest_csv(SAMPLE, tmp_path / "events.parquet")
+    prom, prof = tmp_path / "t.prom", tmp_path / "t.prof"
+    subprocess.check_call(
+        [
+            sys.executable,
+            "-m",
+            "tlt.cli",
+            "transform",
+            "--in",
+            str(events),
+            "--out",
+            str(tmp_path / "agg.parquet"),
+            "--metrics-prom",
+            str(prom),
+            "--profile",
+            str(prof),
+        ],
+        cwd=REPO,
+    )
+    assert 'phase="transform.groupby_events"' in prom.read_text(encoding="utf-8")
+    stats = pstats.Stats(str(prof))
+    assert any(func[2] == "transform_parquet" for func in stats.stats)
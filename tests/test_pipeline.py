@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt import metrics
+from tlt.ingest import ingest_csv
+from tlt.pipeline import AGG_FILE, EVENTS_FILE, run_pipeline
+from tlt.report import make_reports
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture()
+def events_csv(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(8)
+    n = 3000
+    ts = pd.Timestamp("2025-07-01", tz="UTC") + pd.to_timedelta(
+        rng.integers(0, 25 * 86_400, n), unit="s"
+    )
+    path = tmp_path / "events.csv"
+    pd.DataFrame(
+        {
+            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user_id": [f"u{i}" for i in rng.integers(0, 150, n)],
+            "event": "click",
+            "feature_id": rng.choice(["a", "b", "c"], n),
+            "latency_ms": rng.integers(5, 90, n),
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("approx", [False, True])
+def test_run_matches_separate_stages(tmp_path: Path, events_csv: Path, approx: bool) -> None:
+    raw = ingest_csv(events_csv, tmp_path / "staged" / "events.parquet")
+    agg = transform_parquet(
+        raw, tmp_path / "staged" / "agg.parquet", mau_window="7,30", approx=approx
+    )
+    staged = make_reports(agg, tmp_path / "staged" / "reports", events_path=raw)
+
+    out, timings = run_pipeline(
+        events_csv, tmp_path / "run", mau_window="7,30", approx=approx, keep_intermediate=True
+    )
+    assert list(timings) == ["ingest", "write", "transform", "report"]
+    pd.testing.assert_frame_equal(pd.read_parquet(out / AGG_FILE), pd.read_parquet(agg))
+    pd.testing.assert_frame_equal(pd.read_parquet(out / EVENTS_FILE), pd.read_parquet(raw))
+    metrics = (out / "metrics.txt").read_text(encoding="utf-8")
+    assert metrics == (staged / "metrics.txt").read_text(encoding="utf-8")
+
+
+def test_run_cli_writes_only_reports(tmp_path: Path, events_csv: Path) -> None:
+    out = tmp_path / "run"
+    proc = subprocess.run(
+        [sys.executable, "-m", "tlt.cli", "run", "-i", str(events_csv), "--out-dir", str(out)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for stage in ("ingest", "transform", "report", "total"):
+        assert stage in proc.stdout
+    assert sorted(p.name for p in out.iterdir()) == [
+        "dau_mau.png",
+        "feature_usage.png",
+        "latency_by_feature.png",
+        "latency_trend.png",
+        "metrics.txt",
+    ]
+
+
+def test_run_stages_are_metrics_phases(tmp_path: Path, events_csv: Path) -> None:
+    with metrics.recording("run") as rec:
+        _, timings = run_pipeline(events_csv, tmp_path / "run")
+    assert list(timings) == ["ingest", "transform", "report"]
+    for stage, secs in timings.items():
+        assert rec.phases[f"run.{stage}"]["wall_s"] == secs
+    # Stage phases wrap the stages' own phases
+    assert "transform.mau" in rec.phases and rec.phases["run.transform"]["rows_out"] > 0
+    assert metrics.current() is None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+import tlt.report as report
+from tlt.report import latency_summary_by_feature, make_reports
+from tlt.transform import transform_parquet
+
+
+@pytest.fixture()
+def events(tmp_path: Path) -> Path:
+    rng = np.random.default_rng(21)
+    n = 6000
+    path = tmp_path / "events.parquet"
+    pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-03-01", tz="UTC")
+            + pd.to_timedelta(rng.integers(0, 20 * 86_400, n), unit="s"),
+            "user_id": [f"u{i}" for i in rng.integers(0, 200, n)],
+            "event": "click",
+            "feature_id": rng.choice(["menu", "search", "shop"], n),
+            "latency_ms": rng.gamma(2.0, 20.0, n),
+        }
+    ).to_parquet(path, index=False)
+    return path
+
+
+def _spy_reads(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, list[str] | None]]:
+    calls = []
+    real = report.read_frame
+
+    def spy(path, columns=None, **kw):
+        calls.append((Path(path).name, columns))
+        return real(path, columns=columns, **kw)
+
+    monkeypatch.setattr(report, "read_frame", spy)
+    return calls
+
+
+def test_latency_chart_source(
+    tmp_path: Path, events: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    agg = transform_parquet(events, tmp_path / "agg.parquet")
+    calls = _spy_reads(monkeypatch)
+
+    # Given raw events, auto draws from them; summaries only when asked or with no events
+    out = make_reports(agg, tmp_path / "reports", events_path=events)
+    assert (out / "latency_by_feature.png").exists()
+    assert calls[1] == ("events.parquet", ["feature_id", "latency_ms"])
+    for kwargs in (dict(events_path=events, latency_source="summary"), {}):
+        calls.clear()
+        out = make_reports(agg, tmp_path / "reports", **kwargs)
+        assert (out / "latency_by_feature.png").exists()
+        assert [name for name, _ in calls] == ["agg.parquet"]
+
+
+@pytest.mark.parametrize("latency_sketch", [False, True])
+def test_latency_summary_close_to_raw_quantiles(
+    tmp_path: Path, events: Path, latency_sketch: bool
+) -> None:
+    agg = pd.read_parquet(
+        transform_parquet(events, tmp_path / "agg.parquet", latency_sketch=latency_sketch)
+    )
+    got = latency_summary_by_feature(agg)
+
+    raw = pd.read_parquet(events)
+    for feat, lat in raw.groupby("feature_id")["latency_ms"]:
+        for col, q in (("p25", 0.25), ("p50", 0.5), ("p75", 0.75)):
+            want = lat.quantile(q)
+            assert abs(got.loc[feat, col] - want) <= 0.05 * want, (feat, col)
+
+
+def test_summary_mode_needs_summaries(tmp_path: Path, events: Path) -> None:
+    agg = pd.read_parquet(transform_parquet(events, tmp_path / "agg.parquet"))
+    old = tmp_path / "old.parquet"
+    agg.drop(columns=["p5", "p25", "p75"]).to_parquet(old, index=False)
+
+    with pytest.raises(ValueError, match="latency summaries"):
+        make_reports(old, tmp_path / "reports", latency_source="summary")
+    # auto falls back to raw events for older aggregated files
+    out = make_reports(old, tmp_path / "reports", events_path=events)
+    assert (out / "latency_by_feature.png").exists()
+
+
+def test_normalized_report_reads_each_table_once(
+    tmp_path: Path, events: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    flat = transform_parquet(events, tmp_path / "agg.parquet", mau_window="7,30")
+    norm = transform_parquet(events, tmp_path / "agg", mau_window="7,30", normalized=True)
+    make_reports(flat, tmp_path / "flat")
+    calls = _spy_reads(monkeypatch)
+
+    make_reports(norm, tmp_path / "norm", since="2025-03-01")
+    assert [name for name, _ in calls] == ["days.parquet", "features.parquet"]
+    assert not any(c.startswith(("dau", "mau_")) for c in calls[1][1])
+    assert (tmp_path / "norm" / "metrics.txt").read_text() == (
+        tmp_path / "flat" / "metrics.txt"
+    ).read_text()
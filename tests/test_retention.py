@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from click.testing import CliRunner
+
+from tlt import retention
+from tlt.charts import stored_digest
+from tlt.cli import cli
+from tlt.ingest import ingest_csv
+from tlt.report import make_reports
+from tlt.retention import compute_retention, read_retention, retention_matrix
+from tlt.transform import transform_parquet
+
+# Six weeks of events from a large user pool: new users keep arriving for weeks
+EVENTS = dict(n=8_000, start="2025-03-01", days=40, users=600, features=("menu", "search", "shop"))
+
+
+def _naive(df: pd.DataFrame, max_days: int) -> pd.DataFrame:
+    """Per-user loop over dense calendars: the obvious (slow) definition."""
+    day = df["timestamp"].dt.floor("D")
+    last = day.max()
+    rows = []
+    for _, days in day.groupby(df["user_id"]):
+        first = days.min()
+        seen = set((days - first).dt.days)
+        for offset in range(min(max_days, (last - first).days) + 1):
+            rows.append((first, offset, int(offset in seen)))
+    cells = pd.DataFrame(rows, columns=["cohort", "day", "active"])
+    out = cells.groupby(["cohort", "day"])["active"].agg(users="sum", cohort_users="size")
+    return out.reset_index()
+
+
+def _check(got: pd.DataFrame, want: pd.DataFrame) -> None:
+    got = got.assign(cohort=got["cohort"].astype("datetime64[ns, UTC]"))
+    want = want.assign(cohort=want["cohort"].astype("datetime64[ns, UTC]"))
+    pd.testing.assert_frame_equal(
+        got[["cohort", "day", "users", "cohort_users"]].reset_index(drop=True),
+        want.reset_index(drop=True),
+        check_dtype=False,
+    )
+    np.testing.assert_allclose(got["retention"], got["users"] / got["cohort_users"])
+
+
+@pytest.mark.parametrize("max_days", [0, 7, 30])
+def test_retention_matches_naive(tmp_path: Path, make_events, max_days: int) -> None:
+    df = make_events(**EVENTS)
+    df.to_parquet(tmp_path / "events.parquet", index=False)
+    out = compute_retention(tmp_path / "events.parquet", tmp_path / "r.parquet", max_days)
+    _check(read_retention(out), _naive(df, max_days))
+
+
+def test_retention_streams_distinct_pairs(tmp_path: Path, make_events, monkeypatch) -> None:
+    df = make_events(seed=1, **EVENTS)
+    csv = make_events.csv(df, tmp_path / "events.csv")
+    # Small row groups and merges: many batches whose pairs overlap
+    monkeypatch.setattr(retention, "_COMPACT_PAIRS", 100)
+    want = _naive(df, 14)
+    for name, kwargs in [
+        ("plain.parquet", dict(chunk_rows=500, sort=False)),
+        ("dict.arrow", dict(chunk_rows=500, sort=False, dictionary=True)),
+    ]:
+        events = ingest_csv(csv, tmp_path / name, **kwargs)
+        _check(read_retention(compute_retention(events, tmp_path / "r.parquet", 14)), want)
+
+    user, day = retention.active_pairs(tmp_path / "plain.parquet")
+    dates = df["timestamp"].dt.floor("D")
+    assert len(day) == len(pd.DataFrame({"u": df["user_id"], "d": dates}).drop_duplicates())
+
+
+def test_retention_filters(tmp_path: Path, make_events) -> None:
+    df = make_events(seed=2, **EVENTS)
+    csv = make_events.csv(df, tmp_path / "events.csv")
+    parts = ingest_csv(csv, tmp_path / "events", partitioned=True)
+    got = read_retention(
+        compute_retention(parts, tmp_path / "r.parquet", 10, since="2025-03-10", until="2025-03-30")
+    )
+    # since picks cohorts of users first seen from that day on; until cuts the events
+    kept = df[df["timestamp"] < pd.Timestamp("2025-03-31", tz="UTC")]
+    want = _naive(kept, 10)
+    _check(got, want[want["cohort"] >= pd.Timestamp("2025-03-10", tz="UTC")])
+
+    shop = read_retention(
+        compute_retention(parts, tmp_path / "shop.parquet", 10, features=["shop"])
+    )
+    _check(shop, _naive(df[df["feature_id"] == "shop"], 10))
+
+
+def test_retention_matrix_edge_cases() -> None:
+    empty = retention_matrix(np.empty(0, np.int64), np.empty(0, np.int64))
+    assert list(empty.columns) == list(retention.RETENTION_COLUMNS) and empty.empty
+    with pytest.raises(ValueError, match="max_days"):
+        retention_matrix(np.array([0]), np.array([0]), max_days=-1)
+    # Two users, one back two days later; only offsets up to the last day are observable
+    got = retention_matrix(np.array([0, 0, 1]), np.array([20_000, 20_002, 20_001]), 5)
+    assert got[["day", "users", "cohort_users"]].values.tolist() == [
+        [0, 1, 1],
+        [1, 0, 1],
+        [2, 1, 1],
+        [0, 1, 1],
+        [1, 0, 1],
+    ]
+
+
+def test_user_codes_are_append_only() -> None:
+    users: dict[str, int] = {}
+    first = retention._user_codes(pa.array(["b", "a", "b"]), users)
+    # Dictionary-typed labels (e.g. pandas categoricals) share the same codes
+    second = retention._user_codes(pa.array(["c", "a", "c"]).dictionary_encode(), users)
+    assert first.tolist() == [0, 1, 0] and second.tolist() == [2, 1, 2]
+    assert users == {"b": 0, "a": 1, "c": 2}
+    assert retention._user_codes(pa.array([7, 3], pa.int32()), users).tolist() == [7, 3]
+
+
+def test_report_draws_retention_heatmap(tmp_path: Path, make_events) -> None:
+    df = make_events(seed=3, **EVENTS)
+    raw = tmp_path / "events.parquet"
+    df.to_parquet(raw, index=False)
+    matrix = compute_retention(raw, tmp_path / "retention.parquet", 30)
+    agg = transform_parquet(raw, tmp_path / "agg.parquet")
+
+    out = make_reports(agg, tmp_path / "reports", retention_path=matrix)
+    assert stored_digest(out / "retention.png")
+    text = (out / "metrics.txt").read_text()
+    pooled = _naive(df, 30).groupby("day")[["users", "cohort_users"]].sum()
+    for day in (1, 7, 30):
+        share = pooled.at[day, "users"] / pooled.at[day, "cohort_users"]
+        assert f"Day-{day} retention: {share:.1%}" in text
+
+    with pytest.raises(ValueError, match="not a retention matrix"):
+        make_reports(agg, tmp_path / "bad", retention_path=agg)
+
+
+def test_cli_retention_and_report(tmp_path: Path, make_events) -> None:
+    raw = tmp_path / "events.parquet"
+    make_events(seed=4, **EVENTS).to_parquet(raw, index=False)
+    matrix = tmp_path / "retention.parquet"
+
+    res = CliRunner().invoke(cli, ["retention", "--in", str(raw), "--out", str(matrix)])
+    assert res.exit_code == 0, res.output
+    assert read_retention(matrix)["day"].max() == 30
+
+    args = ["report", "--in", str(raw), "--out", str(tmp_path / "reports")]
+    res = CliRunner().invoke(cli, [*args, "--retention", str(matrix), "--since", "2025-03-02"])
+    assert res.exit_code == 0, res.output
+    assert (tmp_path / "reports" / "retention.png").exists()
+
+    res = CliRunner().invoke(
+        cli, ["retention", "--in", str(raw), "--out", str(matrix), "--days", "-1"]
+    )
+    assert res.exit_code != 0
@@ -45,3 +45,22 @@ def test_size_cmd(tmp_path: Path) -> None:
     )
     assert "Size Comparison" in out
     assert "Parquet/CSV ratio" in out
+
+
+def test_size_bench_codecs(tmp_path: Path) -> None:
+    csv = tmp_path / "x.csv"
+    csv.write_text(
+        "timestamp,user_id,event,feature_id\n"
+        + "".join(f"2025-01-01T00:00:{i:02d}Z,u{i},open,f{i % 3}\n" for i in range(60)),
+        encoding="utf-8",
+    )
+    events_parquet = tmp_path / "x.parquet"
+    subprocess.check_call(
+        [_py(), "-m", "tlt.cli", "ingest", "--input", str(csv), "--out", str(events_parquet)]
+    )
+    out = subprocess.check_output(
+        [_py(), "-m", "tlt.cli", "size", "--parquet", str(events_parquet), "--bench-codecs"],
+        text=True,
+    )
+    assert "Size Comparison" not in out
+    assert "zstd+sorted" in out
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt import sketch
+from tlt.report import approx_distinct_users, latency_percentiles, make_reports
+from tlt.transform import transform_parquet
+
+
+def _hashes(ids) -> np.ndarray:
+    return sketch.hash_values(np.array([f"user-{i}" for i in ids], dtype=object))
+
+
+def test_estimate_within_error() -> None:
+    for n in (1, 100, 20_000, 200_000):
+        est = sketch.estimate(sketch.build(_hashes(range(n))))
+        assert abs(est - n) <= max(1, 0.03 * n), (n, est)
+
+
+def test_merge_is_union_and_roundtrips() -> None:
+    a = sketch.build(_hashes(range(0, 6000)))
+    b = sketch.build(_hashes(range(4000, 10_000)))
+    merged = sketch.merge_bytes([sketch.to_bytes(a), None, sketch.to_bytes(b)])
+    assert np.array_equal(merged, sketch.build(_hashes(range(10_000))))
+    assert abs(sketch.estimate(merged) - 10_000) < 300
+
+
+def test_build_grouped_matches_build() -> None:
+    ids = np.arange(3000)
+    groups = ids % 3
+    grouped = sketch.build_grouped(groups, _hashes(ids), 4)
+    for g in range(3):
+        assert np.array_equal(grouped[g], sketch.build(_hashes(ids[groups == g])))
+    assert not grouped[3].any()
+
+
+def test_sparse_bytes_roundtrip_and_grouped_merge() -> None:
+    ids = np.arange(5000)
+    groups = np.minimum(ids // 50, 9)  # nine small groups (sparse) and one large (dense)
+    blobs = sketch.build_grouped_bytes(groups, _hashes(ids), 11, precision=12)
+    dense = sketch.build_grouped(groups, _hashes(ids), 11, precision=12)
+    assert blobs == [sketch.to_bytes(r) for r in dense]
+    assert len(blobs[0]) < 256 and len(blobs[9]) == 1 + 4096 and len(blobs[10]) == 1
+    for blob, regs in zip(blobs, dense):
+        assert np.array_equal(sketch.from_bytes(blob), regs)
+
+    # Fold the groups pairwise (sparse with sparse, sparse with dense) into 5 + 1 empty
+    merged = sketch.merge_grouped_bytes(blobs, np.arange(11) // 2, 6)
+    for g in range(6):
+        want = sketch.merge(dense[2 * g : 2 * g + 2])
+        assert np.array_equal(sketch.from_bytes(merged[g]), want)
+    with pytest.raises(ValueError, match="precisions"):
+        sketch.merge_grouped_bytes(
+            [blobs[0], sketch.to_bytes(sketch.build(_hashes(ids)))], [0, 0], 1
+        )
+
+
+def test_transform_approx_close_to_exact(tmp_path: Path) -> None:
+    rng = np.random.default_rng(7)
+    n = 30_000
+    raw = tmp_path / "events.parquet"
+    pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-03-01", tz="UTC")
+            + pd.to_timedelta(rng.integers(0, 20 * 86_400, n), unit="s"),
+            "user_id": pd.array(rng.integers(0, 8000, n).astype(str), dtype="string"),
+            "event": "click",
+            "feature_id": pd.array(rng.choice(["a", "b"], n), dtype="string"),
+        }
+    ).to_parquet(raw, index=False)
+
+    exact = pd.read_parquet(transform_parquet(raw, tmp_path / "exact.parquet", mau_window="7"))
+    approx = pd.read_parquet(
+        transform_parquet(raw, tmp_path / "approx.parquet", mau_window="7", approx=True)
+    )
+    assert approx["users_hll"].map(type).eq(bytes).all()
+    for col in ("dau", "mau_7d"):
+        rel = (approx[col] - exact[col]).abs() / exact[col]
+        assert rel.max() < 0.05, col
+
+    # Any date range can be answered from the sketches alone
+    events = pd.read_parquet(raw)
+    week = events[events["timestamp"] < pd.Timestamp("2025-03-08", tz="UTC")]
+    est = approx_distinct_users(approx, "2025-03-01", "2025-03-07")
+    assert abs(est - week["user_id"].nunique()) / week["user_id"].nunique() < 0.05
+    est_a = approx_distinct_users(approx, feature_id="a")
+    n_a = events.loc[events["feature_id"] == "a", "user_id"].nunique()
+    assert abs(est_a - n_a) / n_a < 0.05
+
+    make_reports(tmp_path / "approx.parquet", tmp_path / "reports")
+    assert "Unique users (approx)" in (tmp_path / "reports" / "metrics.txt").read_text()
+
+
+def test_latency_sketch_percentiles_across_days(tmp_path: Path) -> None:
+    rng = np.random.default_rng(3)
+    n = 20_000
+    raw = tmp_path / "events.parquet"
+    events = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-03-01", tz="UTC")
+            + pd.to_timedelta(rng.integers(0, 10 * 86_400, n), unit="s"),
+            "user_id": pd.array(rng.integers(0, 500, n).astype(str), dtype="string"),
+            "event": "click",
+            "feature_id": pd.array(rng.choice(["a", "b"], n), dtype="string"),
+            "latency_ms": rng.lognormal(3.5, 0.6, n),
+        }
+    )
+    events.to_parquet(raw, index=False)
+
+    agg = pd.read_parquet(transform_parquet(raw, tmp_path / "agg.parquet", latency_sketch=True))
+    pct = latency_percentiles(agg)
+    for name, lat in [("(all)", events["latency_ms"])] + [
+        (f, g["latency_ms"]) for f, g in events.groupby("feature_id")
+    ]:
+        for q, col in ((0.5, "p50"), (0.95, "p95"), (0.99, "p99")):
+            exact = lat.quantile(q)
+            assert abs(pct.loc[name, col] - exact) / exact < 0.03, (name, col)
+
+    make_reports(tmp_path / "agg.parquet", tmp_path / "reports")
+    assert "Latency percentiles (all days)" in (tmp_path / "reports" / "metrics.txt").read_text()
+
+
+def test_latency_sketch_merge_and_zero_bucket() -> None:
+    a, b = sketch.dd_build_grouped(np.array([0, 0, 1, 1]), np.array([0.0, 10.0, 20.0, np.nan]), 2)
+    merged = sketch.dd_merge_bytes([a, None, b])
+    p0, p100 = sketch.dd_quantiles(merged, [0.0, 1.0])
+    assert p0 == 0.0
+    assert abs(p100 - 20.0) / 20.0 <= 0.01
+    assert sketch.dd_merge_bytes([None]) is None
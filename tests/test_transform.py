@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+from tlt.dataset import DAY_TABLE, FEATURE_TABLE, read_aggregates, read_frame, table_path
+from tlt.transform import _compute_mau, transform_parquet
+
+
+def _dense_mau(events: pd.DataFrame, window_days: int) -> pd.DataFrame:
+    """The original date x user pivot + rolling implementation, kept as the oracle."""
+    active = events[["date", "user_id"]].drop_duplicates().assign(present=1)
+    pivot = active.pivot_table(
+        index="date", columns="user_id", values="present", aggfunc="max", fill_value=0
+    )
+    rolled = pivot.rolling(f"{window_days}D", min_periods=1).sum()
+    mau = (rolled > 0).sum(axis=1).rename(f"mau_{window_days}d")
+    return mau.reset_index()
+
+
+def _random_events(seed: int, n: int = 2000, days: int = 120, users: int = 150) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-01-01", tz="UTC")
+    # Sparse, gappy calendar: only some days have activity
+    active_days = np.sort(rng.choice(days, size=days // 3, replace=False))
+    ts = start + pd.to_timedelta(rng.choice(active_days, n), unit="D")
+    ts = ts + pd.to_timedelta(rng.integers(0, 86_400, n), unit="s")
+    return pd.DataFrame(
+        {
+            "timestamp": ts,
+            "user_id": pd.array([f"u{i}" for i in rng.integers(0, users, n)], dtype="string"),
+            "event": "click",
+            "feature_id": pd.array(rng.choice(["a", "b", "c"], n), dtype="string"),
+            "latency_ms": rng.integers(5, 200, n).astype(float),
+        }
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compute_mau_matches_dense(seed: int) -> None:
+    df = _random_events(seed)
+    df["date"] = df["timestamp"].dt.floor("D")
+
+    got = _compute_mau(df, window_days=[1, 7, 28, 30])
+    for w in (1, 7, 28, 30):
+        want = _dense_mau(df, w)
+        assert list(got["date"]) == list(want["date"])
+        assert got[f"mau_{w}d"].tolist() == want[f"mau_{w}d"].tolist(), w
+
+
+def test_transform_multiple_mau_windows(tmp_path: Path) -> None:
+    raw = tmp_path / "events.parquet"
+    _random_events(0).to_parquet(raw, index=False)
+
+    agg = pd.read_parquet(transform_parquet(raw, tmp_path / "agg.parquet", mau_window="30,7"))
+    assert {"mau_7d", "mau_30d"}.issubset(agg.columns)
+    assert (agg["mau_7d"] <= agg["mau_30d"]).all()
+    assert (agg["dau"] <= agg["mau_7d"]).all()
+
+
+def test_mau_window_validation() -> None:
+    df = _random_events(0, n=10)
+    df["date"] = df["timestamp"].dt.floor("D")
+    with pytest.raises(ValueError):
+        _compute_mau(df, window_days=0)
+
+
+def test_latency_quantiles_match_per_group_lambdas(tmp_path: Path) -> None:
+    df = _random_events(3, n=3000)
+    df.loc[df.index % 11 == 0, "latency_ms"] = np.nan
+    raw = tmp_path / "events.parquet"
+    df.to_parquet(raw, index=False)
+
+    agg = pd.read_parquet(transform_parquet(raw, tmp_path / "agg.parquet"))
+
+    df["date"] = df["timestamp"].dt.floor("D")
+    want = (
+        df.groupby(["date", "feature_id"])["latency_ms"]
+        .agg(
+            p5=lambda s: float(s.quantile(0.05)),
+            p25=lambda s: float(s.quantile(0.25)),
+            p50=lambda s: float(s.quantile(0.5)),
+            p75=lambda s: float(s.quantile(0.75)),
+            p95=lambda s: float(s.quantile(0.95)),
+        )
+        .reset_index()
+    )
+    got = agg[["date", "feature_id", "p5", "p25", "p50", "p75", "p95"]]
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [dict(), dict(approx=True), dict(latency_sketch=True), dict(normalized=True)],
+)
+def test_transform_empty_input(tmp_path: Path, kwargs: dict) -> None:
+    raw = tmp_path / "events.parquet"
+    _random_events(6, n=50).iloc[:0].to_parquet(raw, index=False)
+    full = _random_events(6, n=50)
+    full.to_parquet(tmp_path / "full.parquet", index=False)
+
+    got = read_aggregates(transform_parquet(raw, tmp_path / "agg", **kwargs))
+    want = read_aggregates(
+        transform_parquet(tmp_path / "full.parquet", tmp_path / "full", **kwargs)
+    )
+    assert got.empty
+    assert list(got.columns) == list(want.columns)
+
+
+@pytest.mark.parametrize("approx", [False, True])
+def test_parallel_transform_matches_serial(tmp_path: Path, approx: bool) -> None:
+    raw = tmp_path / "events.parquet"
+    _random_events(4, n=5000).to_parquet(raw, index=False)
+    kwargs = dict(mau_window="7,30", approx=approx, latency_sketch=True, since="2025-01-20")
+
+    serial = pd.read_parquet(transform_parquet(raw, tmp_path / "serial.parquet", **kwargs))
+    parallel = pd.read_parquet(
+        transform_parquet(raw, tmp_path / "parallel.parquet", workers=3, **kwargs)
+    )
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+@pytest.mark.parametrize("partitioned", [False, True])
+@pytest.mark.parametrize("approx", [False, True])
+def test_normalized_output_matches_flat(tmp_path: Path, partitioned: bool, approx: bool) -> None:
+    raw = tmp_path / "events.parquet"
+    _random_events(4).to_parquet(raw, index=False)
+    kwargs = dict(mau_window="7,30", approx=approx, since="2025-02-01", partitioned=partitioned)
+    flat = read_frame(transform_parquet(raw, tmp_path / "flat", **kwargs))
+    out = transform_parquet(raw, tmp_path / "norm", normalized=True, **kwargs)
+
+    days = read_frame(table_path(out, DAY_TABLE))
+    assert sorted(days.columns) == ["date", "dau", "mau_30d", "mau_7d"]
+    assert days["date"].is_unique
+    assert not {"dau", "mau_7d"} & set(read_frame(table_path(out, FEATURE_TABLE)).columns)
+
+    # The compatibility view is the flat table
+    pd.testing.assert_frame_equal(read_aggregates(out)[list(flat.columns)], flat)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from tlt import sketch
+from tlt.cli import cli
+from tlt.dataset import read_frame
+from tlt.ingest import ingest_csv
+from tlt.transform import LATENCY_QUANTILES, transform_parquet
+from tlt.watch import LiveAggregates, Watcher, checkpoint_path
+
+HEADER = "timestamp,user_id,event,feature_id,latency_ms\n"
+
+
+@pytest.fixture
+def csv_lines(make_events):
+    """CSV data lines of `n` events over one `day` from 40 users."""
+
+    def build(n: int, seed: int, day: str = "2025-06-01") -> list[str]:
+        return make_events.lines(make_events(n, seed, start=day, days=1, users=40))
+
+    return build
+
+
+def _append(path: Path, text: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _store(out: Path) -> pd.DataFrame:
+    df = read_frame(out).drop(columns="date")
+    return df.sort_values(["timestamp", "user_id", "feature_id"]).reset_index(drop=True)
+
+
+def test_tails_complete_lines_and_resumes_without_duplicates(tmp_path: Path, csv_lines) -> None:
+    csv, out = tmp_path / "live.csv", tmp_path / "events"
+    lines = csv_lines(300, seed=1)
+    csv.write_text(HEADER + "".join(lines[:100]) + lines[100][:12], encoding="utf-8")
+
+    w = Watcher([csv], out)
+    r = w.poll()
+    assert (r["rows"], r["rejected"]) == (100, 0)
+    assert w.poll() is None  # the partial line waits for its newline
+
+    _append(csv, lines[100][12:] + "".join(lines[101:200]))
+    assert w.poll()["rows"] == 100
+
+    # A new process picks up from the checkpoint
+    _append(csv, "".join(lines[200:]))
+    w = Watcher([csv], out)
+    assert w.poll()["rows"] == 100
+    assert w.poll() is None
+
+    csv_all = tmp_path / "all.csv"
+    csv_all.write_text(HEADER + "".join(lines), encoding="utf-8")
+    expected = ingest_csv(csv_all, tmp_path / "expected.parquet")
+    expected = pd.read_parquet(expected).sort_values(["timestamp", "user_id", "feature_id"])
+    pd.testing.assert_frame_equal(_store(out), expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_pending_batch_is_replayed_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, csv_lines
+) -> None:
+    csv, out = tmp_path / "live.csv", tmp_path / "events"
+    csv.write_text(HEADER + "".join(csv_lines(50, seed=2)), encoding="utf-8")
+    Watcher([csv], out).poll()
+
+    # Crash after the batch's files were written but before its offsets were committed
+    saved = {}
+    apply = Watcher._apply
+
+    def recording_apply(self, batch, data):
+        saved["state"] = checkpoint_path(out).read_text()
+        return apply(self, batch, data)
+
+    _append(csv, "".join(csv_lines(30, seed=3)))
+    monkeypatch.setattr(Watcher, "_apply", recording_apply)
+    Watcher([csv], out).poll()
+    monkeypatch.undo()
+    checkpoint_path(out).write_text(saved["state"])
+    assert json.loads(saved["state"])["pending"] is not None
+
+    w = Watcher([csv], out)
+    assert json.loads(checkpoint_path(out).read_text())["pending"] is None
+    assert w.poll() is None
+    assert len(_store(out)) == 80
+    assert w.aggregates.frame()["events"].sum() == 80
+
+
+def test_invalid_rows_are_dropped_and_counted(tmp_path: Path, csv_lines) -> None:
+    csv, out = tmp_path / "live.csv", tmp_path / "events"
+    good = csv_lines(10, seed=4)
+    csv.write_text(
+        HEADER + "".join(good) + "not-a-time,u1,click,a,5\n2025-06-01T00:00:00Z,,click,a,5\n",
+        encoding="utf-8",
+    )
+    r = Watcher([csv], out).poll()
+    assert (r["rows"], r["rejected"]) == (10, 2)
+    assert len(_store(out)) == 10
+
+
+def test_spool_directory_and_missing_columns(tmp_path: Path, csv_lines) -> None:
+    spool, out = tmp_path / "spool", tmp_path / "events"
+    spool.mkdir()
+    (spool / "a.csv").write_text(HEADER + "".join(csv_lines(20, seed=5)), encoding="utf-8")
+    w = Watcher([spool], out)
+    assert w.poll()["files"] == 1
+
+    (spool / "b.csv").write_text(HEADER + "".join(csv_lines(15, seed=6)), encoding="utf-8")
+    r = w.poll()
+    assert (r["files"], r["rows"]) == (1, 15)
+
+    (spool / "bad.csv").write_text("timestamp,user_id\n2025-06-01T00:00:00Z,u1\n")
+    with pytest.raises(ValueError, match="Missing required columns"):
+        w.poll()
+
+
+def test_live_aggregates_match_transform(tmp_path: Path, csv_lines) -> None:
+    csv, out = tmp_path / "live.csv", tmp_path / "events"
+    lines = csv_lines(400, seed=7, day="2025-06-01") + csv_lines(400, seed=8, day="2025-06-02")
+    csv.write_text(HEADER, encoding="utf-8")
+    snapshot = tmp_path / "live.parquet"
+    w = Watcher([csv], out, days=2, snapshot_path=snapshot)
+    for i in range(0, len(lines), 160):
+        _append(csv, "".join(lines[i : i + 160]))
+        w.poll()
+
+    agg = pd.read_parquet(transform_parquet(out, tmp_path / "agg.parquet", latency_sketch=True))
+    live = pd.read_parquet(snapshot)
+    assert len(live) == len(agg) == 6
+    key = ["date", "feature_id"]
+    live, agg = live.sort_values(key), agg.sort_values(key)
+    assert live["events"].tolist() == agg["events"].tolist()
+    assert live["dau"].tolist() == agg["dau"].tolist()
+    for mine, full in zip(live["latency_dd"], agg["latency_dd"]):
+        a = sketch.dd_quantiles(mine, LATENCY_QUANTILES.values())
+        b = sketch.dd_quantiles(full, LATENCY_QUANTILES.values())
+        assert a == pytest.approx(b)
+
+    # A restart rebuilds the same aggregates from the store; days=1 keeps the newest day
+    assert Watcher([csv], out, days=2).aggregates.frame()["events"].sum() == 800
+    assert set(Watcher([csv], out).aggregates.frame()["date"].dt.strftime("%Y-%m-%d")) == {
+        "2025-06-02"
+    }
+
+
+def test_live_aggregates_drop_old_days() -> None:
+    agg = LiveAggregates(days=1)
+    day1 = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2025-06-01T01:00:00Z"] * 2),
+            "user_id": ["u1", "u2"],
+            "feature_id": ["a", "a"],
+        }
+    )
+    agg.update(day1)
+    agg.update(day1.assign(timestamp=day1["timestamp"] + pd.Timedelta(days=1)))
+    agg.update(day1)  # late events for a dropped day
+    frame = agg.frame()
+    assert frame[["events", "dau"]].values.tolist() == [[2, 2]]
+    assert str(frame["date"].iloc[0].date()) == "2025-06-02"
+
+
+def test_cli_watch_once(tmp_path: Path, csv_lines) -> None:
+    csv, out = tmp_path / "live.csv", tmp_path / "events"
+    csv.write_text(HEADER + "".join(csv_lines(25, seed=9)), encoding="utf-8")
+    args = ["watch", "-i", str(csv), "--out", str(out), "--once", "--codec", "none"]
+    res = CliRunner().invoke(cli, args)
+    assert res.exit_code == 0, res.output
+    assert "batch 0: 25 rows (0 rejected)" in res.output
+    assert CliRunner().invoke(cli, args).output == ""
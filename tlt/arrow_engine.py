@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import metrics, sketch
+from .dataset import UNITS_PER_DAY, read_table, utc_day_numbers
+
+# `transform_parquet(engine="arrow")`: the same aggregates as the pandas path, computed
+# on the Arrow table with pyarrow.compute's multithreaded kernels. Only the per-group
+# results (and, for exact MAU, the distinct (date, user) pairs) become pandas frames.
+
+
+def _encode(values: pa.ChunkedArray) -> tuple[np.ndarray, pa.Array]:
+    """Dense int codes per row plus the distinct values they index (one shared dictionary)."""
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(values.type.value_type)
+    encoded = pc.dictionary_encode(values)
+    if encoded.num_chunks == 0:
+        return np.empty(0, dtype=np.int64), pa.array([], type=values.type)
+    # Chunks of one dictionary_encode call share the final, complete dictionary
+    codes = np.concatenate([c.indices.to_numpy(zero_copy_only=False) for c in encoded.chunks])
+    return codes.astype(np.int64), encoded.chunks[-1].dictionary
+
+
+def _exact_quantiles(
+    codes: np.ndarray, latency: pa.ChunkedArray, n_groups: int, qs: Sequence[float]
+) -> np.ndarray:
+    """
+    Quantiles per group code with pandas' linear interpolation (NaN for groups without
+    latency), from one Arrow sort by (group, latency).
+    """
+    valid = pc.is_valid(latency).to_numpy(zero_copy_only=False)
+    values = latency.to_numpy(zero_copy_only=False)
+    if np.issubdtype(values.dtype, np.floating):
+        valid &= ~np.isnan(values)
+    pairs = pa.table({"g": codes[valid], "v": values[valid].astype(np.float64)})
+    pairs = pairs.sort_by([("g", "ascending"), ("v", "ascending")])
+    g, v = pairs["g"].to_numpy(), pairs["v"].to_numpy()
+
+    start = np.searchsorted(g, np.arange(n_groups), side="left")
+    count = np.searchsorted(g, np.arange(n_groups), side="right") - start
+    out = np.full((n_groups, len(qs)), np.nan)
+    has = count > 0
+    for j, q in enumerate(qs):
+        pos = q * (count[has] - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, count[has] - 1)
+        v_lo, v_hi = v[start[has] + lo], v[start[has] + hi]
+        out[has, j] = v_lo + (v_hi - v_lo) * (pos - lo)
+    return out
+
+
+def aggregate_arrow(
+    in_path: str | Path,
+    windows: list[int],
+    approx: bool = False,
+    latency_sketch: bool = False,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    quantiles: dict[str, float] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (date, feature_id) rows and per-day dau/mau_{N}d, as `feature_metrics` and
+    `_user_metrics` produce them, straight from the Arrow table of `in_path`.
+
+    Events, DAU and the distinct (date, user) pairs behind exact MAU come from
+    `Table.group_by().aggregate()` (count_all, count_distinct) over integer group and
+    user codes (`dictionary_encode`); latency quantiles are
+    exact, interpolated like pandas from one sort by (group, latency) - Arrow's tdigest
+    and approximate_median would not match the pandas path on small groups. Sketches
+    reuse `tlt.sketch` on the group codes, hashing each distinct user once.
+    """
+    from .transform import LATENCY_QUANTILES, _approx_dau_mau, _compute_mau
+
+    quantiles = quantiles or LATENCY_QUANTILES
+    with metrics.phase("transform.read") as ph:
+        table = read_table(
+            in_path,
+            columns=["timestamp", "user_id", "feature_id", "latency_ms"],
+            since=since,
+            until=until,
+            features=features,
+        )
+        ph.rows_out = table.num_rows
+    unit = table.schema.field("timestamp").type.unit
+
+    with metrics.phase("transform.dates", rows_in=table.num_rows):
+        day = utc_day_numbers(table["timestamp"])
+        feat, feature_labels = _encode(table["feature_id"])
+        users, distinct_users = _encode(table["user_id"])
+        n_feat = max(len(feature_labels), 1)
+        key = day * n_feat + feat
+
+    with metrics.phase("transform.groupby_events", rows_in=table.num_rows) as ph:
+        per_key = (
+            pa.table({"key": key})
+            .group_by("key", use_threads=True)
+            .aggregate([([], "count_all")])
+            .sort_by("key")
+        )
+        keys = per_key["key"].to_numpy()
+        # Dense group code per row, in (date, feature_id) order
+        groups = np.searchsorted(keys, key)
+        ph.rows_out = len(keys)
+
+    key_day = keys // n_feat
+    labels = feature_labels.take(pa.array(keys % n_feat))
+    agg = pd.DataFrame(
+        {
+            "date": _day_timestamps(key_day, unit),
+            "feature_id": labels.to_pandas().astype("string"),
+            "events": per_key["count_all"].to_numpy(),
+        }
+    )
+    # Same row order as the pandas path: by date, then feature label
+    order = agg.sort_values(["date", "feature_id"], kind="stable").index.to_numpy()
+
+    if "latency_ms" in table.column_names:
+        latency = table["latency_ms"]
+        with metrics.phase("transform.latency", rows_in=table.num_rows):
+            q = _exact_quantiles(groups, latency, len(keys), list(quantiles.values()))
+            for j, name in enumerate(quantiles):
+                agg[name] = q[:, j]
+        if latency_sketch:
+            with metrics.phase("transform.latency_dd", rows_in=table.num_rows):
+                values = latency.to_numpy(zero_copy_only=False).astype(np.float64)
+                agg["latency_dd"] = sketch.dd_build_grouped(groups, values, len(keys))
+    else:
+        for name in quantiles:
+            agg[name] = pd.NA
+
+    if approx:
+        with metrics.phase("transform.users_hll", rows_in=table.num_rows):
+            hashes = sketch.hash_values(distinct_users.to_pandas())[users]
+            agg["users_hll"] = sketch.build_grouped_bytes(groups, hashes, len(keys))
+    agg = agg.iloc[order].reset_index(drop=True)
+
+    if approx:
+        return agg, _approx_dau_mau(agg, windows)
+
+    with metrics.phase("transform.dau", rows_in=table.num_rows):
+        days = pa.table({"day": day, "user_id": users})
+        dau = days.group_by("day", use_threads=True).aggregate([("user_id", "count_distinct")])
+        dau = dau.sort_by("day")
+        per_day = pd.DataFrame(
+            {
+                "date": _day_timestamps(dau["day"].to_numpy(), unit),
+                "dau": dau["user_id_count_distinct"].to_numpy(),
+            }
+        )
+    with metrics.phase("transform.pairs", rows_in=table.num_rows):
+        pairs = days.group_by(["day", "user_id"], use_threads=True).aggregate([])
+        pairs = pd.DataFrame(
+            {
+                "date": _day_timestamps(pairs["day"].to_numpy(), unit),
+                "user_id": pairs["user_id"].to_numpy(),
+            }
+        )
+    return agg, per_day.merge(_compute_mau(pairs, window_days=windows), on="date")
+
+
+def _day_timestamps(days: np.ndarray, unit: str) -> pd.Series:
+    """Days since epoch -> midnight UTC, in the input's timestamp unit."""
+    values = days.astype(np.int64) * UNITS_PER_DAY[unit]
+    return pd.Series(values.astype(f"datetime64[{unit}]")).dt.tz_localize("UTC")
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .metrics import peak_rss_mb
+
+RESULTS_VERSION = 1
+STAGES = ("ingest", "transform", "compute_mau", "report")
+_SUFFIXES = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+
+
+def parse_size(value: str | int) -> int:
+    """Row counts like 1000, "250k", "1M", "100M"."""
+    if isinstance(value, int):
+        return value
+    text = value.strip().lower()
+    mult = _SUFFIXES.get(text[-1:], 1)
+    digits = text[:-1] if text[-1:] in _SUFFIXES else text
+    try:
+        n = int(float(digits) * mult)
+    except ValueError:
+        raise ValueError(f"Invalid size {value!r} (e.g. 1000, 250k, 1M).") from None
+    if n <= 0:
+        raise ValueError(f"Size must be positive: {value!r}")
+    return n
+
+
+def size_label(n: int) -> str:
+    for suffix, mult in (("M", 1_000_000), ("k", 1_000)):
+        if n >= mult and n % mult == 0:
+            return f"{n // mult}{suffix}"
+    return str(n)
+
+
+def _measure(fn: Callable[[], int]) -> dict[str, Any]:
+    wall, cpu = time.perf_counter(), time.process_time()
+    rows_out = fn()
+    return {
+        "wall_s": time.perf_counter() - wall,
+        "cpu_s": time.process_time() - cpu,
+        "peak_rss_mb": peak_rss_mb(),
+        "rows_out": rows_out,
+    }
+
+
+# Stage bodies run in a fresh spawned process each, so peak RSS is per stage and one
+# stage's caches/allocations cannot flatter the next one.
+
+
+def _stage_ingest(csv_path: Path, events_path: Path) -> dict[str, Any]:
+    import pyarrow.parquet as pq
+
+    from .ingest import ingest_csv
+
+    return _measure(lambda: pq.ParquetFile(ingest_csv(csv_path, events_path)).metadata.num_rows)
+
+
+def _stage_transform(events_path: Path, agg_path: Path, mau_window: str) -> dict[str, Any]:
+    import pyarrow.parquet as pq
+
+    from .transform import transform_parquet
+
+    def run() -> int:
+        out = transform_parquet(events_path, agg_path, mau_window=mau_window)
+        return pq.ParquetFile(out).metadata.num_rows
+
+    return _measure(run)
+
+
+def _stage_compute_mau(events_path: Path, mau_window: str) -> dict[str, Any]:
+    from .transform import _compute_mau, _load_events, _parse_windows
+
+    df = _load_events(events_path)[["date", "user_id"]]  # loading is not timed
+    windows = _parse_windows(mau_window)
+    return _measure(lambda: len(_compute_mau(df, window_days=windows)))
+
+
+def _stage_report(agg_path: Path, events_path: Path, out_dir: Path) -> dict[str, Any]:
+    from .report import make_reports
+
+    def run() -> int:
+        make_reports(agg_path, out_dir, events_path=events_path)
+        return len(list(out_dir.iterdir()))
+
+    return _measure(run)
+
+
+def _in_child(fn: Callable[..., dict[str, Any]], *args) -> dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=10,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):  # no git, not a checkout, or timed out
+        return None
+    return out.stdout.strip() or None
+
+
+def _environment() -> dict[str, Any]:
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for pkg in ("telemetry-dashboard", "pandas", "pyarrow", "numpy", "matplotlib"):
+        try:
+            versions[pkg] = version(pkg)
+        except PackageNotFoundError:
+            versions[pkg] = None
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def run_benchmarks(
+    sizes: Iterable[str | int],
+    out_path: str | Path | None = None,
+    workdir: str | Path | None = None,
+    seed: int = 0,
+    n_users: int | None = None,
+    days: int = 30,
+    mau_window: str = "7,30",
+    keep: bool = False,
+    progress: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Time and memory-profile each pipeline stage on synthetic data of each size.
+
+    For every size a seeded CSV is generated (`tlt.synth`, users default to rows/20),
+    then ingest, transform, `_compute_mau` alone and report each run in a fresh
+    process. Per stage the results record wall/CPU seconds, peak RSS of that process,
+    rows in/out and rows per second. The JSON (`out_path`) also carries the commit and
+    package versions so runs can be compared across commits (`compare_results`).
+    """
+    from .synth import write_events_csv
+
+    sizes = [parse_size(s) for s in sizes]
+    tmp = workdir is None
+    root = Path(tempfile.mkdtemp(prefix="tlt-bench-")) if tmp else Path(workdir)
+    root.mkdir(parents=True, exist_ok=True)
+    results: list[dict[str, Any]] = []
+    try:
+        for n in sizes:
+            d = root / size_label(n)
+            d.mkdir(parents=True, exist_ok=True)
+            csv_path, events, agg = d / "events.csv", d / "events.parquet", d / "agg.parquet"
+            users = n_users or max(1_000, n // 20)
+
+            start = time.perf_counter()
+            write_events_csv(csv_path, n, n_users=users, days=days, seed=seed)
+            if progress:
+                progress(f"{size_label(n)}: generated in {time.perf_counter() - start:.1f}s")
+
+            stages = {
+                "ingest": (_stage_ingest, csv_path, events),
+                "transform": (_stage_transform, events, agg, mau_window),
+                "compute_mau": (_stage_compute_mau, events, mau_window),
+                "report": (_stage_report, agg, events, d / "reports"),
+            }
+            for stage in STAGES:
+                fn, *args = stages[stage]
+                r = _in_child(fn, *args)
+                r.update(
+                    size=n,
+                    stage=stage,
+                    rows_in=n,
+                    rows_per_s=n / r["wall_s"] if r["wall_s"] > 0 else None,
+                )
+                results.append(r)
+                if progress:
+                    progress(_format_row(r))
+            if not keep:
+                shutil.rmtree(d, ignore_errors=True)
+    finally:
+        if tmp and not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    doc = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {"seed": seed, "n_users": n_users, "days": days, "mau_window": mau_window},
+        "environment": _environment(),
+        "results": results,
+    }
+    if out_path is not None:
+        out_path = Path(out_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    return doc
+
+
+def _format_row(r: dict[str, Any]) -> str:
+    rss = f"{r['peak_rss_mb']:8.0f} MB" if r["peak_rss_mb"] is not None else "       n/a"
+    return (
+        f"{size_label(r['size']):>6} {r['stage']:<12} {r['wall_s']:8.2f}s wall "
+        f"{r['cpu_s']:8.2f}s cpu {rss}  {r['rows_per_s'] or 0:12,.0f} rows/s"
+    )
+
+
+def compare_results(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """One line per (size, stage) present in both: wall time and peak RSS vs baseline."""
+    base = {(r["size"], r["stage"]): r for r in baseline["results"]}
+    lines = []
+    for r in current["results"]:
+        b = base.get((r["size"], r["stage"]))
+        if b is None:
+            continue
+        wall = r["wall_s"] / b["wall_s"] if b["wall_s"] else float("nan")
+        line = f"{size_label(r['size']):>6} {r['stage']:<12} wall x{wall:5.2f}"
+        if r.get("peak_rss_mb") and b.get("peak_rss_mb"):
+            line += f"  rss x{r['peak_rss_mb'] / b['peak_rss_mb']:5.2f}"
+        lines.append(line)
+    return lines
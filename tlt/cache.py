@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from .fsutil import write_atomic
+
+# Stdlib only: `tlt cache stats` must not pay for pandas/pyarrow imports.
+
+DEFAULT_MAX_BYTES = 2 << 30
+ENTRY_META = "meta.json"
+# Stored as "output" + the output's suffix: writers pick the format by extension (.arrow)
+ENTRY_OUTPUT = "output"
+
+
+def default_cache_dir() -> Path:
+    """`$TLT_CACHE_DIR`, else `$XDG_CACHE_HOME/tlt`, else `~/.cache/tlt`."""
+    if os.environ.get("TLT_CACHE_DIR"):
+        return Path(os.environ["TLT_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "tlt"
+
+
+def code_version() -> str:
+    """Package version plus a digest of the tlt sources, so code edits invalidate entries."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        v = version("telemetry-dashboard")
+    except PackageNotFoundError:
+        v = "unknown"
+    digest = hashlib.sha256()
+    for src in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(src.name.encode())
+        digest.update(src.read_bytes())
+    return f"{v}+{digest.hexdigest()[:12]}"
+
+
+def _files_under(path: Path) -> list[Path]:
+    if path.is_file():
+        return [path]
+    return sorted(p for p in path.rglob("*") if p.is_file())
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(path: Path, hash_content: bool = False) -> list:
+    """
+    Per-file fingerprints of a file or directory input.
+
+    Default is (relative name, size, mtime_ns) — cheap, but a touch invalidates it.
+    With `hash_content`, (relative name, size, sha256): identical bytes hit the cache
+    wherever and whenever they were written.
+    """
+    path = Path(path)
+    out = []
+    for f in _files_under(path):
+        rel = f.name if f == path else f.relative_to(path).as_posix()
+        st = f.stat()
+        out.append([rel, st.st_size, _sha256(f) if hash_content else st.st_mtime_ns])
+    return out
+
+
+def _link_or_copy(src: str | Path, dst: str | Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:  # other filesystem, or links unsupported
+        shutil.copy2(src, dst)
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _materialize(src: Path, out_path: Path) -> None:
+    """
+    Hard-link `src` at `out_path`. Directories are overlaid child by child (the same
+    `date=` partition replaces the existing one, others stay), like the stages write them.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if src.is_dir():
+        if out_path.exists() and not out_path.is_dir():
+            out_path.unlink()
+        out_path.mkdir(exist_ok=True)
+        for child in src.iterdir():
+            target = out_path / child.name
+            _remove(target)
+            if child.is_dir():
+                shutil.copytree(child, target, copy_function=_link_or_copy)
+            else:
+                _link_or_copy(child, target)
+    else:
+        _remove(out_path)
+        _link_or_copy(src, out_path)
+
+
+def _entry_output(out_path: str | Path) -> str:
+    return ENTRY_OUTPUT + Path(out_path).suffix
+
+
+def _tree_stats(path: Path) -> dict[str, list[int]]:
+    stats = {}
+    for f in _files_under(path):
+        st = f.stat()
+        stats[f.relative_to(path).as_posix() if path.is_dir() else ""] = [
+            st.st_size,
+            st.st_mtime_ns,
+        ]
+    return stats
+
+
+class StageCache:
+    """
+    Content-addressed cache of stage outputs (`<dir>/<key[:2]>/<key>/output`).
+
+    A key covers the stage name, its parameters, the code version and the input
+    fingerprints. Outputs are materialized with hard links (copies across devices).
+    Because a hard-linked output could later be rewritten in place, a hit first checks
+    that the cached files still have the size/mtime recorded at store time; a mismatch
+    drops the entry. Total size is kept under `max_bytes` by evicting the least
+    recently used entries.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        hash_content: bool = False,
+    ) -> None:
+        self.dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+
+    # -- keys ---------------------------------------------------------------
+
+    def key(
+        self,
+        stage: str,
+        inputs: Iterable[str | Path],
+        params: dict[str, Any],
+        suffix: str = "",
+    ) -> str:
+        """Entry key; `suffix` is the output's extension, which can select its format."""
+        payload = {
+            "stage": stage,
+            "version": code_version(),
+            "params": params,
+            "inputs": [fingerprint(Path(p), self.hash_content) for p in inputs],
+        }
+        if suffix:
+            payload["suffix"] = suffix
+        blob = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.dir / key[:2] / key
+
+    def _entries(self) -> list[tuple[Path, dict]]:
+        found = []
+        for meta_path in self.dir.glob(f"*/*/{ENTRY_META}"):
+            try:
+                found.append((meta_path.parent, json.loads(meta_path.read_text("utf-8"))))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return found
+
+    # -- hit / store --------------------------------------------------------
+
+    def restore(self, key: str, out_path: str | Path) -> dict | None:
+        """Materialize a cached output at `out_path`; returns its metadata, None on a miss."""
+        entry = self._entry(key)
+        try:
+            meta = json.loads((entry / ENTRY_META).read_text("utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        cached = entry / _entry_output(out_path)
+        if not cached.exists() or _tree_stats(cached) != meta["files"]:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        _materialize(cached, Path(out_path))
+        meta["last_used"] = time.time()
+        meta["hits"] = meta.get("hits", 0) + 1
+        self._write_meta(entry, meta)
+        return meta
+
+    def run(
+        self,
+        stage: str,
+        inputs: Iterable[str | Path],
+        params: dict[str, Any],
+        out_path: str | Path,
+        produce: Callable[[Path], Any],
+    ) -> tuple[Any, bool]:
+        """
+        Restore `stage`'s output from the cache, or run `produce(staging_path)`, store
+        what it wrote and materialize it at `out_path`.
+
+        `produce` may return a JSON-serializable note (e.g. per-file failures) that is
+        kept with the entry; returns (note, hit). Outputs larger than `max_bytes` are
+        materialized without being cached.
+        """
+        key = self.key(stage, list(inputs), params, Path(out_path).suffix)
+        meta = self.restore(key, out_path)
+        if meta is not None:
+            return meta.get("note"), True
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(prefix="staging-", dir=self.dir))
+        try:
+            # Same extension as `out_path`, so `produce` writes the same format
+            staged = staging_dir / _entry_output(out_path)
+            note = produce(staged)
+            files = _tree_stats(staged)
+            size = sum(n for n, _ in files.values())
+            if size > self.max_bytes:
+                _materialize(staged, Path(out_path))
+                return note, False
+
+            now = time.time()
+            meta = {
+                "stage": stage,
+                "created": now,
+                "last_used": now,
+                "hits": 0,
+                "bytes": size,
+                "files": files,
+                "note": note,
+            }
+            self._write_meta(staging_dir, meta)
+            entry = self._entry(key)
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging_dir, entry)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        self.evict(keep=key)
+        _materialize(entry / _entry_output(out_path), Path(out_path))
+        return note, False
+
+    @staticmethod
+    def _write_meta(entry: Path, meta: dict) -> None:
+        write_atomic(entry / ENTRY_META, json.dumps(meta, sort_keys=True))
+
+    # -- maintenance --------------------------------------------------------
+
+    def evict(self, keep: str | None = None) -> int:
+        """Drop least recently used entries until the cache fits `max_bytes`."""
+        entries = sorted(self._entries(), key=lambda e: e[1].get("last_used", 0))
+        total = sum(meta.get("bytes", 0) for _, meta in entries)
+        removed = 0
+        for entry, meta in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= meta.get("bytes", 0)
+            removed += 1
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries()
+        by_stage: dict[str, dict[str, int]] = {}
+        for _, meta in entries:
+            s = by_stage.setdefault(meta.get("stage", "?"), {"entries": 0, "bytes": 0, "hits": 0})
+            s["entries"] += 1
+            s["bytes"] += meta.get("bytes", 0)
+            s["hits"] += meta.get("hits", 0)
+        return {
+            "dir": str(self.dir),
+            "entries": len(entries),
+            "bytes": sum(s["bytes"] for s in by_stage.values()),
+            "hits": sum(s["hits"] for s in by_stage.values()),
+            "max_bytes": self.max_bytes,
+            "stages": by_stage,
+        }
+
+    def clear(self) -> int:
+        """Remove every entry (and stale staging dirs); returns the number of entries."""
+        n = len(self._entries())
+        if self.dir.exists():
+            for child in self.dir.iterdir():
+                _remove(child)
+        return n
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import multiprocessing
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.figure import Figure
+
+from . import metrics
+from .cache import code_version
+
+# PNG text key holding the input hash a chart was drawn from (`Chart.digest`); a chart
+# whose file already carries its current hash is not drawn again
+DIGEST_KEY = "tlt:inputs"
+# Shape-preserving reductions of long series before plotting (`downsample`)
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+@dataclass(frozen=True)
+class Chart:
+    """
+    One PNG of a report: `draw(fig, *args)` fills a fresh `Figure` (object-oriented API,
+    no pyplot state, so charts can render in any process) and returns False when there
+    is nothing to draw. `name` is the file's path relative to the report directory.
+
+    `draw` must be a module-level function and `args` picklable (pandas objects,
+    numbers, strings) for process-pool rendering.
+    """
+
+    name: str
+    draw: Callable[..., bool | None]
+    args: tuple[Any, ...] = ()
+
+    def digest(self) -> str:
+        """Hash of the drawing code, matplotlib version and every input value."""
+        h = hashlib.sha256()
+        for part in (self.name, f"{self.draw.__module__}.{self.draw.__qualname__}", _versions()):
+            h.update(part.encode())
+        for value in self.args:
+            _update(h, value)
+        return h.hexdigest()
+
+
+@functools.cache
+def _versions() -> str:
+    return f"{code_version()} matplotlib={matplotlib.__version__}"
+
+
+def _update(h, value: Any) -> None:
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        if isinstance(value, pd.DataFrame):
+            h.update(repr((list(value.columns), value.dtypes.astype(str).tolist())).encode())
+        else:
+            h.update(repr((value.name, str(value.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _update(h, item)
+    else:
+        h.update(repr(value).encode())
+
+
+def default_max_points() -> int:
+    """A chart's width in pixels at matplotlib's default figure size and dpi."""
+    width, _ = matplotlib.rcParams["figure.figsize"]
+    return int(width * matplotlib.rcParams["figure.dpi"])
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int, method: str = "lttb") -> np.ndarray:
+    """
+    Sorted indices of at most `max_points` points of the series (x ascending; datetimes
+    allowed) that keep its visual shape; all indices if it is already short enough.
+
+    "lttb" (Largest-Triangle-Three-Buckets) keeps the first and last points and, per
+    bucket, the point forming the largest triangle with the previous pick and the next
+    bucket's mean. "minmax" keeps both end points and each bucket's minimum and
+    maximum (every spike survives, at half the horizontal resolution).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling {method!r}: use one of {list(DOWNSAMPLE_METHODS)}.")
+    if max_points < 4:
+        raise ValueError("max_points must be at least 4.")
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    x = x.astype(np.float64)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    return _lttb(x, y, max_points) if method == "lttb" else _minmax(y, max_points)
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, k: int) -> np.ndarray:
+    n = len(y)
+    # k - 2 buckets over the interior points; bucket i is [edges[i], edges[i + 1])
+    edges = (np.arange(k - 1) * ((n - 2) / (k - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    out = np.empty(k, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(k - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_hi = edges[i + 2] if i + 2 < k - 1 else n
+        avg_x, avg_y = x[hi:nxt_hi].mean(), y[hi:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _minmax(y: np.ndarray, k: int) -> np.ndarray:
+    n = len(y)
+    # Two picks per bucket plus both end points (the x range stays the same)
+    buckets = (k - 2) // 2
+    starts = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(starts))
+    order = np.lexsort((y, bucket))  # by bucket, then value
+    picks = [[0], order[starts[:-1]], order[starts[1:] - 1], [n - 1]]
+    return np.unique(np.concatenate(picks))
+
+
+def _render(chart: Chart, out_dir: Path, digest: str) -> bool:
+    fig = Figure()
+    path = out_dir / chart.name
+    if chart.draw(fig, *chart.args) is False:
+        # A chart drawn from older inputs would otherwise outlive them (with its digest)
+        path.unlink(missing_ok=True)
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, metadata={DIGEST_KEY: digest})
+    return True
+
+
+def stored_digest(path: str | Path) -> str | None:
+    """The input hash a chart PNG was drawn from (None if missing or not ours)."""
+    from PIL import Image
+
+    try:
+        # Text chunks precede the image data: reading them does not decode pixels
+        with Image.open(path) as im:
+            return im.info.get(DIGEST_KEY)
+    except (OSError, ValueError):
+        return None
+
+
+def render_charts(
+    charts: Sequence[Chart], out_dir: str | Path, workers: int = 1, reuse: bool = True
+) -> dict[str, str]:
+    """
+    Write `charts` into `out_dir`, in a process pool of `workers` (1 = in this process).
+
+    With `reuse=True`, a chart whose file was drawn from the same inputs
+    (`Chart.digest`, stored in the PNG's metadata) is skipped. Returns each chart's
+    status: "rendered", "unchanged" or "empty" (nothing to draw; no file written, and
+    any earlier file of that chart removed).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer.")
+    status: dict[str, str] = {}
+    todo: list[tuple[Chart, str]] = []
+    with metrics.phase("report.chart_hashes", rows_in=len(charts)):
+        for chart in charts:
+            digest = chart.digest()
+            if reuse and stored_digest(out_dir / chart.name) == digest:
+                status[chart.name] = "unchanged"
+            else:
+                todo.append((chart, digest))
+
+    with metrics.phase("report.render", rows_in=len(todo)) as ph:
+        if workers == 1 or len(todo) <= 1:
+            drawn = [_render(chart, out_dir, digest) for chart, digest in todo]
+        else:
+            ctx = multiprocessing.get_context("spawn")  # no fork() under Arrow's thread pools
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=ctx) as pool:
+                futures = [pool.submit(_render, chart, out_dir, digest) for chart, digest in todo]
+                drawn = [f.result() for f in futures]
+        ph.rows_out = sum(drawn)
+
+    for (chart, _), ok in zip(todo, drawn):
+        status[chart.name] = "rendered" if ok else "empty"
+    return {c.name: status[c.name] for c in charts}
@@ -1,13 +1,12 @@
 from __future__ import annotations
 
+import functools
 from pathlib import Path
 from inspect import signature
 import click
 
-from .ingest import ingest_csv
-from .transform import transform_parquet
-from .report import make_reports
-from . import size as size_mod
+# Subcommands import their modules (pandas, pyarrow, matplotlib) only when they run,
+# so `tlt --help`, `tlt size` and health checks start fast.
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
 
@@ -19,8 +18,198 @@ def _call_with_supported_args(func, /, *args, **kwargs):
     return func(*args, **filtered)
 
 
+def _filter_options(func):
+    """--since/--until/--feature, pushed down to partition pruning and row-group stats."""
+    func = click.option(
+        "--feature",
+        "features",
+        multiple=True,
+        help="Only include this feature_id (repeatable).",
+    )(func)
+    func = click.option(
+        "--until",
+        default=None,
+        metavar="YYYY-MM-DD",
+        help="Last day to include (UTC, inclusive).",
+    )(func)
+    func = click.option(
+        "--since",
+        default=None,
+        metavar="YYYY-MM-DD",
+        help="First day to include (UTC, inclusive).",
+    )(func)
+    return func
+
+
+def _cache_options(func):
+    """--cache/--cache-dir/--cache-hash/--cache-max-mb, passed on as one `cache` argument."""
+
+    @functools.wraps(func)
+    def wrapper(*args, cache, cache_dir, cache_hash, cache_max_mb, **kwargs):
+        stage_cache = None
+        if cache or cache_dir is not None:
+            from .cache import StageCache
+
+            stage_cache = StageCache(
+                cache_dir, max_bytes=cache_max_mb << 20, hash_content=cache_hash
+            )
+        return func(*args, cache=stage_cache, **kwargs)
+
+    wrapper = click.option(
+        "--cache-max-mb",
+        type=click.IntRange(min=1),
+        default=2048,
+        show_default=True,
+        help="Evict least recently used cache entries beyond this size.",
+    )(wrapper)
+    wrapper = click.option(
+        "--cache-hash",
+        is_flag=True,
+        default=False,
+        help="Key the cache on input content hashes instead of size + mtime.",
+    )(wrapper)
+    wrapper = click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        default=None,
+        help="Stage cache directory (implies --cache; default $TLT_CACHE_DIR or ~/.cache/tlt).",
+    )(wrapper)
+    wrapper = click.option(
+        "--cache",
+        is_flag=True,
+        default=False,
+        help="Reuse this stage's output when inputs, parameters and tlt version are unchanged.",
+    )(wrapper)
+    return wrapper
+
+
+# Same as tlt.layout.CODECS, which is not imported here to keep --help light
+CODEC_CHOICES = ("auto", "zstd", "snappy", "gzip", "brotli", "lz4", "none")
+
+
+def _layout_options(func):
+    """Parquet layout flags, passed on as one `write_options` (tlt.layout.WriteOptions)."""
+
+    @functools.wraps(func)
+    def wrapper(
+        *args,
+        codec,
+        compression_level,
+        row_group_rows,
+        statistics,
+        page_index,
+        sort_by,
+        bloom_filter,
+        **kwargs,
+    ):
+        from .layout import WriteOptions
+
+        try:
+            options = WriteOptions(
+                codec=codec,
+                level=compression_level,
+                row_group_rows=row_group_rows,
+                statistics=statistics,
+                page_index=page_index,
+                sort_by=sort_by or (),
+                bloom_filter=bloom_filter,
+            )
+        except ValueError as e:
+            raise click.UsageError(str(e)) from e
+        return func(*args, write_options=options, **kwargs)
+
+    wrapper = click.option(
+        "--bloom-filter",
+        multiple=True,
+        metavar="COLUMN",
+        help="Write a Parquet bloom filter for this column (repeatable, e.g. user_id).",
+    )(wrapper)
+    wrapper = click.option(
+        "--sort-by",
+        default=None,
+        metavar="COLS",
+        help="Order rows within row groups by these columns (e.g. feature_id,timestamp).",
+    )(wrapper)
+    wrapper = click.option(
+        "--page-index",
+        is_flag=True,
+        default=False,
+        help="Write the Parquet page index (page-level statistics).",
+    )(wrapper)
+    wrapper = click.option(
+        "--statistics/--no-statistics",
+        default=True,
+        show_default=True,
+        help="Write min/max column statistics (used to skip row groups on filtered reads).",
+    )(wrapper)
+    wrapper = click.option(
+        "--row-group-rows",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Max rows per Parquet row group.",
+    )(wrapper)
+    wrapper = click.option(
+        "--compression-level",
+        type=int,
+        default=None,
+        help="Codec compression level (e.g. zstd 1-22).",
+    )(wrapper)
+    wrapper = click.option(
+        "--codec",
+        type=click.Choice(CODEC_CHOICES),
+        default="auto",
+        show_default=True,
+        help="Compression codec (auto: zstd, else snappy; for .arrow/.feather outputs "
+        "auto means uncompressed and only none/lz4/zstd apply).",
+    )(wrapper)
+    return wrapper
+
+
+def _metrics_options(func):
+    """--metrics-json/--metrics-prom/--profile: record the command's phases (off by default)."""
+
+    @functools.wraps(func)
+    def wrapper(*args, metrics_json, metrics_prom, profile, **kwargs):
+        if metrics_json is None and metrics_prom is None and profile is None:
+            return func(*args, **kwargs)
+        from .metrics import recording
+
+        command = click.get_current_context().info_name
+        try:
+            with recording(command, metrics_json, metrics_prom, profile):
+                return func(*args, **kwargs)
+        finally:
+            for path in (metrics_json, metrics_prom, profile):
+                if path is not None:
+                    click.echo(f"Wrote: {path}", err=True)
+
+    wrapper = click.option(
+        "--profile",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=None,
+        help="Run under cProfile and dump the stats here (view with snakeviz or pstats).",
+    )(wrapper)
+    wrapper = click.option(
+        "--metrics-prom",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=None,
+        help="Write per-phase metrics in Prometheus textfile format.",
+    )(wrapper)
+    wrapper = click.option(
+        "--metrics-json",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=None,
+        help="Write per-phase wall/CPU time, peak RSS and rows as JSON.",
+    )(wrapper)
+    return wrapper
+
+
+def _echo_written(path: Path, hit: bool) -> None:
+    click.echo(f"Restored from cache: {path}" if hit else f"Wrote: {path}")
+
+
 @click.group(
-    help="Telemetry pipeline CLI: ingest → transform → report.",
+    help="Telemetry pipeline CLI: ingest → transform → report (or all three via run).",
     context_settings=CONTEXT_SETTINGS,
 )
 @click.version_option(package_name="telemetry-dashboard")
@@ -32,71 +221,358 @@ def cli() -> None:
 @click.option(
     "--input",
     "-i",
-    "input_path",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    "inputs",
+    type=str,
+    multiple=True,
     required=True,
-    help="Input CSV with columns: timestamp,user_id,event,feature_id[,latency_ms]",
+    help=(
+        "Input CSV with columns: timestamp,user_id,event,feature_id[,latency_ms]. "
+        "Repeatable; also accepts a directory or a quoted glob (e.g. 'logs/*.csv')."
+    ),
 )
 @click.option(
     "--out",
     "-o",
     "out_path",
-    type=click.Path(dir_okay=False, path_type=Path),
+    type=click.Path(path_type=Path),
     required=True,
-    help="Output Parquet path (parent dir will be created).",
+    help="Output Parquet path (.arrow/.feather: Arrow IPC file), or directory with "
+    "--partitioned (parent dir will be created).",
+)
+@click.option(
+    "--chunk-rows",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stream the CSV in chunks of N rows (bounded memory; external sort).",
+)
+@click.option(
+    "--sort/--no-sort",
+    default=True,
+    show_default=True,
+    help="Sort events by timestamp before writing.",
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    default=False,
+    help="Write a hive-style date=YYYY-MM-DD/ dataset directory instead of one file.",
+)
+@click.option(
+    "--dictionary",
+    is_flag=True,
+    default=False,
+    help="Store event/feature_id as dictionary columns and user_id as int codes.",
 )
-def ingest_cmd(input_path: Path, out_path: Path) -> None:
-    """Read CSV → write Parquet."""
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Parse multiple input files in N processes (default: CPU count).",
+)
+@click.option(
+    "--ts-format",
+    default=None,
+    metavar="FORMAT",
+    help="Declared timestamp format: 'iso8601z' or a strftime (e.g. '%Y-%m-%d %H:%M:%S'). "
+    "Skips per-value format inference.",
+)
+@_layout_options
+@_metrics_options
+@_cache_options
+def ingest_cmd(
+    inputs: tuple[str, ...],
+    out_path: Path,
+    chunk_rows: int | None,
+    sort: bool,
+    partitioned: bool,
+    dictionary: bool,
+    workers: int | None,
+    ts_format: str | None,
+    cache,
+    write_options,
+) -> None:
+    """Read CSV(s) → write Parquet."""
+    from .ingest import _resolve_inputs, ingest_csv, ingest_files
+
+    kwargs = dict(
+        chunk_rows=chunk_rows,
+        sort=sort,
+        partitioned=partitioned,
+        dictionary=dictionary,
+        ts_format=ts_format,
+        write_options=write_options,
+    )
+    single = len(inputs) == 1 and Path(inputs[0]).is_file()
+
+    def produce(out: Path) -> dict[str, str]:
+        if single:
+            _call_with_supported_args(ingest_csv, Path(inputs[0]), out, **kwargs)
+            return {}
+        return ingest_files(inputs, out, workers=workers, **kwargs)[1]
+
     try:
-        p = _call_with_supported_args(ingest_csv, input_path, out_path)
-        click.echo(f"Wrote: {p}")
+        # The user dictionary depends on earlier ingests into the output: never cached
+        if cache is None or dictionary:
+            failures, hit = produce(out_path), False
+        else:
+            files = [Path(inputs[0])] if single else _resolve_inputs(inputs)
+            params = {**kwargs, "write_options": write_options.params()}
+            failures, hit = cache.run("ingest", files, params, out_path, produce)
+        _echo_written(out_path, hit)
     except Exception as e:
         raise click.ClickException(str(e)) from e
 
+    for name, err in failures.items():
+        click.echo(f"Failed: {name}: {err}", err=True)
+    if failures:
+        raise click.ClickException(f"{len(failures)} input file(s) failed; see above.")
+
 
 @cli.command("transform", short_help="Aggregate daily metrics")
 @click.option(
     "--in",
     "in_path",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    type=click.Path(exists=True, path_type=Path),
     required=True,
-    help="Input Parquet from ingest step.",
+    help="Input Parquet file or partitioned directory from ingest step.",
 )
 @click.option(
     "--out",
     "out_path",
-    type=click.Path(dir_okay=False, path_type=Path),
+    type=click.Path(path_type=Path),
     required=True,
-    help="Output aggregated Parquet (parent dir will be created).",
+    help="Output aggregated Parquet (.arrow/.feather: Arrow IPC file), or directory with "
+    "--partitioned (parent dir will be created).",
 )
 @click.option(
     "--mau-window",
-    type=int,
-    default=30,
+    type=str,
+    default="30",
+    show_default=True,
+    help="Rolling MAU window(s) in days, comma-separated (e.g. 7,28,30). Forwarded if supported.",
+)
+@click.option(
+    "--approx",
+    is_flag=True,
+    default=False,
+    help="Estimate DAU/MAU with HyperLogLog sketches (~1% error) and store them per row.",
+)
+@click.option(
+    "--latency-sketch",
+    is_flag=True,
+    default=False,
+    help="Store a mergeable latency quantile sketch per row (p50/p95/p99 within 1% in report).",
+)
+@click.option(
+    "--partitioned",
+    is_flag=True,
+    default=False,
+    help="Write the aggregates as a date=YYYY-MM-DD/ dataset directory.",
+)
+@click.option(
+    "--normalized",
+    is_flag=True,
+    default=False,
+    help="Write per-day (dau, mau_*) and per (date, feature_id) metrics as separate "
+    "days/features tables in the --out directory instead of one flat table.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Only re-aggregate changed input partitions (state kept in <out>.state/).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
     show_default=True,
-    help="Rolling MAU window (days). Forwarded if supported.",
+    help="Aggregate date shards in N worker processes (1 = serial).",
 )
-def transform_cmd(in_path: Path, out_path: Path, mau_window: int) -> None:
+@click.option(
+    "--engine",
+    type=click.Choice(["pandas", "arrow"]),
+    default="pandas",
+    show_default=True,
+    help="Aggregation backend: arrow runs pyarrow.compute group-by kernels on the Arrow "
+    "table (multithreaded; same output, no --workers/--incremental).",
+)
+@_filter_options
+@_layout_options
+@_metrics_options
+@_cache_options
+def transform_cmd(
+    in_path: Path,
+    out_path: Path,
+    mau_window: str,
+    approx: bool,
+    latency_sketch: bool,
+    partitioned: bool,
+    normalized: bool,
+    incremental: bool,
+    workers: int,
+    engine: str,
+    since: str | None,
+    until: str | None,
+    features: tuple[str, ...],
+    cache,
+    write_options,
+) -> None:
     """Aggregate metrics: events/day+feature, DAU/day, optional p50/p95 latency, and MAU."""
-    try:
-        p = _call_with_supported_args(
+    from .transform import transform_parquet
+
+    # workers/engine only change how the output is computed, not what it is: not cache params
+    params = dict(
+        mau_window=mau_window,
+        approx=approx,
+        latency_sketch=latency_sketch,
+        partitioned=partitioned,
+        normalized=normalized,
+        since=since,
+        until=until,
+        features=list(features) or None,
+    )
+
+    def produce(out: Path) -> None:
+        _call_with_supported_args(
             transform_parquet,
+            in_path,
+            out,
+            incremental=incremental,
+            workers=workers,
+            engine=engine,
+            write_options=write_options,
+            **params,
+        )
+
+    try:
+        # Incremental runs keep their own state store next to the output
+        if cache is None or incremental:
+            produce(out_path)
+            hit = False
+        else:
+            layout = {"write_options": write_options.params()}
+            _, hit = cache.run("transform", [in_path], {**params, **layout}, out_path, produce)
+        _echo_written(out_path, hit)
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+
+
+@cli.command("rollup", short_help="Build hour/day/week/month rollup tables")
+@click.option(
+    "--in",
+    "in_path",
+    type=click.Path(exists=True, path_type=Path),
+    required=True,
+    help="Input Parquet file or partitioned directory from ingest step.",
+)
+@click.option(
+    "--out",
+    "out_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Output directory (<level>.parquet per level + rollup.json).",
+)
+@click.option(
+    "--levels",
+    default="hour,day,week,month",
+    show_default=True,
+    help="Levels to store, comma-separated; coarser ones are derived from these at query time.",
+)
+@_filter_options
+@_layout_options
+@_metrics_options
+def rollup_cmd(
+    in_path: Path,
+    out_dir: Path,
+    levels: str,
+    since: str | None,
+    until: str | None,
+    features: tuple[str, ...],
+    write_options,
+) -> None:
+    """Aggregate raw events once into per-hour/day/week/month rollups with mergeable sketches."""
+    from .rollup import build_rollup
+
+    try:
+        build_rollup(
+            in_path,
+            out_dir,
+            levels=levels,
+            since=since,
+            until=until,
+            features=list(features) or None,
+            write_options=write_options,
+        )
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Wrote: {out_dir}")
+
+
+@cli.command("retention", short_help="Cohort retention matrix")
+@click.option(
+    "--in",
+    "in_path",
+    type=click.Path(exists=True, path_type=Path),
+    required=True,
+    help="Input Parquet file or partitioned directory from ingest step.",
+)
+@click.option(
+    "--out",
+    "out_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="Output Parquet file (cohort, day, users, cohort_users, retention).",
+)
+@click.option(
+    "--days",
+    "max_days",
+    type=click.IntRange(min=0),
+    default=30,
+    show_default=True,
+    help="Days since first seen to track per cohort.",
+)
+@_filter_options
+@_layout_options
+@_metrics_options
+def retention_cmd(
+    in_path: Path,
+    out_path: Path,
+    max_days: int,
+    since: str | None,
+    until: str | None,
+    features: tuple[str, ...],
+    write_options,
+) -> None:
+    """
+    Share of each first-seen-date cohort active N days later. --since selects cohorts
+    (users seen earlier are not new); --until and --feature limit the events read.
+    """
+    from .retention import compute_retention
+
+    try:
+        compute_retention(
             in_path,
             out_path,
-            mau_window=mau_window,
+            max_days=max_days,
+            since=since,
+            until=until,
+            features=list(features) or None,
+            write_options=write_options,
         )
-        click.echo(f"Wrote: {p}")
     except Exception as e:
         raise click.ClickException(str(e)) from e
+    click.echo(f"Wrote: {out_path}")
 
 
 @cli.command("report", short_help="Generate charts + metrics")
 @click.option(
     "--in",
     "in_path",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    type=click.Path(exists=True, path_type=Path),
     required=True,
-    help="Input aggregated Parquet from transform step.",
+    help="Input aggregated Parquet file or partitioned directory from transform step "
+    "(or a rollup directory from tlt rollup).",
 )
 @click.option(
     "--out",
@@ -108,33 +584,513 @@ def transform_cmd(in_path: Path, out_path: Path, mau_window: int) -> None:
 @click.option(
     "--events",
     "events_path",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    type=click.Path(exists=True, path_type=Path),
     required=False,
     help="(Optional) Raw events Parquet for per-feature latency plots and better latency stats.",
 )
-def report_cmd(in_path: Path, out_dir: Path, events_path: Path | None) -> None:
+@click.option(
+    "--latency-source",
+    type=click.Choice(["auto", "summary", "events"]),
+    default="auto",
+    show_default=True,
+    help="Latency-by-feature chart from transform's p5..p95 summaries or from raw --events "
+    "(auto: --events when given, else summaries).",
+)
+@click.option(
+    "--granularity",
+    type=click.Choice(["hour", "day", "week", "month"]),
+    default=None,
+    help="Report per period from a rollup directory (--in), using its smallest suitable level.",
+)
+@click.option(
+    "--feature-charts",
+    is_flag=True,
+    default=False,
+    help="Also draw features/<feature_id>.png per feature (daily events, p50/p95).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Render charts in N worker processes (1 = serial).",
+)
+@click.option(
+    "--redraw",
+    is_flag=True,
+    default=False,
+    help="Redraw every chart, even those whose inputs are unchanged since the last report.",
+)
+@click.option(
+    "--max-points",
+    type=click.IntRange(min=4),
+    default=None,
+    help="Downsample each time-series line to at most N points (default: chart width in px).",
+)
+@click.option(
+    "--downsample",
+    type=click.Choice(["lttb", "minmax"]),
+    default="lttb",
+    show_default=True,
+    help="Shape-preserving downsampling: largest-triangle-three-buckets or per-bucket min/max.",
+)
+@click.option(
+    "--retention",
+    "retention_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    required=False,
+    help="(Optional) Matrix from tlt retention, drawn as retention.png.",
+)
+@_filter_options
+@_metrics_options
+@_cache_options
+def report_cmd(
+    in_path: Path,
+    out_dir: Path,
+    events_path: Path | None,
+    latency_source: str,
+    granularity: str | None,
+    feature_charts: bool,
+    workers: int,
+    redraw: bool,
+    max_points: int | None,
+    downsample: str,
+    retention_path: Path | None,
+    since: str | None,
+    until: str | None,
+    features: tuple[str, ...],
+    cache,
+) -> None:
     """Generate text and chart reports from aggregated Parquet."""
+    from .report import make_reports
+
+    # workers/redraw only change how the charts are drawn, not what they are: not cache params
+    params = dict(
+        events=events_path is not None,
+        latency_source=latency_source,
+        granularity=granularity,
+        feature_charts=feature_charts,
+        max_points=max_points,
+        downsample=downsample,
+        retention=retention_path is not None,
+        since=since,
+        until=until,
+        features=list(features) or None,
+    )
+
+    def produce(out: Path) -> None:
+        _call_with_supported_args(
+            make_reports,
+            in_path,
+            out,
+            events_path=events_path,
+            latency_source=latency_source,
+            granularity=granularity,
+            feature_charts=feature_charts,
+            workers=workers,
+            reuse=not redraw,
+            max_points=max_points,
+            downsample=downsample,
+            retention_path=retention_path,
+            since=since,
+            until=until,
+            features=params["features"],
+        )
+
+    try:
+        if cache is None:
+            produce(out_dir)
+            hit = False
+        else:
+            inputs = [in_path] + [p for p in (events_path, retention_path) if p]
+            _, hit = cache.run("report", inputs, params, out_dir, produce)
+        click.echo(f"{'Restored reports from cache' if hit else 'Wrote reports to'}: {out_dir}")
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+
+
+@cli.command("run", short_help="ingest → transform → report in one process")
+@click.option(
+    "--input",
+    "-i",
+    "input_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    required=True,
+    help="Input CSV with columns: timestamp,user_id,event,feature_id[,latency_ms]",
+)
+@click.option(
+    "--out-dir",
+    "out_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Output directory for reports (and intermediate Parquet with --keep-intermediate).",
+)
+@click.option(
+    "--mau-window",
+    type=str,
+    default="30",
+    show_default=True,
+    help="Rolling MAU window(s) in days, comma-separated (e.g. 7,28,30).",
+)
+@click.option("--approx", is_flag=True, default=False, help="HyperLogLog DAU/MAU (see transform).")
+@click.option(
+    "--latency-sketch",
+    is_flag=True,
+    default=False,
+    help="Store mergeable latency sketches (see transform).",
+)
+@click.option(
+    "--keep-intermediate",
+    is_flag=True,
+    default=False,
+    help="Also write events.parquet and agg.parquet into --out-dir.",
+)
+@click.option(
+    "--ts-format",
+    default=None,
+    metavar="FORMAT",
+    help="Declared timestamp format (see ingest).",
+)
+@_layout_options
+@_metrics_options
+def run_cmd(
+    input_path: Path,
+    out_dir: Path,
+    mau_window: str,
+    approx: bool,
+    latency_sketch: bool,
+    keep_intermediate: bool,
+    ts_format: str | None,
+    write_options,
+) -> None:
+    """Run the whole pipeline in memory (no Parquet round-trips) and print stage timings."""
+    from .pipeline import run_pipeline
+
+    try:
+        p, timings = run_pipeline(
+            input_path,
+            out_dir,
+            mau_window=mau_window,
+            approx=approx,
+            latency_sketch=latency_sketch,
+            keep_intermediate=keep_intermediate,
+            ts_format=ts_format,
+            write_options=write_options,
+        )
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Wrote reports to: {p}")
+    for stage, secs in timings.items():
+        click.echo(f"  {stage:<10} {secs:8.3f}s")
+    click.echo(f"  {'total':<10} {sum(timings.values()):8.3f}s")
+
+
+@cli.command("watch", short_help="Tail growing CSVs into a partitioned store")
+@click.option(
+    "--input",
+    "-i",
+    "sources",
+    type=click.Path(path_type=Path),
+    multiple=True,
+    required=True,
+    help="CSV file to follow, or spool directory whose *.csv files are picked up (repeatable).",
+)
+@click.option(
+    "--out",
+    "-o",
+    "out_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Date-partitioned output directory (offsets are kept in <out>.watch.json).",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0),
+    default=5.0,
+    show_default=True,
+    help="Seconds between polls.",
+)
+@click.option(
+    "--once",
+    is_flag=True,
+    default=False,
+    help="Ingest what is there now and exit (e.g. from cron).",
+)
+@click.option(
+    "--days",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Event days kept in the live aggregates.",
+)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Rewrite the live aggregates here after every batch (Parquet, readable by report).",
+)
+@click.option(
+    "--ts-format",
+    default=None,
+    metavar="FORMAT",
+    help="Declared timestamp format (see ingest).",
+)
+@_layout_options
+def watch_cmd(
+    sources: tuple[Path, ...],
+    out_dir: Path,
+    interval: float,
+    once: bool,
+    days: int,
+    snapshot_path: Path | None,
+    ts_format: str | None,
+    write_options,
+) -> None:
+    """Follow CSV files / spool directories and append new lines in micro-batches."""
+    from .watch import Watcher
+
+    def echo(r: dict) -> None:
+        span = f"{r['days'][0]}..{r['days'][-1]}" if r["days"] else "-"
+        click.echo(
+            f"batch {r['seq']}: {r['rows']} rows ({r['rejected']} rejected) "
+            f"from {r['files']} file(s), days {span}, {r['wall_s']:.2f}s"
+        )
+
+    try:
+        watcher = Watcher(
+            sources,
+            out_dir,
+            ts_format=ts_format,
+            days=days,
+            snapshot_path=snapshot_path,
+            write_options=write_options,
+        )
+        watcher.run(interval=interval, once=once, on_batch=echo)
+    except KeyboardInterrupt:
+        click.echo("Stopped.", err=True)
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+
+
+@cli.command("synth", short_help="Generate a synthetic events CSV")
+@click.option("--rows", default="1M", show_default=True, help="Row count (e.g. 250k, 1M, 100M).")
+@click.option(
+    "--out",
+    "-o",
+    "out_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="Output CSV path.",
+)
+@click.option("--users", type=click.IntRange(min=1), default=100_000, show_default=True)
+@click.option("--features", type=click.IntRange(min=1), default=8, show_default=True)
+@click.option("--days", type=click.IntRange(min=1), default=30, show_default=True)
+@click.option(
+    "--feature-skew",
+    type=float,
+    default=1.1,
+    show_default=True,
+    help="Zipf exponent of feature popularity (0 = uniform).",
+)
+@click.option(
+    "--user-skew",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Zipf exponent of user activity (0 = uniform).",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+def synth_cmd(
+    rows: str,
+    out_path: Path,
+    users: int,
+    features: int,
+    days: int,
+    feature_skew: float,
+    user_skew: float,
+    seed: int,
+) -> None:
+    """Seeded, vectorized synthetic telemetry (same columns and latency model as the sample)."""
+    from .bench import parse_size
+    from .synth import write_events_csv
+
     try:
-        p = _call_with_supported_args(make_reports, in_path, out_dir, events_path=events_path)
-        click.echo(f"Wrote reports to: {p}")
+        p = write_events_csv(
+            out_path,
+            parse_size(rows),
+            n_users=users,
+            n_features=features,
+            days=days,
+            feature_skew=feature_skew,
+            user_skew=user_skew,
+            seed=seed,
+        )
     except Exception as e:
         raise click.ClickException(str(e)) from e
+    click.echo(f"Wrote: {p}")
 
 
-@cli.command("size", short_help="Compare CSV vs Parquet sizes")
+@cli.command("bench", short_help="Benchmark the pipeline on synthetic data")
 @click.option(
-    "--csv", "csv_path", type=click.Path(exists=True, dir_okay=False, path_type=Path), required=True
+    "--sizes",
+    default="1M",
+    show_default=True,
+    help="Comma-separated row counts, e.g. 1M,10M,100M.",
+)
+@click.option(
+    "--out",
+    "out_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write machine-readable results (JSON) here.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Earlier results JSON to compare against.",
+)
+@click.option(
+    "--workdir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Where generated data goes (default: a temp dir).",
+)
+@click.option("--keep", is_flag=True, default=False, help="Keep the generated data.")
+@click.option("--users", type=click.IntRange(min=1), default=None, help="Default: rows / 20.")
+@click.option("--days", type=click.IntRange(min=1), default=30, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+def bench_cmd(
+    sizes: str,
+    out_path: Path | None,
+    baseline: Path | None,
+    workdir: Path | None,
+    keep: bool,
+    users: int | None,
+    days: int,
+    seed: int,
+) -> None:
+    """Time + memory-profile ingest, transform, MAU and report at each size."""
+    import json
+
+    from .bench import compare_results, run_benchmarks
+
+    try:
+        doc = run_benchmarks(
+            [s for s in sizes.split(",") if s.strip()],
+            out_path=out_path,
+            workdir=workdir,
+            seed=seed,
+            n_users=users,
+            days=days,
+            keep=keep,
+            progress=click.echo,
+        )
+        if baseline is not None:
+            click.echo(f"vs {baseline}:")
+            for line in compare_results(doc, json.loads(baseline.read_text(encoding="utf-8"))):
+                click.echo(f"  {line}")
+    except Exception as e:
+        raise click.ClickException(str(e)) from e
+    if out_path is not None:
+        click.echo(f"Wrote: {out_path}")
+
+
+@cli.group("cache", short_help="Inspect or clear the stage cache")
+def cache_group() -> None:
+    """Stage cache used by ingest/transform/report --cache."""
+
+
+def _cache_dir_option(func):
+    return click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        default=None,
+        help="Stage cache directory (default $TLT_CACHE_DIR or ~/.cache/tlt).",
+    )(func)
+
+
+@cache_group.command("stats")
+@_cache_dir_option
+def cache_stats_cmd(cache_dir: Path | None) -> None:
+    """Entries, size and hits per stage."""
+    from .cache import StageCache
+    from .size import _fmt
+
+    stats = StageCache(cache_dir).stats()
+    click.echo(f"Cache: {stats['dir']}")
+    click.echo(f"Entries: {stats['entries']}  Size: {_fmt(stats['bytes'])}  Hits: {stats['hits']}")
+    for stage, s in sorted(stats["stages"].items()):
+        size = _fmt(s["bytes"])
+        click.echo(f"  {stage:<10} {s['entries']:>5} entries  {size:>10}  {s['hits']} hits")
+
+
+@cache_group.command("clear")
+@_cache_dir_option
+def cache_clear_cmd(cache_dir: Path | None) -> None:
+    """Remove every cache entry."""
+    from .cache import StageCache
+
+    cache = StageCache(cache_dir)
+    click.echo(f"Removed {cache.clear()} entries from {cache.dir}")
+
+
+@cli.command("size", short_help="Compare CSV vs Parquet (vs Arrow IPC) sizes")
+@click.option(
+    "--csv",
+    "csv_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Source CSV (required unless --bench-codecs).",
 )
 @click.option(
     "--parquet",
     "parquet_path",
-    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    type=click.Path(exists=True, path_type=Path),
     required=True,
+    help="Parquet file (or, with --bench-codecs, a partitioned directory).",
+)
+@click.option(
+    "--ipc",
+    "ipc_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Arrow IPC (.arrow/.feather) copy of the same data to include in the comparison.",
+)
+@click.option(
+    "--bench-codecs",
+    is_flag=True,
+    default=False,
+    help="Rewrite a sample with each codec/layout (Parquet and Arrow IPC) and compare "
+    "size, write and read time.",
 )
-def size_cmd(csv_path: Path, parquet_path: Path) -> None:
+@click.option(
+    "--sample-rows",
+    type=click.IntRange(min=1),
+    default=1_000_000,
+    show_default=True,
+    help="Rows of --parquet to benchmark with --bench-codecs.",
+)
+def size_cmd(
+    csv_path: Path | None,
+    parquet_path: Path,
+    ipc_path: Path | None,
+    bench_codecs: bool,
+    sample_rows: int,
+) -> None:
+    from . import size as size_mod
+
+    if csv_path is None and not bench_codecs:
+        raise click.UsageError("--csv is required (unless --bench-codecs).")
     try:
-        txt = size_mod.compare(csv_path, parquet_path)
-        click.echo(txt)
+        if csv_path is not None:
+            if parquet_path.is_dir():
+                raise ValueError(f"Not a Parquet file: {parquet_path}")
+            click.echo(size_mod.compare(csv_path, parquet_path, ipc_path))
+        if bench_codecs:
+            results = size_mod.bench_codecs(parquet_path, sample_rows=sample_rows)
+            click.echo(size_mod.format_codec_bench(results))
     except Exception as e:
         raise click.ClickException(str(e)) from e
 
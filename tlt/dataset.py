@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .layout import WriteOptions, dataset_write_kwargs, is_ipc
+
+# Hive-style `date=YYYY-MM-DD/` directories; the key is kept as a plain string on disk
+PARTITION_COL = "date"
+DATE_PARTITIONING = ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive")
+
+
+# Normalized aggregates (`transform --normalized`): one directory holding both tables,
+# each `<name>.parquet` or a partitioned `<name>/` directory
+DAY_TABLE = "days"
+FEATURE_TABLE = "features"
+# Arrow timestamp unit -> ticks per day
+UNITS_PER_DAY = {"s": 86_400, "ms": 86_400_000, "us": 86_400_000_000, "ns": 86_400_000_000_000}
+
+
+def is_partitioned(path: str | Path) -> bool:
+    """A directory is read as a date-partitioned dataset; anything else as one Parquet file."""
+    return Path(path).is_dir()
+
+
+def table_path(path: str | Path, name: str) -> Path | None:
+    """Where table `name` of a normalized aggregate output lives (None if it has none)."""
+    for candidate in (Path(path) / f"{name}.parquet", Path(path) / name):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def is_normalized(path: str | Path) -> bool:
+    return Path(path).is_dir() and table_path(path, FEATURE_TABLE) is not None
+
+
+def to_utc_day(value: str | pd.Timestamp) -> pd.Timestamp:
+    """Parse a --since/--until style value as a UTC day (midnight)."""
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return ts.floor("D")
+
+
+def utc_day_numbers(ts: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """UTC days since epoch per row of an Arrow timestamp column (naive taken as UTC)."""
+    if not pa.types.is_timestamp(ts.type):
+        raise ValueError("Day numbers need a timestamp column (as written by ingest).")
+    if ts.null_count:
+        raise ValueError("Some timestamps could not be parsed.")
+    days = pc.floor_temporal(ts, unit="day").cast(pa.timestamp(ts.type.unit)).cast(pa.int64())
+    return days.to_numpy() // UNITS_PER_DAY[ts.type.unit]
+
+
+def as_utc_timestamps(values: pd.Series) -> pd.Series:
+    """
+    `values` as tz-aware UTC datetimes (unparseable -> NaT).
+
+    Ingest already stores `timestamp[UTC]`, so that case is returned as-is instead
+    of being parsed again; other timezones are converted, strings parsed.
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return values if str(dtype.tz) == "UTC" else values.dt.tz_convert("UTC")
+    return pd.to_datetime(values, utc=True, errors="coerce")
+
+
+def with_partition_key(df: pd.DataFrame, source: str = "timestamp") -> pd.DataFrame:
+    """Copy of `df` whose `date` column is the YYYY-MM-DD string of `source`."""
+    day = as_utc_timestamps(df[source]).dt.strftime("%Y-%m-%d")
+    return df.assign(**{PARTITION_COL: day.astype("string")})
+
+
+def write_partitioned(
+    data: pa.Table | Iterable[pa.RecordBatch],
+    out_dir: str | Path,
+    schema: pa.Schema | None = None,
+    options: WriteOptions | None = None,
+    batch_id: str | None = None,
+) -> Path:
+    """
+    Write `data` (already carrying a string `date` key) as a hive-partitioned dataset.
+
+    Partitions present in `data` replace any existing files for those dates; other
+    dates already in `out_dir` are left alone. Single-threaded so row order is kept.
+    `options` sets the file layout (`tlt.layout.WriteOptions`; default: auto codec).
+
+    With `batch_id`, files are added next to the existing ones as
+    `part-<batch_id>-<i>.parquet` instead (writing the same batch again overwrites them).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    options = options or WriteOptions()
+    basename = "part-{i}.parquet" if batch_id is None else f"part-{batch_id}-{{i}}.parquet"
+    if isinstance(data, pa.Table):
+        schema, rows = data.schema, data.num_rows
+        data = options.sort(data)
+    else:
+        rows = None
+        data = (options.sort(batch) for batch in data)
+    ds.write_dataset(
+        data,
+        out_dir,
+        schema=schema,
+        **dataset_write_kwargs(options, schema, rows),
+        partitioning=DATE_PARTITIONING,
+        existing_data_behavior="delete_matching" if batch_id is None else "overwrite_or_ignore",
+        basename_template=basename,
+        use_threads=False,
+    )
+    return out_dir
+
+
+def open_dataset(path: str | Path) -> ds.Dataset:
+    if is_partitioned(path):
+        return ds.dataset(path, format="parquet", partitioning=DATE_PARTITIONING)
+    if is_ipc(path):
+        return ds.dataset(read_ipc(path))
+    return ds.dataset(path, format="parquet")
+
+
+def read_ipc(path: str | Path) -> pa.Table:
+    """
+    An Arrow IPC file through a memory map. Uncompressed buffers are used in place
+    (zero-copy, pages shared with other readers through the OS page cache); lz4/zstd
+    files are decompressed into memory.
+    """
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def build_filter(
+    schema: pa.Schema,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    days: Sequence[str] | None = None,
+) -> ds.Expression | None:
+    """
+    Pushdown filter for inclusive [since, until] days, a feature allow-list and an
+    explicit list of YYYY-MM-DD `days` (matched against a `date` column).
+
+    A string `date` (partition key) prunes whole directories; timestamp-typed `date`
+    or `timestamp` columns are compared directly so Parquet row-group statistics
+    can skip data inside files.
+    """
+    exprs = []
+    names = set(schema.names)
+    for bound, op in ((since, "ge"), (until, "le")):
+        if bound is None:
+            continue
+        day = to_utc_day(bound)
+        if PARTITION_COL in names:
+            col_type = schema.field(PARTITION_COL).type
+            if pa.types.is_string(col_type) or pa.types.is_large_string(col_type):
+                exprs.append(_cmp(ds.field(PARTITION_COL), op, day.strftime("%Y-%m-%d")))
+            elif pa.types.is_timestamp(col_type):
+                exprs.append(_cmp(ds.field(PARTITION_COL), op, pa.scalar(day, type=col_type)))
+        if "timestamp" in names:
+            ts_type = schema.field("timestamp").type
+            if op == "ge":
+                exprs.append(ds.field("timestamp") >= pa.scalar(day, type=ts_type))
+            else:
+                next_day = day + pd.Timedelta(days=1)
+                exprs.append(ds.field("timestamp") < pa.scalar(next_day, type=ts_type))
+    if features:
+        exprs.append(ds.field("feature_id").isin(list(features)))
+    if days is not None:
+        if PARTITION_COL not in names:
+            raise ValueError("Selecting explicit days needs a 'date' column or partitions.")
+        col_type = schema.field(PARTITION_COL).type
+        if pa.types.is_timestamp(col_type):
+            values = pa.array([to_utc_day(d) for d in days], type=col_type)
+        else:
+            values = pa.array([to_utc_day(d).strftime("%Y-%m-%d") for d in days], type=col_type)
+        exprs.append(ds.field(PARTITION_COL).isin(values))
+
+    expr = None
+    for e in exprs:
+        expr = e if expr is None else expr & e
+    return expr
+
+
+def _cmp(field: ds.Expression, op: str, value) -> ds.Expression:
+    return field >= value if op == "ge" else field <= value
+
+
+def read_table(
+    path: str | Path,
+    columns: Sequence[str] | None = None,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    days: Sequence[str] | None = None,
+) -> pa.Table:
+    """
+    Read a Parquet file, Arrow IPC file (`read_ipc`) or date-partitioned directory
+    with projection and pushdown (IPC files are filtered in memory).
+
+    A partition `date` key comes back as a day-floored `timestamp[UTC]`, matching what
+    `transform_parquet` writes into a single aggregated file.
+    """
+    dataset = open_dataset(path)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(
+        columns=columns, filter=build_filter(dataset.schema, since, until, features, days)
+    )
+    if PARTITION_COL in table.column_names:
+        i = table.schema.get_field_index(PARTITION_COL)
+        col = table.column(i)
+        if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+            unit = "us"
+            if "timestamp" in table.column_names:
+                unit = table.schema.field("timestamp").type.unit
+            day = pc.strptime(col, format="%Y-%m-%d", unit=unit).cast(pa.timestamp(unit, tz="UTC"))
+            table = _drop_pandas_meta(table, PARTITION_COL)
+            table = table.set_column(i, PARTITION_COL, day)
+    return table
+
+
+def _drop_pandas_meta(table: pa.Table, name: str) -> pa.Table:
+    """Forget pandas' stored dtype for `name` so to_pandas() keeps the Arrow type."""
+    meta = table.schema.metadata or {}
+    if b"pandas" not in meta:
+        return table
+    info = json.loads(meta[b"pandas"])
+    info["columns"] = [c for c in info.get("columns", []) if c.get("name") != name]
+    return table.replace_schema_metadata({**meta, b"pandas": json.dumps(info).encode()})
+
+
+def read_frame(
+    path: str | Path,
+    columns: Sequence[str] | None = None,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    days: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """`read_table(...)` as a pandas DataFrame."""
+    return read_table(path, columns, since, until, features, days).to_pandas()
+
+
+def read_aggregates(
+    path: str | Path,
+    columns: Sequence[str] | None = None,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Aggregated (date, feature_id) rows in the flat layout: per-day dau/mau_* repeated on
+    every feature row. A normalized output is joined back into it (compatibility view);
+    a flat one is read as-is.
+    """
+    if not is_normalized(path):
+        return read_frame(path, columns, since, until, features)
+    rows = read_frame(table_path(path, FEATURE_TABLE), columns, since, until, features)
+    days = read_frame(table_path(path, DAY_TABLE), since=since, until=until)
+    if columns is not None:
+        days = days[[c for c in days.columns if c == "date" or c in columns]]
+    tail = [c for c in ("users_hll",) if c in rows.columns]
+    out = rows.drop(columns=tail).merge(days, on="date", how="left")
+    return out.join(rows[tail]) if tail else out
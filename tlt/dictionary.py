@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .fsutil import atomic_path
+
+# Low-cardinality labels stored as Parquet/Arrow dictionary columns (pandas category)
+CATEGORY_COLUMNS = ("event", "feature_id")
+
+
+def user_dictionary_path(events_path: str | Path) -> Path:
+    """
+    Where the user_id dictionary for an events file/dataset lives.
+
+    Inside a partitioned directory it is `_user_ids.parquet` (the leading underscore
+    keeps dataset discovery from reading it as events); next to a single file it is
+    `<name>.user_ids.parquet`.
+    """
+    events_path = Path(events_path)
+    if events_path.is_dir() or not events_path.suffix:
+        return events_path / "_user_ids.parquet"
+    return events_path.with_suffix(".user_ids.parquet")
+
+
+def load_user_dictionary(path: str | Path) -> pd.Index:
+    """Known user ids; a user's integer code is its position in the index."""
+    path = Path(path)
+    if not path.exists():
+        return pd.Index([], dtype="string")
+    users = pd.read_parquet(path)
+    return pd.Index(users.sort_values("code")["user_id"].astype("string"))
+
+
+def load_user_codes(path: str | Path) -> dict[str, int]:
+    """`load_user_dictionary` as an append-only {user_id: code} map, for encoding."""
+    users = load_user_dictionary(path)
+    return dict(zip(users.tolist(), range(len(users))))
+
+
+def save_user_dictionary(users: Mapping[str, int] | pd.Index, path: str | Path) -> Path:
+    """Write `users` in code order (a `load_user_codes` map or a `load_user_dictionary` index)."""
+    labels = pd.Index(list(users), dtype="string")
+    with atomic_path(path) as tmp:
+        pd.DataFrame(
+            {"code": np.arange(len(labels), dtype=np.int64), "user_id": labels}
+        ).to_parquet(tmp, index=False)
+    return Path(path)
+
+
+def encode_users(values: pd.Series, users: dict[str, int]) -> np.ndarray:
+    """
+    Integer codes for `values`; ids not seen before get the next free code (`users`
+    is updated in place, append-only).
+
+    Existing codes never change, so codes from earlier ingests into the same
+    output stay valid. Only the chunk's distinct labels are looked up.
+    """
+    inverse, labels = pd.factorize(values, use_na_sentinel=False)
+    lookup = np.fromiter((users.setdefault(u, len(users)) for u in labels), np.int64, len(labels))
+    return lookup[inverse]
+
+
+def decode_users(codes: pd.Series | np.ndarray, users: pd.Index) -> pd.Series:
+    """Map integer user codes back to their original user_id labels."""
+    return pd.Series(users.take(np.asarray(codes, dtype=np.int64)), dtype="string")
+
+
+def encode_frame(df: pd.DataFrame, users: dict[str, int]) -> pd.DataFrame:
+    """user_id -> int64 codes (growing `users` in place), event/feature_id -> category."""
+    df = df.assign(user_id=encode_users(df["user_id"], users))
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .dataset import PARTITION_COL, read_frame, write_partitioned
+from .fsutil import write_atomic
+from .layout import WriteOptions
+from .transform import (
+    _approx_dau_mau,
+    _compute_mau,
+    feature_metrics,
+    _load_events,
+    _to_day_number,
+    _with_user_metrics,
+    _write_agg,
+)
+
+STATE_VERSION = 2
+MANIFEST = "manifest.json"
+ACTIVITY = "activity"  # date-partitioned distinct (date, user_id) pairs; exact MAU state
+
+
+def state_dir_for(out_path: str | Path) -> Path:
+    """The state store lives next to the aggregated output: `<out>.state/`."""
+    return Path(f"{out_path}.state")
+
+
+def _input_files(in_path: Path) -> dict[str, Path]:
+    if in_path.is_file():
+        return {in_path.name: in_path}
+    return {
+        p.relative_to(in_path).as_posix(): p
+        for p in sorted(in_path.rglob("*.parquet"))
+        if not any(part.startswith((".", "_")) for part in p.relative_to(in_path).parts)
+    }
+
+
+def _fingerprint(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _file_day(rel: str) -> str | None:
+    """The YYYY-MM-DD of a `date=...` partition path, or None for unpartitioned files."""
+    for part in rel.split("/"):
+        if part.startswith(f"{PARTITION_COL}="):
+            return part.split("=", 1)[1]
+    return None
+
+
+def _load_manifest(state_dir: Path) -> dict | None:
+    try:
+        manifest = json.loads((state_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("version") == STATE_VERSION else None
+
+
+def _save_manifest(state_dir: Path, manifest: dict) -> None:
+    write_atomic(state_dir / MANIFEST, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def _save_activity(store: Path, pairs: pd.DataFrame, days: pd.Series) -> None:
+    """Replace the `days` partitions of the activity store with `pairs` (other days kept)."""
+    for d in days:
+        shutil.rmtree(store / f"{PARTITION_COL}={d:%Y-%m-%d}", ignore_errors=True)
+    keyed = pd.DataFrame(
+        {
+            "user_id": pairs["user_id"].to_numpy(),
+            PARTITION_COL: pairs["date"].dt.strftime("%Y-%m-%d").astype("string").to_numpy(),
+        }
+    )
+    write_partitioned(pa.Table.from_pandas(keyed, preserve_index=False), store)
+
+
+def _load_activity(store: Path, touched: pd.Series, window: int, dtype) -> pd.DataFrame:
+    """The stored pairs the trailing-`window` MAU of the `touched` dates depends on."""
+    lo = touched.min() - pd.Timedelta(days=window - 1)
+    pairs = read_frame(store, since=lo, until=touched.max())
+    return pairs.assign(date=pairs["date"].astype(dtype))[["date", "user_id"]]
+
+
+def _touched_dates(all_dates: pd.Series, changed: pd.Series, window: int) -> pd.Series:
+    """Dates whose trailing `window`-day MAU includes at least one changed day."""
+    if changed.empty:
+        return all_dates.iloc[:0]
+    t = _to_day_number(all_dates)
+    c = np.sort(_to_day_number(changed))
+    i = np.searchsorted(c, t, side="right") - 1
+    hit = (i >= 0) & (t - c[np.maximum(i, 0)] < window)
+    return all_dates[hit]
+
+
+def transform_incremental(
+    in_path: Path,
+    out_path: Path,
+    windows: list[int],
+    approx: bool,
+    latency_sketch: bool,
+    partitioned: bool,
+    write_options: WriteOptions | None = None,
+) -> Path:
+    """
+    Re-aggregate only the days whose input files changed since the last run.
+
+    The state store records each input file's (size, mtime) fingerprint and, for exact
+    MAU, the distinct (date, user_id) activity pairs of every day, partitioned by date.
+    A rerun reads only the changed `date=` partitions, recomputes DAU for those days and
+    MAU for the dates whose trailing window covers them, and upserts the rows into the
+    existing output. Only the changed days of the activity state are rewritten, and only
+    the days those MAU windows span are read back. Params changes, unpartitioned inputs
+    or a missing output fall back to a full run.
+    """
+    state_dir = state_dir_for(out_path)
+    manifest = _load_manifest(state_dir)
+    params = {
+        "mau_window": windows,
+        "approx": approx,
+        "latency_sketch": latency_sketch,
+        "partitioned": partitioned,
+    }
+    files = {rel: _fingerprint(p) for rel, p in _input_files(in_path).items()}
+    old_files = manifest["files"] if manifest else {}
+    changed = {
+        rel for rel in files.keys() | old_files.keys() if files.get(rel) != old_files.get(rel)
+    }
+    changed_days = {_file_day(rel) for rel in changed}
+
+    full = (
+        manifest is None
+        or manifest["params"] != params
+        or not out_path.exists()
+        or None in changed_days
+        or (not approx and not (state_dir / ACTIVITY).exists())
+    )
+    if not full and not changed:
+        return out_path
+
+    if full:
+        df = _load_events(in_path)
+        kept = None
+        days = df["date"].drop_duplicates()
+    else:
+        day_strs = sorted(d for d in changed_days if d is not None)
+        df = _load_events(in_path, days=day_strs)
+        days = pd.Series(pd.to_datetime(day_strs, utc=True)).astype(df["date"].dtype)
+        existing = read_frame(out_path)
+        kept = existing[~existing["date"].isin(days)]
+
+    new_rows = feature_metrics(df, approx, latency_sketch)
+    if kept is not None:
+        base = pd.concat([kept[list(new_rows.columns)], new_rows], ignore_index=True)
+    else:
+        base = new_rows
+    base = base.sort_values(["date", "feature_id"], kind="stable").reset_index(drop=True)
+
+    all_dates = base["date"].drop_duplicates().sort_values().reset_index(drop=True)
+    touched = all_dates if full else _touched_dates(all_dates, days, windows[-1])
+
+    state_dir.mkdir(parents=True, exist_ok=True)
+    if approx:
+        per_touched = _approx_dau_mau(base, windows, only=touched)
+    else:
+        store = state_dir / ACTIVITY
+        pairs = df[["date", "user_id"]].drop_duplicates()
+        if full:
+            shutil.rmtree(store, ignore_errors=True)
+        _save_activity(store, pairs, days)
+
+        if full or not len(touched):
+            scope = pairs
+        else:
+            scope = _load_activity(store, touched, windows[-1], df["date"].dtype)
+        dau = scope.groupby("date").size().rename("dau").reset_index()
+        per_touched = dau.merge(_compute_mau(scope, window_days=windows), on="date")
+        per_touched = per_touched[per_touched["date"].isin(touched)]
+
+    day_cols = [c for c in per_touched.columns if c != "date"]
+    if kept is not None:
+        untouched = kept[~kept["date"].isin(touched)].groupby("date", as_index=False)[day_cols]
+        per_day = pd.concat([untouched.first(), per_touched], ignore_index=True)
+    else:
+        per_day = per_touched
+    agg = _with_user_metrics(base, per_day)
+
+    if partitioned and not full:
+        # Only rewrite partitions whose rows changed; drop days that vanished upstream
+        for d in days[~days.isin(all_dates)]:
+            shutil.rmtree(out_path / f"{PARTITION_COL}={d:%Y-%m-%d}", ignore_errors=True)
+        _write_agg(agg[agg["date"].isin(touched)], out_path, partitioned, write_options)
+    else:
+        if out_path.is_dir():
+            shutil.rmtree(out_path)
+        out_path.unlink(missing_ok=True)
+        _write_agg(agg, out_path, partitioned, write_options)
+
+    _save_manifest(state_dir, {"version": STATE_VERSION, "params": params, "files": files})
+    return out_path
@@ -1,9 +1,183 @@
 from __future__ import annotations
+import csv
+import glob
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
+from . import metrics
+from .dataset import PARTITION_COL, with_partition_key, write_partitioned
+from .dictionary import (
+    CATEGORY_COLUMNS,
+    encode_frame,
+    load_user_codes,
+    save_user_dictionary,
+    user_dictionary_path,
+)
+from .layout import Sink, WriteOptions, open_sink, write_frame, write_table
 
-def ingest_csv(input_path: str | Path, out_path: str | Path) -> Path:
+REQUIRED_COLUMNS = ("timestamp", "user_id", "event", "feature_id")
+ID_COLUMNS = ("user_id", "event", "feature_id")
+# Stable dtypes; avoid "object" surprises in groupbys
+CSV_DTYPES = {col: "string" for col in ID_COLUMNS}
+# Named timestamp formats for `ts_format` (anything else containing "%" is a strftime)
+TS_FORMATS = ("iso8601z",)
+
+# Max runs merged at once by the streaming ingest's external sort
+MERGE_FAN_IN = 16
+MIN_RUN_GROUP_ROWS = 8192
+# Output row-group size of multi-file merges when chunk_rows is not given
+DEFAULT_MERGE_ROWS = 1 << 20
+# Sorted runs and intermediate merges are read back once: skip compression
+RUN_OPTIONS = WriteOptions(codec="none")
+
+
+def check_columns(columns) -> None:
+    """ValueError unless `columns` has every REQUIRED_COLUMNS name."""
+    missing = set(REQUIRED_COLUMNS) - set(columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {sorted(missing)}")
+
+
+def check_ts_format(ts_format: str | None) -> None:
+    """ValueError unless `ts_format` is None, one of TS_FORMATS or a strftime format."""
+    if ts_format is not None and ts_format not in TS_FORMATS and "%" not in ts_format:
+        raise ValueError(
+            f"Unknown ts_format {ts_format!r}: use one of {list(TS_FORMATS)} or a strftime format."
+        )
+
+
+def _parse_timestamps(values: pd.Series, ts_format: str | None) -> pd.Series:
+    """
+    Parse timestamp strings to tz-aware UTC; unparseable values become NaT.
+
+    Without a declared format pandas infers it per value (slow on mixed input).
+    `iso8601z` uses Arrow's vectorized ISO-8601 cast; a strftime format uses Arrow's
+    `strptime` (naive results are taken as UTC).
+    """
+    if ts_format is None:
+        return pd.to_datetime(values, utc=True, errors="coerce")
+    arr = pa.array(values, type=pa.string(), from_pandas=True)
+    if ts_format == "iso8601z":
+        try:
+            parsed = arr.cast(pa.timestamp("us", "UTC"))
+        except pa.ArrowInvalid:
+            # Some rows are bad: let pandas pinpoint them (NaT) for the error count
+            return pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+    else:
+        parsed = pc.strptime(arr, format=ts_format, unit="us", error_is_null=True)
+        if parsed.type.tz is None:
+            parsed = pc.assume_timezone(parsed, "UTC")
+        parsed = parsed.cast(pa.timestamp("us", "UTC"))
+    return pd.Series(parsed.to_pandas(), index=values.index, name=values.name)
+
+
+def normalize_frame(
+    df: pd.DataFrame, ts_format: str | None = None
+) -> tuple[pd.DataFrame, int, list[str]]:
+    """
+    Normalize one frame in place-ish and report problems instead of raising.
+
+    Returns (df, n_bad_timestamps, columns_with_null_or_empty_ids) so the eager
+    and streaming paths can share the exact same rules.
+    """
+    # Normalize timestamp to tz-aware UTC
+    with metrics.phase("ingest.parse_timestamps", rows_in=len(df)):
+        df["timestamp"] = _parse_timestamps(df["timestamp"], ts_format)
+        n_bad_ts = int(df["timestamp"].isna().sum())
+
+    with metrics.phase("ingest.validate", rows_in=len(df)):
+        # Coerce latency if present (non-fatal; rows keep NaN where invalid). Always
+        # float64: a streamed chunk can't know whether later ones have NaNs/decimals
+        if "latency_ms" in df.columns:
+            df["latency_ms"] = pd.to_numeric(df["latency_ms"], errors="coerce").astype("float64")
+
+        # Enforce non-null for key identifiers
+        bad_cols = [col for col in ID_COLUMNS if _missing_ids(df[col]).any()]
+    return df, n_bad_ts, bad_cols
+
+
+def _missing_ids(values: pd.Series) -> pd.Series:
+    return values.isna() | (values.astype("string").str.len() == 0)
+
+
+def valid_rows(df: pd.DataFrame) -> pd.Series:
+    """Rows of a `normalize_frame`d frame that pass the rules `_raise_for_problems` enforces."""
+    ok = df["timestamp"].notna()
+    for col in ID_COLUMNS:
+        ok &= ~_missing_ids(df[col])
+    return ok
+
+
+def _raise_for_problems(n_bad_ts: int, bad_cols: list[str]) -> None:
+    if n_bad_ts:
+        raise ValueError(f"{n_bad_ts} timestamps could not be parsed.")
+    for col in ID_COLUMNS:
+        if col in bad_cols:
+            raise ValueError(f"Column '{col}' contains null/empty values.")
+
+
+def parse_csv(source, names: list[str] | None = None) -> pd.DataFrame:
+    """pandas CSV read with CSV_DTYPES; `names` for header-less data (e.g. tailed lines)."""
+    return pd.read_csv(
+        source,
+        dtype=CSV_DTYPES,
+        header=None if names is not None else "infer",
+        names=names,
+        # Keep literal "NA" strings as data (not NaN); we’ll validate nulls explicitly
+        keep_default_na=False,
+    )
+
+
+def _read_csv(input_path: Path, ts_format: str | None = None) -> pd.DataFrame:
+    """Read one CSV eagerly and apply the shared validation rules."""
+    with metrics.phase("ingest.read") as ph:
+        df = parse_csv(input_path)
+        ph.rows_out = len(df)
+
+    # ---- Schema & null validation ----
+    check_columns(df.columns)
+    df, n_bad_ts, bad_cols = normalize_frame(df, ts_format)
+    _raise_for_problems(n_bad_ts, bad_cols)
+    return df
+
+
+def load_csv(
+    input_path: str | Path, sort: bool = True, ts_format: str | None = None
+) -> pd.DataFrame:
+    """
+    Read and validate a CSV into the normalized events frame `ingest_csv` writes,
+    without writing it (used by the in-memory `tlt run` pipeline).
+    """
+    check_ts_format(ts_format)
+    df = _read_csv(Path(input_path), ts_format)
+
+    # Deterministic order helps diffs and downstream expectations
+    if sort:
+        with metrics.phase("ingest.sort", rows_in=len(df)):
+            df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    return df
+
+
+def ingest_csv(
+    input_path: str | Path,
+    out_path: str | Path,
+    chunk_rows: int | None = None,
+    sort: bool = True,
+    partitioned: bool = False,
+    dictionary: bool = False,
+    ts_format: str | None = None,
+    write_options: WriteOptions | None = None,
+) -> Path:
     """
     Ingest a CSV of telemetry events and write normalized Parquet.
 
@@ -14,54 +188,508 @@ def ingest_csv(input_path: str | Path, out_path: str | Path) -> Path:
       - feature_id (string)
 
     Optional columns:
-      - latency_ms (numeric; coerced if present)
+      - latency_ms (numeric; coerced to float64 if present)
+
+    With `chunk_rows` set, the CSV is streamed through pyarrow's incremental reader
+    and validated/written `chunk_rows` rows at a time (see `_ingest_streaming`).
+    `sort=False` keeps input order and skips the timestamp sort.
+
+    With `partitioned=True`, `out_path` is a directory of hive-style `date=YYYY-MM-DD/`
+    partitions (UTC day of `timestamp`); re-ingesting a day replaces its partition.
+
+    With `dictionary=True`, `event`/`feature_id` are written as dictionary (categorical)
+    columns and `user_id` as int64 codes into a user dictionary persisted next to the
+    output (`tlt.dictionary.user_dictionary_path`); codes stay stable across ingests.
+
+    `ts_format` declares the timestamp format instead of inferring it per value:
+    "iso8601z" (e.g. 2025-01-01T12:00:00Z, fractions/offsets allowed) or an explicit
+    strftime such as "%Y-%m-%d %H:%M:%S" (taken as UTC unless it has %z). Values
+    that do not match count as unparseable timestamps.
+
+    `write_options` sets the Parquet layout (codec/level, row groups, statistics,
+    sort order, bloom filters; see `tlt.layout.WriteOptions`).
+
+    An `out_path` ending in .arrow/.feather/.ipc is written as an Arrow IPC file
+    instead (`tlt.layout.is_ipc`), which later stages read through a memory map.
     """
     input_path, out_path = Path(input_path), Path(out_path)
+    check_ts_format(ts_format)
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    options = write_options or WriteOptions()
 
-    # Read with stable dtypes; avoid "object" surprises in groupbys
-    df = pd.read_csv(
+    if chunk_rows is not None:
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be a positive integer.")
+        return _ingest_streaming(
+            input_path, out_path, chunk_rows, sort, partitioned, dictionary, ts_format, options
+        )
+
+    df = load_csv(input_path, sort=sort, ts_format=ts_format)
+
+    if dictionary:
+        users_path = user_dictionary_path(out_path)
+        with metrics.phase("ingest.encode", rows_in=len(df)):
+            users = load_user_codes(users_path)
+            df = encode_frame(df, users)
+
+    with metrics.phase("ingest.write", rows_in=len(df)):
+        if partitioned:
+            df = with_partition_key(df)
+        # The streaming path's schema, so both write the same column types
+        table = pa.Table.from_pandas(df, schema=chunk_schema(df), preserve_index=False)
+        if partitioned:
+            write_partitioned(table, out_path, options=options)
+        else:
+            write_table(table, out_path, options)
+    if dictionary:
+        save_user_dictionary(users, users_path)
+
+    return out_path
+
+
+# ---------------------------------------------------------------------------
+# Streaming ingest
+# ---------------------------------------------------------------------------
+
+
+def _read_header(input_path: Path) -> list[str]:
+    with open(input_path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _iter_chunks(input_path: Path, chunk_rows: int) -> Iterator[pa.Table]:
+    """Yield the CSV as Arrow tables of exactly `chunk_rows` rows (last one may be short)."""
+    # All columns as strings: types must not drift between blocks, and the pandas
+    # rules in `normalize_frame` do the actual coercion.
+    header = _read_header(input_path)
+    reader = pacsv.open_csv(
         input_path,
-        dtype={
-            "user_id": "string",
-            "event": "string",
-            "feature_id": "string",
-        },
-        # Keep literal "NA" strings as data (not NaN); we’ll validate nulls explicitly
-        keep_default_na=False,
+        read_options=pacsv.ReadOptions(block_size=max(1 << 16, min(chunk_rows * 128, 1 << 26))),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            strings_can_be_null=False,
+            null_values=[],
+        ),
     )
+    check_columns(reader.schema.names)
 
-    # ---- Schema & null validation ----
-    required = {"timestamp", "user_id", "event", "feature_id"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing required columns: {sorted(missing)}")
+    pending: list[pa.RecordBatch] = []
+    n_pending = 0
+    for batch in reader:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, n_pending = rest.to_batches(), rest.num_rows
+    if n_pending:
+        yield pa.Table.from_batches(pending)
 
-    # Normalize timestamp to tz-aware UTC
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    if df["timestamp"].isna().any():
-        n = int(df["timestamp"].isna().sum())
-        raise ValueError(f"{n} timestamps could not be parsed.")
-
-    # Coerce latency if present (non-fatal; rows keep NaN where invalid)
-    if "latency_ms" in df.columns:
-        df["latency_ms"] = pd.to_numeric(df["latency_ms"], errors="coerce")
-
-    # Enforce non-null for key identifiers
-    for col in ("user_id", "event", "feature_id"):
-        if df[col].isna().any() or (df[col].astype("string").str.len() == 0).any():
-            raise ValueError(f"Column '{col}' contains null/empty values.")
 
-    # Deterministic order helps diffs and downstream expectations
-    df = df.sort_values("timestamp").reset_index(drop=True)
+def _to_pandas_chunk(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas()
+    for col in ID_COLUMNS:
+        df[col] = df[col].astype("string")
+    return df
+
+
+def chunk_schema(df: pd.DataFrame) -> pa.Schema:
+    """Output schema, fixed from the first chunk so every row group matches."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for col in CATEGORY_COLUMNS:
+        i = schema.get_field_index(col)
+        if pa.types.is_dictionary(schema.field(i).type):
+            # Chunk-local category sets differ; pin one index/value type for all of them
+            schema = schema.set(i, pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+    return schema
+
+
+def _ingest_streaming(
+    input_path: Path,
+    out_path: Path,
+    chunk_rows: int,
+    sort: bool,
+    partitioned: bool,
+    dictionary: bool,
+    ts_format: str | None = None,
+    options: WriteOptions | None = None,
+) -> Path:
+    """
+    Bounded-memory ingest: validate one chunk at a time and write Parquet row groups.
+
+    Sorting is external: every chunk is sorted and spilled as a run, then the runs
+    are k-way merged (`_merge_runs`). Validation errors are the same as the eager
+    path; the whole file is still scanned so the reported counts match. Partitioned
+    output is streamed from the finished single file into date directories.
+    """
+    n_bad_ts = 0
+    bad_cols: set[str] = set()
+    schema: pa.Schema | None = None
+    options = options or WriteOptions()
 
-    # Prefer compression if available; fall back gracefully
+    if dictionary:
+        users_path = user_dictionary_path(out_path)
+        users = load_user_codes(users_path)
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="tlt-ingest-", dir=out_path.parent))
+    target = tmp_dir / "events.parquet" if partitioned else out_path
+    writer: Sink | None = None
+    runs: list[Path] = []
     try:
-        df.to_parquet(out_path, index=False, compression="zstd")
-    except Exception:
-        try:
-            df.to_parquet(out_path, index=False, compression="snappy")
-        except Exception:
-            df.to_parquet(out_path, index=False)
+        chunks = metrics.iter_phase(
+            "ingest.read", _iter_chunks(input_path, chunk_rows), lambda t: t.num_rows
+        )
+        for table in chunks:
+            df, bad_ts, cols = normalize_frame(_to_pandas_chunk(table), ts_format)
+            n_bad_ts += bad_ts
+            bad_cols.update(cols)
+            if n_bad_ts or bad_cols:
+                continue  # keep scanning for accurate counts, stop writing
+
+            if dictionary:
+                with metrics.phase("ingest.encode", rows_in=len(df)):
+                    df = encode_frame(df, users)
+            if schema is None:
+                schema = chunk_schema(df)
+            if sort:
+                with metrics.phase("ingest.sort", rows_in=len(df)):
+                    df = df.sort_values("timestamp", kind="stable")
+            chunk = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+            if sort:
+                run = tmp_dir / f"run-{len(runs):06d}.parquet"
+                with metrics.phase("ingest.spill", rows_in=chunk.num_rows):
+                    write_table(chunk, run, RUN_OPTIONS, row_group_rows=_run_group_rows(chunk_rows))
+                runs.append(run)
+            else:
+                with metrics.phase("ingest.write", rows_in=chunk.num_rows):
+                    if writer is None:
+                        writer = open_sink(target, schema, options)
+                    writer.write(chunk)
+
+        if writer is not None:
+            writer.close()
+            writer = None
+        _raise_for_problems(n_bad_ts, sorted(bad_cols))
+
+        if schema is None:
+            # Header-only CSV: same empty file the eager path would produce
+            empty = pd.DataFrame({c: pd.Series(dtype="string") for c in _read_header(input_path)})
+            empty, _, _ = normalize_frame(empty)
+            write_frame(empty, target, options)
+        elif sort:
+            _external_sort(runs, tmp_dir, target, schema, chunk_rows, options)
+
+        if partitioned:
+            _partition_file(target, out_path, options)
+        if dictionary:
+            save_user_dictionary(users, users_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        target.unlink(missing_ok=True)
+        raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     return out_path
+
+
+def _partition_file(src: Path, out_dir: Path, options: WriteOptions) -> None:
+    """Stream a single events file into date partitions, one row group at a time."""
+    pf = pq.ParquetFile(src)
+
+    def keyed() -> Iterator[pa.RecordBatch]:
+        for batch in pf.iter_batches():
+            day = pc.strftime(batch.column("timestamp"), format="%Y-%m-%d")
+            yield pa.RecordBatch.from_arrays(
+                [*batch.columns, day], names=[*batch.schema.names, PARTITION_COL]
+            )
+
+    schema = pf.schema_arrow.append(pa.field(PARTITION_COL, pa.string()))
+    with metrics.phase("ingest.partition", rows_in=pf.metadata.num_rows):
+        write_partitioned(keyed(), out_dir, schema=schema, options=options)
+
+
+def _run_group_rows(chunk_rows: int) -> int:
+    # A merge buffers one row group per run; keep MERGE_FAN_IN of them ~ one chunk,
+    # but not so small that per-round overhead dominates
+    return max(MIN_RUN_GROUP_ROWS, chunk_rows // MERGE_FAN_IN)
+
+
+def _external_sort(
+    runs: list[Path],
+    tmp_dir: Path,
+    out_path: Path,
+    schema: pa.Schema,
+    chunk_rows: int,
+    options: WriteOptions,
+    encode: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    out_schema: pa.Schema | None = None,
+) -> None:
+    """
+    Merge runs MERGE_FAN_IN at a time until one final merge writes `out_path`.
+
+    `options`, `encode` and `out_schema` only apply to the final merge (see `_merge_runs`).
+    """
+    level = 0
+    while len(runs) > MERGE_FAN_IN:
+        merged_runs = []
+        for start in range(0, len(runs), MERGE_FAN_IN):
+            group = runs[start : start + MERGE_FAN_IN]
+            if len(group) == 1:
+                merged_runs.append(group[0])
+                continue
+            dest = tmp_dir / f"merge-{level}-{start:06d}.parquet"
+            _merge_runs(group, dest, schema, _run_group_rows(chunk_rows), RUN_OPTIONS)
+            for r in group:
+                r.unlink()
+            merged_runs.append(dest)
+        runs = merged_runs
+        level += 1
+    _merge_runs(runs, out_path, out_schema or schema, chunk_rows, options, encode)
+
+
+def _merge_runs(
+    runs: list[Path],
+    out_path: Path,
+    schema: pa.Schema,
+    group_rows: int,
+    options: WriteOptions,
+    encode: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+) -> None:
+    """
+    K-way merge of timestamp-sorted runs into `out_path` (row groups of `group_rows`
+    unless `options` sets them).
+
+    Holds at most one row group per run in memory. Each round emits every buffered
+    row whose timestamp is <= the smallest "last buffered timestamp" across runs
+    that still have unread data — those rows can no longer be preceded by anything.
+    Runs may lack optional columns (written as nulls); `encode`, if given, maps each
+    merged block to `schema` (dictionary encoding of multi-file ingests).
+    """
+    files = [pq.ParquetFile(r) for r in runs]
+    next_group = [0] * len(files)
+    buffers: list[pd.DataFrame | None] = [None] * len(files)
+
+    def refill(i: int) -> None:
+        while (buffers[i] is None or buffers[i].empty) and next_group[i] < files[i].num_row_groups:
+            buffers[i] = files[i].read_row_group(next_group[i]).to_pandas()
+            next_group[i] += 1
+
+    with open_sink(out_path, schema, options, group_rows) as writer:
+        for i in range(len(files)):
+            refill(i)
+        while any(b is not None and not b.empty for b in buffers):
+            # A run's buffer bounds the merge only while more of that run is unread
+            bounds = [
+                b["timestamp"].iloc[-1]
+                for i, b in enumerate(buffers)
+                if b is not None and not b.empty and next_group[i] < files[i].num_row_groups
+            ]
+            bound = min(bounds) if bounds else None
+
+            out_parts = []
+            for i, b in enumerate(buffers):
+                if b is None or b.empty:
+                    continue
+                if bound is None:
+                    take = len(b)
+                else:
+                    take = int(b["timestamp"].searchsorted(bound, side="right"))
+                if take:
+                    out_parts.append(b.iloc[:take])
+                    buffers[i] = b.iloc[take:]
+                refill(i)
+
+            with metrics.phase("ingest.merge") as ph:
+                merged = pd.concat(out_parts, ignore_index=True)
+                merged = merged.sort_values("timestamp", kind="stable")
+                ph.rows_out = len(merged)
+            merged = merged.reindex(columns=schema.names)
+            if encode is not None:
+                with metrics.phase("ingest.encode", rows_in=len(merged)):
+                    merged = encode(merged)
+            with metrics.phase("ingest.write", rows_in=len(merged)):
+                writer.write(pa.Table.from_pandas(merged, schema=schema, preserve_index=False))
+
+
+# ---------------------------------------------------------------------------
+# Multi-file ingest
+# ---------------------------------------------------------------------------
+
+
+def _resolve_inputs(inputs: str | Path | Iterable[str | Path]) -> list[Path]:
+    """
+    Expand files, directories (every *.csv below them) and glob patterns.
+
+    Order is deterministic (sorted within each pattern/directory, then argument
+    order) and duplicates are dropped.
+    """
+    if isinstance(inputs, (str, Path)):
+        inputs = [inputs]
+    files: list[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matched = sorted(p for p in path.rglob("*.csv") if p.is_file())
+        elif path.exists():
+            matched = [path]
+        elif any(c in str(item) for c in "*?["):
+            matched = sorted(Path(p) for p in glob.glob(str(item), recursive=True))
+            matched = [p for p in matched if p.is_file()]
+        else:
+            raise ValueError(f"Input not found: {item}")
+        if not matched:
+            raise ValueError(f"No CSV files matched: {item}")
+        files.extend(matched)
+    return list(dict.fromkeys(files))
+
+
+def _ingest_file_run(
+    input_path: Path,
+    run_path: Path,
+    chunk_rows: int | None,
+    sort: bool,
+    group_rows: int,
+    ts_format: str | None,
+) -> str | None:
+    """
+    Worker: parse + validate one CSV into a (sorted) uncompressed run.
+
+    Returns the error message instead of raising so one bad file does not abort
+    the batch; the run is only left behind on success.
+    """
+    try:
+        if chunk_rows is not None:
+            _ingest_streaming(
+                input_path, run_path, chunk_rows, sort, False, False, ts_format, RUN_OPTIONS
+            )
+        else:
+            df = _read_csv(input_path, ts_format)
+            if sort:
+                with metrics.phase("ingest.sort", rows_in=len(df)):
+                    df = df.sort_values("timestamp", kind="stable")
+            with metrics.phase("ingest.spill", rows_in=len(df)):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                write_table(table, run_path, RUN_OPTIONS, row_group_rows=group_rows)
+    except Exception as e:
+        run_path.unlink(missing_ok=True)
+        return str(e) or type(e).__name__
+    return None
+
+
+def _encoded_schema(schema: pa.Schema) -> pa.Schema:
+    """Output schema of `encode_frame` applied to frames of `schema`."""
+    empty = encode_frame(schema.empty_table().to_pandas(), {})
+    return chunk_schema(empty)
+
+
+def _concat_runs(
+    runs: list[Path],
+    out_path: Path,
+    schema: pa.Schema,
+    options: WriteOptions,
+    encode: Callable[[pd.DataFrame], pd.DataFrame] | None,
+) -> None:
+    """Copy runs into `out_path` in order, one row group at a time (`sort=False`)."""
+    with open_sink(out_path, schema, options) as writer:
+        for run in runs:
+            pf = pq.ParquetFile(run)
+            for i in range(pf.num_row_groups):
+                df = pf.read_row_group(i).to_pandas().reindex(columns=schema.names)
+                if encode is not None:
+                    with metrics.phase("ingest.encode", rows_in=len(df)):
+                        df = encode(df)
+                with metrics.phase("ingest.write", rows_in=len(df)):
+                    writer.write(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+
+def ingest_files(
+    inputs: str | Path | Iterable[str | Path],
+    out_path: str | Path,
+    chunk_rows: int | None = None,
+    sort: bool = True,
+    partitioned: bool = False,
+    dictionary: bool = False,
+    workers: int | None = None,
+    ts_format: str | None = None,
+    write_options: WriteOptions | None = None,
+) -> tuple[Path, dict[str, str]]:
+    """
+    Ingest many CSVs (files, directories and/or glob patterns) into one output.
+
+    Each file is parsed and validated on its own in a process pool (`workers`,
+    default: CPU count) and spilled as a sorted run; the good runs are then k-way
+    merged into one timestamp-sorted file, or into date partitions with
+    `partitioned=True`. `chunk_rows`, `sort`, `dictionary` and `ts_format` mean the
+    same as for `ingest_csv`; dictionary codes are assigned in the (single) merge step.
+    `write_options` applies to the merged output only (runs are uncompressed).
+
+    Returns (out_path, failures) where failures maps each rejected file to its
+    error. Raises ValueError only if no file could be ingested.
+    """
+    files = _resolve_inputs(inputs)
+    check_ts_format(ts_format)
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if chunk_rows is not None and chunk_rows <= 0:
+        raise ValueError("chunk_rows must be a positive integer.")
+    if workers is not None and workers <= 0:
+        raise ValueError("workers must be a positive integer.")
+    workers = min(workers or os.cpu_count() or 1, len(files))
+
+    merge_rows = chunk_rows or DEFAULT_MERGE_ROWS
+    options = write_options or WriteOptions()
+    tmp_dir = Path(tempfile.mkdtemp(prefix="tlt-ingest-", dir=out_path.parent))
+    target = tmp_dir / "events.parquet" if partitioned else out_path
+    try:
+        runs = [tmp_dir / f"file-{i:06d}.parquet" for i in range(len(files))]
+        group_rows = _run_group_rows(merge_rows)
+        args = [(f, r, chunk_rows, sort, group_rows, ts_format) for f, r in zip(files, runs)]
+        if workers == 1:
+            errors = [_ingest_file_run(*a) for a in args]
+        else:
+            ctx = multiprocessing.get_context("spawn")  # no fork() under Arrow's thread pools
+            # Per-file phases run in the workers: here they show up as this wait
+            with metrics.phase("ingest.files"):
+                with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                    futures = [pool.submit(_ingest_file_run, *a) for a in args]
+                    errors = [f.result() for f in futures]
+
+        failures = {str(f): err for f, err in zip(files, errors) if err is not None}
+        runs = [r for r, err in zip(runs, errors) if err is None]
+        if not runs:
+            detail = "; ".join(f"{f}: {err}" for f, err in failures.items())
+            raise ValueError(f"All {len(files)} input files failed: {detail}")
+
+        schema = pa.unify_schemas(
+            [pq.read_schema(r).remove_metadata() for r in runs], promote_options="permissive"
+        )
+        out_schema, encode = schema, None
+        if dictionary:
+            users_path = user_dictionary_path(out_path)
+            users = load_user_codes(users_path)
+            out_schema = _encoded_schema(schema)
+
+            def encode(df: pd.DataFrame) -> pd.DataFrame:
+                return encode_frame(df, users)
+
+        if sort:
+            _external_sort(runs, tmp_dir, target, schema, merge_rows, options, encode, out_schema)
+        else:
+            _concat_runs(runs, target, out_schema, options, encode)
+
+        if partitioned:
+            _partition_file(target, out_path, options)
+        if dictionary:
+            save_user_dictionary(users, users_path)
+    except BaseException:
+        if not partitioned:
+            target.unlink(missing_ok=True)
+        raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return out_path, failures
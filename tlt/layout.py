@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+import functools
+import inspect
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+CODECS = ("auto", "zstd", "snappy", "gzip", "brotli", "lz4", "none")
+# Outputs with these extensions are Arrow IPC (Feather v2) files instead of Parquet;
+# "auto" leaves them uncompressed so readers can memory-map them without copying
+IPC_SUFFIXES = (".arrow", ".feather", ".ipc")
+IPC_CODECS = ("auto", "none", "lz4", "zstd")
+# pyarrow's default row-group cap; also the bloom filter NDV when nothing better is known
+DEFAULT_GROUP_ROWS = 1 << 20
+
+
+def is_ipc(path: str | Path) -> bool:
+    """Whether `path` names an Arrow IPC file (by extension; anything else is Parquet)."""
+    return Path(path).suffix.lower() in IPC_SUFFIXES
+
+
+@functools.cache
+def bloom_filters_supported() -> bool:
+    """Whether this pyarrow can write Parquet bloom filters (`bloom_filter_options`)."""
+    return "bloom_filter_options" in inspect.signature(pq.ParquetWriter.__init__).parameters
+
+
+def auto_codec() -> str | None:
+    """Prefer zstd, then snappy, then uncompressed (whatever this pyarrow build has)."""
+    for codec in ("zstd", "snappy"):
+        if pa.Codec.is_available(codec):
+            return codec
+    return None
+
+
+@dataclass(frozen=True)
+class WriteOptions:
+    """
+    Physical layout of the Parquet a stage writes (ingest, transform and run share it).
+
+    For Arrow IPC outputs (`is_ipc`) only `codec` (none/lz4/zstd; "auto" = none),
+    `level`, `row_group_rows` (record batch size) and `sort_by` apply.
+
+    - `codec` / `level`: compression codec ("auto": zstd, else snappy, else none) and
+      its level (None: the codec's default).
+    - `row_group_rows`: max rows per row group (None: the stage's own default).
+    - `statistics`: min/max column statistics, which `--since/--until/--feature`
+      pushdown uses to skip row groups. `page_index` also writes the column/offset
+      index (page-level statistics, used by DuckDB/Spark/Trino).
+    - `sort_by`: order the rows of every row group by these columns and record the
+      order in the metadata. Outputs written in one piece are sorted as a whole;
+      streamed ones per row group. Columns an output lacks are skipped.
+    - `bloom_filter`: columns that get a bloom filter (`bloom_fpp` false-positive
+      rate), for point lookups such as one `user_id` in engines that read them.
+    """
+
+    codec: str = "auto"
+    level: int | None = None
+    row_group_rows: int | None = None
+    statistics: bool = True
+    page_index: bool = False
+    sort_by: tuple[str, ...] = ()
+    bloom_filter: tuple[str, ...] = ()
+    bloom_fpp: float = 0.05
+
+    def __post_init__(self) -> None:
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown codec {self.codec!r}: use one of {list(CODECS)}.")
+        if self.codec not in ("auto", "none") and not pa.Codec.is_available(self.codec):
+            raise ValueError(f"Codec {self.codec!r} is not available in this pyarrow build.")
+        if self.level is not None and self.compression:
+            if not pa.Codec.supports_compression_level(self.compression):
+                raise ValueError(f"Codec {self.compression!r} has no compression levels.")
+        if self.row_group_rows is not None and self.row_group_rows <= 0:
+            raise ValueError("row_group_rows must be a positive integer.")
+        if not 0 < self.bloom_fpp < 1:
+            raise ValueError("bloom_fpp must be between 0 and 1.")
+        if self.bloom_filter and not bloom_filters_supported():
+            raise ValueError(
+                "--bloom-filter requires a pyarrow that writes Parquet bloom filters "
+                f"(installed: {pa.__version__}); upgrade pyarrow or drop the option."
+            )
+        # Accept lists / comma-separated strings; keep the dataclass hashable
+        object.__setattr__(self, "sort_by", _names(self.sort_by))
+        object.__setattr__(self, "bloom_filter", _names(self.bloom_filter))
+
+    @property
+    def compression(self) -> str | None:
+        if self.codec == "auto":
+            return auto_codec()
+        return None if self.codec == "none" else self.codec
+
+    def params(self) -> dict[str, Any]:
+        """JSON-able description (cache keys, benchmark output), codec resolved."""
+        return {**asdict(self), "codec": self.compression or "none"}
+
+    def sort(self, data: pa.Table | pa.RecordBatch) -> pa.Table | pa.RecordBatch:
+        keys = [(c, "ascending") for c in self.sort_by if c in data.schema.names]
+        return data.sort_by(keys) if keys else data
+
+    def ipc_options(self) -> pa.ipc.IpcWriteOptions:
+        """Arrow IPC writer options; dictionary columns may grow between batches (deltas)."""
+        if self.codec not in IPC_CODECS:
+            raise ValueError(
+                f"Arrow IPC files support codecs {list(IPC_CODECS)}, not {self.codec!r}."
+            )
+        codec = None if self.codec in ("auto", "none") else pa.Codec(self.codec, self.level)
+        return pa.ipc.IpcWriteOptions(compression=codec, emit_dictionary_deltas=True)
+
+    def parquet_kwargs(self, schema: pa.Schema, rows: int | None = None) -> dict[str, Any]:
+        """Keyword arguments for `pq.write_table` / `pq.ParquetWriter` / dataset writes."""
+        sorting = [
+            pq.SortingColumn(schema.get_field_index(c)) for c in self.sort_by if c in schema.names
+        ]
+        ndv = min(rows or DEFAULT_GROUP_ROWS, self.row_group_rows or DEFAULT_GROUP_ROWS)
+        bloom = {
+            c: {"ndv": max(ndv, 1), "fpp": self.bloom_fpp}
+            for c in self.bloom_filter
+            if c in schema.names
+        }
+        kwargs = {
+            "compression": self.compression or "none",
+            "compression_level": self.level if self.compression else None,
+            "write_statistics": self.statistics,
+            "write_page_index": self.page_index,
+            "sorting_columns": sorting or None,
+        }
+        # Only when asked for: older pyarrow writers reject the keyword altogether
+        if bloom:
+            kwargs["bloom_filter_options"] = bloom
+        return kwargs
+
+
+def _names(value: str | Iterable[str]) -> tuple[str, ...]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(c.strip() for c in value if c.strip())
+
+
+def write_table(
+    table: pa.Table,
+    path: str | Path,
+    options: WriteOptions | None = None,
+    row_group_rows: int | None = None,
+) -> None:
+    """
+    Write `table` to one Parquet file with `options` (`row_group_rows`: stage default),
+    or to an Arrow IPC file when `path` has an IPC extension.
+    """
+    options = options or WriteOptions()
+    if is_ipc(path):
+        with IpcSink(path, table.schema, options, row_group_rows) as sink:
+            sink.write(table)
+        return
+    table = options.sort(table)
+    pq.write_table(
+        table,
+        path,
+        row_group_size=options.row_group_rows or row_group_rows,
+        **options.parquet_kwargs(table.schema, table.num_rows),
+    )
+
+
+def write_frame(df: pd.DataFrame, path: str | Path, options: WriteOptions | None = None) -> None:
+    """`write_table` for a DataFrame (index dropped, pandas dtypes kept in the metadata)."""
+    write_table(pa.Table.from_pandas(df, preserve_index=False), path, options)
+
+
+class Sink(ABC):
+    """
+    Streaming writer base: every `write` becomes one or more row groups (Parquet) or
+    record batches (IPC) of at most `row_group_rows` rows, laid out per `options`.
+
+    `row_group_rows` is the stage's default group size when `options` has none.
+    Subclasses open `_writer` in `_open` and implement `write`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        schema: pa.Schema,
+        options: WriteOptions | None = None,
+        row_group_rows: int | None = None,
+    ) -> None:
+        self.options = options or WriteOptions()
+        self.row_group_rows = self.options.row_group_rows or row_group_rows
+        self._writer = self._open(path, schema)
+
+    @abstractmethod
+    def _open(self, path: str | Path, schema: pa.Schema):
+        """Open and return the underlying file writer (kept as `_writer`)."""
+
+    @abstractmethod
+    def write(self, table: pa.Table) -> None:
+        """Append `table`, which must match the schema the sink was opened with."""
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> Sink:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ParquetSink(Sink):
+    """`Sink` for one Parquet file."""
+
+    def _open(self, path: str | Path, schema: pa.Schema) -> pq.ParquetWriter:
+        return pq.ParquetWriter(
+            path, schema, **self.options.parquet_kwargs(schema, self.row_group_rows)
+        )
+
+    def write(self, table: pa.Table) -> None:
+        self._writer.write_table(self.options.sort(table), row_group_size=self.row_group_rows)
+
+
+class IpcSink(Sink):
+    """
+    `Sink` for an Arrow IPC (Feather v2) file.
+
+    An IPC file holds one dictionary per column, so dictionary columns (e.g. the
+    per-chunk categories of a dictionary ingest) are re-indexed against a dictionary
+    that only grows, written as deltas.
+    """
+
+    def _open(self, path: str | Path, schema: pa.Schema) -> pa.ipc.RecordBatchFileWriter:
+        self._dictionaries: dict[str, pa.Array] = {}
+        return pa.ipc.new_file(str(path), schema, options=self.options.ipc_options())
+
+    def write(self, table: pa.Table) -> None:
+        table = self._unify_dictionaries(self.options.sort(table))
+        self._writer.write_table(table, max_chunksize=self.row_group_rows)
+
+    def _unify_dictionaries(self, table: pa.Table) -> pa.Table:
+        table = table.unify_dictionaries()
+        for i, field in enumerate(table.schema):
+            if not pa.types.is_dictionary(field.type):
+                continue
+            column = table.column(i)
+            known = self._dictionaries.get(field.name, pa.array([], field.type.value_type))
+            if column.num_chunks:
+                # New entries are appended in the table's own dictionary order
+                new = column.chunk(0).dictionary
+                known = pa.concat_arrays([known, new.filter(pc.invert(pc.is_in(new, known)))])
+            values = column.cast(field.type.value_type).combine_chunks()
+            self._dictionaries[field.name] = known
+            indices = pc.index_in(values, value_set=known).cast(field.type.index_type)
+            table = table.set_column(
+                i, field, pa.DictionaryArray.from_arrays(indices, known, ordered=False)
+            )
+        return table
+
+
+def open_sink(
+    path: str | Path,
+    schema: pa.Schema,
+    options: WriteOptions | None = None,
+    row_group_rows: int | None = None,
+) -> Sink:
+    """A streaming writer for `path`: `IpcSink` for IPC extensions, else `ParquetSink`."""
+    sink = IpcSink if is_ipc(path) else ParquetSink
+    return sink(path, schema, options, row_group_rows)
+
+
+def dataset_write_kwargs(
+    options: WriteOptions | None, schema: pa.Schema, rows: int | None = None
+) -> dict[str, Any]:
+    """`ds.write_dataset` keyword arguments (file options and row-group sizes)."""
+    options = options or WriteOptions()
+    fmt = ds.ParquetFileFormat()
+    kwargs: dict[str, Any] = {
+        "format": fmt,
+        "file_options": fmt.make_write_options(**options.parquet_kwargs(schema, rows)),
+    }
+    if options.row_group_rows:
+        kwargs["min_rows_per_group"] = options.row_group_rows
+        kwargs["max_rows_per_group"] = options.row_group_rows
+    return kwargs
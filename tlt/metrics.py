@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TypeVar
+
+from .fsutil import write_atomic
+
+# Stdlib only, and free when nothing records: a phase costs one global lookup
+# unless `recording()` is active.
+
+METRICS_VERSION = 1
+T = TypeVar("T")
+
+_active: Recorder | None = None
+
+
+def peak_rss_mb() -> float | None:
+    """High-water mark of this process's resident memory (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def enabled() -> bool:
+    """Whether a recorder is active (skip work that only feeds metrics otherwise)."""
+    return _active is not None
+
+
+def current() -> Recorder | None:
+    """The active recorder (None outside `recording`)."""
+    return _active
+
+
+class _Phase:
+    __slots__ = ("name", "rows_in", "rows_out", "_rec", "_wall", "_cpu")
+
+    def __init__(self, name: str, rows_in: int | None = None) -> None:
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: int | None = None
+
+    def __enter__(self) -> _Phase:
+        self._rec = _active
+        if self._rec is not None:
+            self._wall = time.perf_counter()
+            self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._rec is not None:
+            self._rec.add(self.name, self._wall, self._cpu, self.rows_in, self.rows_out)
+
+
+def phase(name: str, rows_in: int | None = None) -> _Phase:
+    """
+    Time a block as phase `name` (e.g. "transform.mau") when recording.
+
+    The returned handle takes `rows_in` / `rows_out` for throughput; repeated phases
+    (per chunk, per merge round) accumulate into one entry.
+    """
+    return _Phase(name, rows_in)
+
+
+def iter_phase(name: str, items: Iterable[T], rows: Callable[[T], int] = len) -> Iterable[T]:
+    """Attribute the time spent producing each item (e.g. CSV reads) to phase `name`."""
+    if _active is None:
+        return items
+    return _timed_iter(name, iter(items), rows)
+
+
+def _timed_iter(name: str, it: Iterator[T], rows: Callable[[T], int]) -> Iterator[T]:
+    while True:
+        with phase(name) as ph:
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            ph.rows_out = rows(item)
+        yield item
+
+
+class Recorder:
+    """Accumulated phase timings of one command run."""
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.started = datetime.now(timezone.utc)
+        self.phases: dict[str, dict[str, Any]] = {}
+        self.success = False
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self.wall_s: float | None = None
+        self.cpu_s: float | None = None
+
+    def add(
+        self,
+        name: str,
+        wall_start: float,
+        cpu_start: float,
+        rows_in: int | None,
+        rows_out: int | None,
+    ) -> None:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        p = self.phases.get(name)
+        if p is None:
+            p = self.phases[name] = {
+                "phase": name,
+                "calls": 0,
+                "wall_s": 0.0,
+                "cpu_s": 0.0,
+                "rows_in": None,
+                "rows_out": None,
+                "_start": wall_start,
+            }
+        p["calls"] += 1
+        p["wall_s"] += wall
+        p["cpu_s"] += cpu
+        if rows_in is not None:
+            p["rows_in"] = (p["rows_in"] or 0) + rows_in
+        if rows_out is not None:
+            p["rows_out"] = (p["rows_out"] or 0) + rows_out
+        p["peak_rss_mb"] = peak_rss_mb()
+
+    def finish(self, success: bool) -> None:
+        self.success = success
+        self.wall_s = time.perf_counter() - self._wall
+        self.cpu_s = time.process_time() - self._cpu
+
+    def to_dict(self) -> dict[str, Any]:
+        phases = []
+        for p in sorted(self.phases.values(), key=lambda p: p["_start"]):
+            p = {k: v for k, v in p.items() if k != "_start"}
+            rows = p["rows_in"] if p["rows_in"] is not None else p["rows_out"]
+            p["rows_per_s"] = rows / p["wall_s"] if rows is not None and p["wall_s"] > 0 else None
+            phases.append(p)
+        return {
+            "version": METRICS_VERSION,
+            "command": self.command,
+            "started": self.started.isoformat(timespec="seconds"),
+            "success": self.success,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": phases,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (for node_exporter's textfile collector)."""
+        doc = self.to_dict()
+        cmd = {"command": self.command}
+        run = [
+            ("tlt_run_success", "1 if the last run succeeded.", doc["success"]),
+            (
+                "tlt_run_timestamp_seconds",
+                "Start time of the last run.",
+                self.started.timestamp(),
+            ),
+            ("tlt_run_wall_seconds", "Wall time of the last run.", doc["wall_s"]),
+            ("tlt_run_cpu_seconds", "CPU time of the last run.", doc["cpu_s"]),
+            ("tlt_run_peak_rss_bytes", "Peak resident memory of the run.", _bytes(doc)),
+        ]
+        lines = []
+        for name, help_text, value in run:
+            _metric(lines, name, help_text, [(cmd, value)])
+
+        fields = [
+            ("calls", "tlt_phase_calls", "Times the phase ran."),
+            ("wall_s", "tlt_phase_wall_seconds", "Wall time spent in the phase."),
+            ("cpu_s", "tlt_phase_cpu_seconds", "CPU time (all threads) spent in the phase."),
+            ("peak_rss_mb", "tlt_phase_peak_rss_bytes", "Process peak RSS after the phase."),
+            ("rows_in", "tlt_phase_rows_in", "Rows fed into the phase."),
+            ("rows_out", "tlt_phase_rows_out", "Rows produced by the phase."),
+            ("rows_per_s", "tlt_phase_rows_per_second", "Phase throughput."),
+        ]
+        for key, name, help_text in fields:
+            samples = [
+                ({**cmd, "phase": p["phase"]}, _bytes(p) if key == "peak_rss_mb" else p[key])
+                for p in doc["phases"]
+            ]
+            _metric(lines, name, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _bytes(d: dict[str, Any]) -> int | None:
+    mb = d.get("peak_rss_mb")
+    return None if mb is None else int(mb * (1 << 20))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric(lines: list[str], name: str, help_text: str, samples) -> None:
+    samples = [(labels, v) for labels, v in samples if v is not None]
+    if not samples:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} gauge")
+    for labels, value in samples:
+        label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label_text}}} {float(value)!r}")
+
+
+@contextmanager
+def recording(
+    command: str,
+    json_path: str | Path | None = None,
+    prom_path: str | Path | None = None,
+    profile_path: str | Path | None = None,
+) -> Iterator[Recorder]:
+    """
+    Record the phases of everything run inside the block, then write them as JSON
+    and/or a Prometheus textfile — also when the block fails (`success` is false).
+
+    With `profile_path`, the block also runs under cProfile and the stats are dumped
+    there (`python -m pstats`, snakeviz). Only this process is covered: work done in
+    worker processes shows up as the parent phase that waits for it.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("A metrics recording is already active.")
+    rec = _active = Recorder(command)
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    ok = False
+    try:
+        yield rec
+        ok = True
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _active = None
+        rec.finish(ok)
+        if profiler is not None:
+            Path(profile_path).parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile_path))
+        if json_path is not None:
+            write_atomic(json_path, json.dumps(rec.to_dict(), indent=2))
+        if prom_path is not None:
+            # The textfile collector may read at any moment: never expose a partial file
+            write_atomic(prom_path, rec.to_prometheus())
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from contextlib import nullcontext
+from pathlib import Path
+
+from . import metrics
+from .ingest import load_csv
+from .layout import WriteOptions, write_frame
+from .report import render_reports
+from .transform import aggregate_events
+
+EVENTS_FILE = "events.parquet"
+AGG_FILE = "agg.parquet"
+# Stages are `metrics` phases named "run.<stage>"; their wall times are the timings returned
+STAGE_PREFIX = "run."
+
+
+def run_pipeline(
+    input_path: str | Path,
+    out_dir: str | Path,
+    mau_window: int | str | Iterable[int] = 30,
+    approx: bool = False,
+    latency_sketch: bool = False,
+    keep_intermediate: bool = False,
+    ts_format: str | None = None,
+    write_options: WriteOptions | None = None,
+) -> tuple[Path, dict[str, float]]:
+    """
+    ingest → transform → report in one process, handing DataFrames between stages.
+
+    Nothing is written and re-read in between: the events frame from `load_csv` goes
+    straight into `aggregate_events`, and its result into `render_reports`, which
+    writes charts + metrics.txt to `out_dir`. With `keep_intermediate=True` the events
+    and aggregated Parquet files are also saved there (`events.parquet`, `agg.parquet`),
+    timed as their own "write" stage, laid out per `write_options`.
+
+    Returns (out_dir, timings) with seconds per stage, in execution order. Stages are
+    recorded as `run.<stage>` metrics phases, into the active recording if there is one
+    (`--metrics-json`), else into a private one kept only for the timings.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    active = metrics.current()
+
+    with metrics.recording("run") if active is None else nullcontext(active) as rec:
+        with metrics.phase("run.ingest") as ph:
+            events = load_csv(input_path, ts_format=ts_format)
+            ph.rows_out = len(events)
+        if keep_intermediate:
+            with metrics.phase("run.write", rows_in=len(events)):
+                write_frame(events, out_dir / EVENTS_FILE, write_options)
+
+        with metrics.phase("run.transform", rows_in=len(events)) as ph:
+            agg = aggregate_events(events, mau_window, approx=approx, latency_sketch=latency_sketch)
+            ph.rows_out = len(agg)
+        if keep_intermediate:
+            with metrics.phase("run.write", rows_in=len(agg)):
+                write_frame(agg, out_dir / AGG_FILE, write_options)
+
+        with metrics.phase("run.report", rows_in=len(agg)):
+            render_reports(agg, out_dir, events=events)
+
+    timings = {
+        name.removeprefix(STAGE_PREFIX): phase["wall_s"]
+        for name, phase in rec.phases.items()
+        if name.startswith(STAGE_PREFIX)
+    }
+    return out_dir, timings
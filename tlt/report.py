@@ -1,97 +1,558 @@
 from __future__ import annotations
+import re
+from collections.abc import Sequence
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import matplotlib
+from matplotlib import cbook
+from matplotlib.figure import Figure
 
-matplotlib.use("Agg")  # CI/headless
-import matplotlib.pyplot as plt
+from . import metrics, sketch
+from .charts import Chart, default_max_points, render_charts
+from .charts import downsample as _downsample
+from .dataset import (
+    DAY_TABLE,
+    FEATURE_TABLE,
+    as_utc_timestamps,
+    is_normalized,
+    open_dataset,
+    read_frame,
+    table_path,
+    to_utc_day,
+)
+from .retention import read_retention
+from .rollup import is_rollup, query_rollup
 
+# Per-feature latency summary (boxplot whisker/box/median) written by transform
+SUMMARY_COLUMNS = ("p5", "p25", "p50", "p75", "p95")
+# Aggregated columns metrics.txt and the charts use (plus every mau_*); the rest is skipped
+AGG_COLUMNS = ("date", "feature_id", "events", "dau", *SUMMARY_COLUMNS, "users_hll", "latency_dd")
+RAW_COLUMNS = ("timestamp", "user_id", "feature_id")
+# Boxplot fields of matplotlib's `Axes.bxp`, one row per feature
+BOX_COLUMNS = ("whislo", "q1", "med", "q3", "whishi")
+FEATURE_CHART_DIR = "features"
+# Features drawn in latency_trend.png (most events first); --feature-charts has them all
+TREND_FEATURES = 8
+# Days since first seen summarized in metrics.txt from a retention matrix
+RETENTION_DAYS = (1, 7, 30)
 
-def _plot_feature_usage(series: pd.Series, out_path: Path) -> None:
-    plt.figure()
-    series.plot(kind="bar")
-    plt.title("Feature Usage (Total Events)")
-    plt.xlabel("feature_id")
-    plt.ylabel("events")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
 
+def _rotate_labels(ax, labels: list[str]) -> None:
+    ax.set_xticks(range(1, len(labels) + 1), labels, rotation=45, ha="right")
 
-def _plot_latency_box_by_feature(events: pd.DataFrame, out_path: Path) -> None:
-    """Boxplot of latency_ms grouped by feature_id (from raw events)."""
+
+def _draw_feature_usage(fig: Figure, series: pd.Series) -> None:
+    ax = fig.subplots()
+    ax.bar(range(1, len(series) + 1), series.to_numpy())
+    _rotate_labels(ax, [str(f) for f in series.index])
+    ax.set_title("Feature Usage (Total Events)")
+    ax.set_xlabel("feature_id")
+    ax.set_ylabel("events")
+    fig.tight_layout()
+
+
+def _box_stats(events: pd.DataFrame) -> pd.DataFrame | None:
+    """Boxplot statistics of latency_ms per feature_id from raw events (1.5 IQR whiskers)."""
     if not {"feature_id", "latency_ms"}.issubset(events.columns):
-        return
-    data = []
-    labels = []
-    for feat, df_f in events.groupby("feature_id"):
-        s = pd.to_numeric(df_f["latency_ms"], errors="coerce").dropna()
-        if not s.empty:
-            data.append(s.values)
-            labels.append(str(feat))
-    if not data:
-        return
-    plt.figure()
-    plt.boxplot(data, labels=labels, showfliers=False)
-    plt.title("Latency by Feature (boxplot)")
-    plt.ylabel("Latency (ms)")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
+        return None
+    latency = pd.to_numeric(events["latency_ms"], errors="coerce")
+    valid = latency.notna()
+    rows = {}
+    for feat, s in latency[valid].groupby(events.loc[valid, "feature_id"], observed=True):
+        stats = cbook.boxplot_stats(s.to_numpy())[0]
+        rows[str(feat)] = [stats[c] for c in BOX_COLUMNS]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=list(BOX_COLUMNS))
+
+
+def _summary_box_stats(summary: pd.DataFrame) -> pd.DataFrame:
+    """p5/p25/p50/p75/p95 per feature as boxplot statistics (whiskers at p5/p95)."""
+    stats = summary.dropna()[list(SUMMARY_COLUMNS)]
+    stats.columns = list(BOX_COLUMNS)
+    return stats.set_axis(stats.index.astype(str))
+
+
+def _draw_latency_box(fig: Figure, stats: pd.DataFrame, title: str) -> bool:
+    """Boxplot per feature from precomputed statistics (`BOX_COLUMNS`), no raw values."""
+    if stats is None or stats.empty:
+        return False
+    ax = fig.subplots()
+    ax.bxp(
+        [{"label": feat, **r} for feat, r in stats.to_dict(orient="index").items()],
+        showfliers=False,
+    )
+    _rotate_labels(ax, list(stats.index))
+    ax.set_title(title)
+    ax.set_ylabel("Latency (ms)")
+    fig.tight_layout()
+    return True
+
+
+def _points(
+    x: pd.Series, y: pd.Series, panel: str, series: str, max_points: int, method: str
+) -> pd.DataFrame:
+    """One line of a trend chart: (panel, series, x, y) rows, NaN dropped, downsampled."""
+    keep = y.notna().to_numpy()
+    x, y = x[keep].dt.tz_localize(None).to_numpy(), y[keep].to_numpy(dtype=float)
+    idx = _downsample(x, y, max_points, method)
+    return pd.DataFrame({"panel": panel, "series": series, "x": x[idx], "y": y[idx]})
+
+
+def _draw_trends(fig: Figure, points: pd.DataFrame, title: str) -> bool:
+    """
+    Line charts sharing the time axis, one panel per distinct `panel` (its y label) and
+    one line per `series` in it; `points` is already downsampled (`_points`).
+    """
+    if points.empty:
+        return False
+    panels = list(dict.fromkeys(points["panel"]))
+    axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    legends = []
+    for ax, (panel, rows) in zip(axes, points.groupby("panel", sort=False)):
+        lines = list(dict.fromkeys(rows["series"]))
+        for series, line in rows.groupby("series", sort=False):
+            ax.plot(line["x"], line["y"], marker=".", label=series if len(lines) > 1 else None)
+        ax.set_ylabel(panel)
+        # Panels with the same lines share the first one's legend
+        if len(lines) > 1 and lines not in legends:
+            ax.legend(fontsize="small", ncols=2 if len(lines) > 4 else 1)
+            legends.append(lines)
+    axes[0].set_title(title)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return True
+
+
+def _user_trend_chart(per_day: pd.DataFrame, max_points: int, method: str) -> Chart | None:
+    """dau_mau.png: DAU and every mau_{N}d per day."""
+    cols = [c for c in per_day.columns if c == "dau" or str(c).startswith("mau_")]
+    if not cols or per_day.empty:
+        return None
+    per_day = per_day.sort_values("date")
+    dates = as_utc_timestamps(per_day["date"])
+    points = pd.concat([_points(dates, per_day[c], "users", c, max_points, method) for c in cols])
+    return Chart("dau_mau.png", _draw_trends, (points, "Daily and monthly active users"))
+
+
+def _latency_trend_chart(agg: pd.DataFrame, max_points: int, method: str) -> Chart | None:
+    """latency_trend.png: daily p50 and p95 of the `TREND_FEATURES` busiest features."""
+    if not {"p50", "p95"}.issubset(agg.columns):
+        return None
+    top = agg.groupby("feature_id")["events"].sum().nlargest(TREND_FEATURES).index
+    rows = agg[agg["feature_id"].isin(top)].assign(date=as_utc_timestamps(agg["date"]))
+    parts = [
+        _points(r["date"], r[col], f"{col} (ms)", str(feat), max_points, method)
+        for col in ("p50", "p95")
+        for feat, r in rows.sort_values("date").groupby("feature_id", observed=True)
+    ]
+    points = pd.concat(parts) if parts else pd.DataFrame()
+    return Chart("latency_trend.png", _draw_trends, (points, "Daily latency by feature"))
+
+
+def _draw_retention(fig: Figure, matrix: pd.DataFrame) -> bool:
+    """Heatmap of a `tlt.retention` matrix: cohorts down, days since first seen across."""
+    if matrix.empty:
+        return False
+    grid = matrix.pivot(index="cohort", columns="day", values="retention")
+    ax = fig.subplots()
+    # Cells not observable yet (cohort + day after the last day) are NaN: left blank
+    image = ax.imshow(
+        grid.to_numpy(dtype=float), aspect="auto", interpolation="nearest", vmin=0, vmax=1
+    )
+    rows = np.unique(np.linspace(0, len(grid) - 1, min(len(grid), 12)).astype(int))
+    ax.set_yticks(rows, [d.strftime("%Y-%m-%d") for d in grid.index[rows]])
+    ax.set_title("Cohort retention")
+    ax.set_xlabel("days since first seen")
+    ax.set_ylabel("first-seen date")
+    fig.colorbar(image, ax=ax, label="share of cohort active")
+    fig.tight_layout()
+    return True
+
+
+def _feature_charts(df: pd.DataFrame, is_agg: bool, max_points: int, method: str) -> list[Chart]:
+    """`features/<feature_id>.png` per feature: its daily events (and p50/p95)."""
+    if is_agg:
+        cols = [c for c in ("p50", "p95") if c in df.columns]
+        daily = df.assign(date=as_utc_timestamps(df["date"]))
+    else:
+        day = as_utc_timestamps(df["timestamp"]).dt.floor("D").rename("date")
+        daily = df.groupby([df["feature_id"], day], observed=True).size().rename("events")
+        daily, cols = daily.reset_index(), []
+    charts = []
+    for feat, rows in daily.groupby("feature_id", observed=True, sort=True):
+        rows = rows.sort_values("date")
+        parts = [_points(rows["date"], rows["events"], "events", "events", max_points, method)]
+        parts += [
+            _points(rows["date"], rows[c], "latency (ms)", c, max_points, method) for c in cols
+        ]
+        safe = re.sub(r"[^\w.-]", "_", str(feat))
+        title = f"{feat}: daily activity"
+        charts.append(
+            Chart(f"{FEATURE_CHART_DIR}/{safe}.png", _draw_trends, (pd.concat(parts), title))
+        )
+    return charts
+
+
+def latency_summary_by_feature(agg: pd.DataFrame) -> pd.DataFrame:
+    """
+    p5/p25/p50/p75/p95 over all days per feature, from aggregated rows only.
+
+    With `latency_dd` sketches these are true percentiles of the merged days; otherwise
+    each is the events-weighted mean of the daily values transform wrote (an estimate).
+    """
+    if "latency_dd" in agg.columns:
+        qs = tuple(float(c[1:]) / 100 for c in SUMMARY_COLUMNS)
+        return latency_percentiles(agg, qs).drop(index="(all)").rename_axis("feature_id")
+    missing = set(SUMMARY_COLUMNS) - set(agg.columns)
+    if missing:
+        raise ValueError(
+            f"Aggregated data has no latency summaries {sorted(missing)} (re-run transform)."
+        )
+    cols = list(SUMMARY_COLUMNS)
+    values = agg[cols].apply(pd.to_numeric, errors="coerce")
+    weights = values.notna().mul(agg["events"], axis=0)
+    weighted = values.mul(weights).fillna(0.0)
+    by = agg["feature_id"]
+    return weighted.groupby(by).sum() / weights.groupby(by).sum().replace(0, float("nan"))
+
+
+def approx_distinct_users(
+    agg: pd.DataFrame,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    feature_id: str | None = None,
+) -> int:
+    """
+    Approximate distinct users over [start, end] (inclusive days), optionally for one
+    feature, by merging the `users_hll` sketches written by `transform_parquet(approx=True)`.
+    """
+    if "users_hll" not in agg.columns:
+        raise ValueError("Aggregated data has no 'users_hll' sketches (run transform --approx).")
+    dates = as_utc_timestamps(agg["date"])
+    mask = pd.Series(True, index=agg.index)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start, tz="UTC")
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end, tz="UTC")
+    if feature_id is not None:
+        mask &= agg["feature_id"] == feature_id
+    return round(sketch.estimate(sketch.merge_bytes(agg.loc[mask, "users_hll"])))
+
+
+def latency_percentiles(
+    agg: pd.DataFrame, qs: tuple[float, ...] = (0.5, 0.95, 0.99)
+) -> pd.DataFrame:
+    """
+    Percentiles over all days, overall and per feature, from the `latency_dd` sketches
+    written by `transform_parquet(latency_sketch=True)`. Index: "(all)" then feature ids.
+    """
+    if "latency_dd" not in agg.columns:
+        raise ValueError("Aggregated data has no 'latency_dd' sketches (run --latency-sketch).")
+    cols = [f"p{round(q * 100)}" for q in qs]
+    rows = {"(all)": sketch.dd_quantiles(sketch.dd_merge_bytes(agg["latency_dd"]), qs)}
+    for feat, blobs in agg.groupby("feature_id")["latency_dd"]:
+        rows[str(feat)] = sketch.dd_quantiles(sketch.dd_merge_bytes(blobs), qs)
+    return pd.DataFrame.from_dict(rows, orient="index", columns=cols)
 
 
 def make_reports(
-    in_path: str | Path, out_dir: str | Path, events_path: str | Path | None = None
+    in_path: str | Path,
+    out_dir: str | Path,
+    events_path: str | Path | None = None,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    latency_source: str = "auto",
+    granularity: str | None = None,
+    feature_charts: bool = False,
+    workers: int = 1,
+    reuse: bool = True,
+    max_points: int | None = None,
+    downsample: str = "lttb",
+    retention_path: str | Path | None = None,
 ) -> Path:
-    in_path, out_dir = Path(in_path), Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Write charts + metrics.txt for an aggregated (or raw) Parquet file or partitioned
+    directory. `since`/`until` (inclusive days) and `features` are pushed down to the
+    reads, so a one-week report only touches one week of partitions/row groups; only
+    the columns the report uses are read.
 
-    df = pd.read_parquet(in_path)
-    events_df = None
-    if events_path:
-        try:
-            events_df = pd.read_parquet(events_path)
-        except Exception:
-            events_df = None  # Optional
+    The latency-by-feature chart comes from the per-feature quantile summaries in the
+    aggregated data (`latency_source="summary"`) or from the raw `events_path` events
+    (`"events"`). `"auto"` uses `events_path` when given (exact quantiles) and the
+    summaries otherwise, so a report without raw events does not depend on their volume.
+
+    For a normalized transform output (`transform --normalized`), the charts read only
+    the (date, feature_id) table and the DAU/MAU lines only the per-day table.
+
+    A rollup directory (`tlt rollup`) is reported per `granularity` period instead
+    (default "day"; see `make_rollup_report`).
+
+    `feature_charts=True` adds `features/<feature_id>.png` per feature (daily events,
+    plus p50/p95 from aggregated data). Charts are drawn with matplotlib's object API
+    by `tlt.charts.render_charts`, in `workers` processes; with `reuse`, a chart whose
+    inputs hash the same as in the previous report into `out_dir` is not redrawn.
+
+    Aggregated input also gets time-series charts: `dau_mau.png` (DAU and every
+    mau_{N}d) and `latency_trend.png` (daily p50/p95 of the busiest features). Every
+    line is downsampled to at most `max_points` points (default: the chart's width in
+    pixels) with `downsample` ("lttb" or "minmax"; see `tlt.charts.downsample`), so
+    drawing cost stays bounded however long the history is.
+
+    `retention_path` (a `tlt retention` output) adds `retention.png`, a cohort heatmap,
+    and mean day-1/7/30 retention to metrics.txt; `since`/`until` select its cohorts.
+    """
+    if granularity is not None or is_rollup(in_path):
+        return make_rollup_report(
+            in_path,
+            out_dir,
+            granularity or "day",
+            since,
+            until,
+            features,
+            reuse=reuse,
+            max_points=max_points,
+            downsample=downsample,
+        )
+    if latency_source == "events" and not events_path:
+        raise ValueError("latency_source='events' needs events_path.")
+
+    days = None
+    if is_normalized(in_path):
+        with metrics.phase("report.read_days") as ph:
+            days = read_frame(table_path(in_path, DAY_TABLE), since=since, until=until)
+            ph.rows_out = len(days)
+        in_path = table_path(in_path, FEATURE_TABLE)
 
     # ---- Determine schema: raw vs aggregated ----
-    is_agg = {"date", "feature_id", "events"}.issubset(df.columns)
+    names = open_dataset(in_path).schema.names
+    is_agg = _is_aggregated(names)
+    if is_agg:
+        columns = [c for c in names if c in AGG_COLUMNS or c.startswith("mau_")]
+    else:
+        columns = list(RAW_COLUMNS)
+    with metrics.phase("report.read") as ph:
+        df = read_frame(in_path, columns=columns, since=since, until=until, features=features)
+        ph.rows_out = len(df)
+
+    events_df = None
+    if events_path and not _use_summary(df.columns, latency_source, has_events=True):
+        with metrics.phase("report.read_events") as ph:
+            try:
+                events_df = read_frame(
+                    events_path,
+                    columns=["feature_id", "latency_ms"],
+                    since=since,
+                    until=until,
+                    features=features,
+                )
+                ph.rows_out = len(events_df)
+            except Exception:
+                events_df = None  # Optional
+
+    retention = None
+    if retention_path:
+        with metrics.phase("report.read_retention") as ph:
+            retention = read_retention(retention_path)
+            cohorts = retention["cohort"]
+            if since is not None:
+                retention = retention[cohorts >= to_utc_day(since)]
+            if until is not None:
+                retention = retention[cohorts <= to_utc_day(until)]
+            ph.rows_out = len(retention)
+
+    return render_reports(
+        df,
+        out_dir,
+        events=events_df,
+        latency_source=latency_source,
+        days=days,
+        feature_charts=feature_charts,
+        workers=workers,
+        reuse=reuse,
+        max_points=max_points,
+        downsample=downsample,
+        retention=retention,
+    )
+
+
+def make_rollup_report(
+    cube_dir: str | Path,
+    out_dir: str | Path,
+    granularity: str,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    reuse: bool = True,
+    max_points: int | None = None,
+    downsample: str = "lttb",
+) -> Path:
+    """
+    Report a rollup cube per `granularity` period, answered from the smallest stored
+    level that can be rolled up into it (no raw events or daily aggregates needed).
+
+    Writes `rollup_<granularity>.csv` (per period and feature), `activity_<granularity>.png`
+    (events and distinct users per period, downsampled like `make_reports`) and metrics.txt.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sampling = (max_points or default_max_points(), downsample)
+    per_feature, level = query_rollup(cube_dir, granularity, since, until, features)
+    totals, _ = query_rollup(cube_dir, granularity, since, until, features, by_feature=False)
+
+    with metrics.phase("report.rollup_table", rows_in=len(per_feature)):
+        table = per_feature.assign(period=per_feature["period"].dt.strftime("%Y-%m-%dT%H:%MZ"))
+        table.to_csv(out_dir / f"rollup_{granularity}.csv", index=False, float_format="%.3f")
+    if not totals.empty:
+        with metrics.phase("report.activity_chart", rows_in=len(totals)):
+            points = pd.concat(
+                [
+                    _points(totals["period"], totals["events"], "events", "events", *sampling),
+                    _points(
+                        totals["period"], totals["users"], "users (approx)", "users", *sampling
+                    ),
+                ]
+            )
+            chart = Chart(
+                f"activity_{granularity}.png", _draw_trends, (points, f"Activity per {granularity}")
+            )
+            render_charts([chart], out_dir, reuse=reuse)
+
+    with metrics.phase("report.metrics"), open(out_dir / "metrics.txt", "w", encoding="utf-8") as f:
+        f.write("=== Telemetry Summary ===\n")
+        f.write(f"Granularity: {granularity} (from the {level} rollup)\n")
+        f.write(f"Periods: {len(totals)}\n")
+        f.write(f"Total events: {int(totals['events'].sum())}\n")
+        f.write(f"Features: {per_feature['feature_id'].nunique()}\n")
+        if not totals.empty:
+            peak = totals.loc[totals["users"].idxmax()]
+            f.write(f"Mean users per {granularity} (approx): {totals['users'].mean():.1f}\n")
+            f.write(f"Max users per {granularity} (approx): {int(peak['users'])}\n")
+        if "p95" in totals.columns and totals["p95"].notna().any():
+            f.write(f"Median p50 per {granularity}: {totals['p50'].median():.1f} ms\n")
+            f.write(f"Median p95 per {granularity}: {totals['p95'].median():.1f} ms\n")
+    return out_dir
+
 
+def _per_day(agg: pd.DataFrame) -> pd.DataFrame:
+    """dau/mau_* per date from flat aggregated rows (repeated on every feature row)."""
+    cols = [c for c in agg.columns if c == "dau" or str(c).startswith("mau_")]
+    return agg.groupby("date")[cols].max().reset_index() if cols else agg[["date"]].iloc[:0]
+
+
+def _is_aggregated(columns) -> bool:
+    return {"date", "feature_id", "events"}.issubset(columns)
+
+
+def _use_summary(columns, latency_source: str, has_events: bool) -> bool:
+    """
+    Whether the latency chart comes from aggregated summaries rather than raw events:
+    when asked for, or with "auto" only when there are no raw events to read.
+    """
+    if latency_source not in ("auto", "summary", "events"):
+        raise ValueError(f"Unknown latency_source {latency_source!r}.")
+    has_summary = _is_aggregated(columns) and (
+        "latency_dd" in columns or set(SUMMARY_COLUMNS).issubset(columns)
+    )
+    if latency_source == "summary" and not _is_aggregated(columns):
+        raise ValueError("Latency summaries need aggregated input (run transform).")
+    if latency_source == "auto":
+        return has_summary and not has_events
+    return latency_source == "summary"
+
+
+def render_reports(
+    df: pd.DataFrame,
+    out_dir: str | Path,
+    events: pd.DataFrame | None = None,
+    latency_source: str = "auto",
+    days: pd.DataFrame | None = None,
+    feature_charts: bool = False,
+    workers: int = 1,
+    reuse: bool = True,
+    max_points: int | None = None,
+    downsample: str = "lttb",
+    retention: pd.DataFrame | None = None,
+) -> Path:
+    """
+    `make_reports` on in-memory frames: `df` is aggregated (or raw) data, `events`
+    optional raw events for the latency chart (see `make_reports` for `latency_source`
+    and the chart options). `days` holds the per-day dau/mau_* of a
+    normalized output; otherwise they are taken from `df`'s repeated columns.
+    `retention` is an optional `tlt.retention` matrix.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    is_agg = _is_aggregated(df.columns)
+    use_summary = _use_summary(df.columns, latency_source, events is not None)
+    events_df = None if use_summary else events
+
+    # Chart inputs are prepared here; drawing happens in `render_charts` below
+    charts = []
     # ---- Feature usage chart ----
+    with metrics.phase("report.feature_usage", rows_in=len(df)):
+        if is_agg:
+            usage = df.groupby("feature_id")["events"].sum().sort_values(ascending=False)
+        else:
+            usage = df.groupby("feature_id", observed=True).size().sort_values(ascending=False)
+        charts.append(Chart("feature_usage.png", _draw_feature_usage, (usage,)))
+
+    # ---- Optional latency-by-feature chart (summaries or raw events) ----
+    if use_summary:
+        with metrics.phase("report.latency_chart", rows_in=len(df)):
+            stats = _summary_box_stats(latency_summary_by_feature(df))
+            title = "Latency by Feature (p5/p25/p50/p75/p95)"
+            charts.append(Chart("latency_by_feature.png", _draw_latency_box, (stats, title)))
+    elif events_df is not None:
+        with metrics.phase("report.latency_chart", rows_in=len(events_df)):
+            stats = _box_stats(events_df)
+            title = "Latency by Feature (boxplot)"
+            charts.append(Chart("latency_by_feature.png", _draw_latency_box, (stats, title)))
+
+    # ---- Time series: DAU/MAU and per-feature latency (aggregated input only) ----
+    sampling = (max_points or default_max_points(), downsample)
+    per_day = None
     if is_agg:
-        usage = df.groupby("feature_id")["events"].sum().sort_values(ascending=False)
-    else:
-        usage = df.groupby("feature_id").size().sort_values(ascending=False)
-    _plot_feature_usage(usage, out_dir / "feature_usage.png")
+        per_day = days if days is not None else _per_day(df)
+        with metrics.phase("report.trend_charts", rows_in=len(df)):
+            for chart in (
+                _user_trend_chart(per_day, *sampling),
+                _latency_trend_chart(df, *sampling),
+            ):
+                if chart is not None:
+                    charts.append(chart)
 
-    # ---- Optional latency-by-feature chart from raw events ----
-    if events_df is not None:
-        _plot_latency_box_by_feature(events_df, out_dir / "latency_by_feature.png")
+    if feature_charts:
+        with metrics.phase("report.feature_charts", rows_in=len(df)):
+            charts.extend(_feature_charts(df, is_agg, *sampling))
+    if retention is not None:
+        charts.append(Chart("retention.png", _draw_retention, (retention.reset_index(drop=True),)))
+    render_charts(charts, out_dir, workers=workers, reuse=reuse)
 
     # ---- Text metrics ----
     metrics_path = out_dir / "metrics.txt"
-    with open(metrics_path, "w", encoding="utf-8") as f:
+    with metrics.phase("report.metrics"), open(metrics_path, "w", encoding="utf-8") as f:
         f.write("=== Telemetry Summary ===\n")
 
         if is_agg:
             total_events = int(df["events"].sum())
-            n_days = pd.to_datetime(df["date"]).dt.floor("D").nunique()
+            n_days = as_utc_timestamps(df["date"]).dt.floor("D").nunique()
             n_features = df["feature_id"].nunique()
             f.write(f"Aggregated days: {n_days}\n")
             f.write(f"Total events: {total_events}\n")
             f.write(f"Features: {n_features}\n")
 
-            if "dau" in df.columns:
-                dau_by_day = df.groupby("date")["dau"].max()
-                f.write(f"Mean DAU: {float(dau_by_day.mean()):.1f}\n")
-                f.write(f"Max DAU: {int(dau_by_day.max())}\n")
+            if "dau" in per_day.columns:
+                f.write(f"Mean DAU: {float(per_day['dau'].mean()):.1f}\n")
+                f.write(f"Max DAU: {int(per_day['dau'].max())}\n")
 
-            mau_col = next((c for c in df.columns if str(c).startswith("mau_")), None)
-            if mau_col:
-                latest_mau = int(df.sort_values("date").groupby("date")[mau_col].max().iloc[-1])
-                f.write(f"{mau_col.upper()} (most recent day): {latest_mau}\n")
+            if "users_hll" in df.columns:
+                f.write(f"Unique users (approx): {approx_distinct_users(df)}\n")
+
+            mau_cols = [c for c in per_day.columns if str(c).startswith("mau_")]
+            if mau_cols and not per_day.empty:
+                latest = per_day.sort_values("date")[mau_cols].iloc[-1]
+                for mau_col in mau_cols:
+                    f.write(f"{mau_col.upper()} (most recent day): {int(latest[mau_col])}\n")
 
             # If p50/p95 exist in aggregated rows, report overall means of those stats
             if {"p50", "p95"}.issubset(df.columns):
@@ -101,17 +562,32 @@ def make_reports(
                     f.write(f"Median latency p50 (overall mean): {mean_p50:.1f} ms\n")
                 if pd.notna(mean_p95):
                     f.write(f"Tail latency p95 (overall mean): {mean_p95:.1f} ms\n")
+
+            # Mergeable sketches give true percentiles across days (not means of daily ones)
+            if "latency_dd" in df.columns:
+                pct = latency_percentiles(df)
+                f.write("Latency percentiles (all days):\n")
+                for name, row in pct.iterrows():
+                    vals = " ".join(f"{c}={v:.1f}" for c, v in row.items() if pd.notna(v))
+                    f.write(f"  {name}: {vals or 'n/a'} ms\n")
         else:
             # raw schema
             total_events = len(df)
             n_users = df["user_id"].nunique()
             n_features = df["feature_id"].nunique()
-            n_days = (
-                pd.to_datetime(df["timestamp"], utc=True, errors="coerce").dt.floor("D").nunique()
-            )
+            n_days = as_utc_timestamps(df["timestamp"]).dt.floor("D").nunique()
             f.write(f"Days: {n_days}\n")
             f.write(f"Events: {total_events}\n")
             f.write(f"Unique users: {n_users}\n")
             f.write(f"Features: {n_features}\n")
 
+        if retention is not None and not retention.empty:
+            # Pooled over the cohorts old enough to be observed that many days later
+            f.write(f"Cohorts: {retention['cohort'].nunique()}\n")
+            pooled = retention.groupby("day")[["users", "cohort_users"]].sum()
+            for day in RETENTION_DAYS:
+                if day in pooled.index:
+                    share = pooled.at[day, "users"] / pooled.at[day, "cohort_users"]
+                    f.write(f"Day-{day} retention: {share:.1%}\n")
+
     return out_dir
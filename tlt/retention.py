@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from . import metrics
+from .dataset import build_filter, open_dataset, read_frame, to_utc_day, utc_day_numbers
+from .layout import WriteOptions, write_frame
+
+DEFAULT_RETENTION_DAYS = 30
+RETENTION_COLUMNS = ("cohort", "day", "users", "cohort_users", "retention")
+# (user code, day) pairs are packed into one int64: the low bits hold the day number
+# shifted to be non-negative (dates within ~2,800 years of 1970), the rest the user code
+_DAY_BITS = 21
+_DAY_SHIFT = 1 << (_DAY_BITS - 1)
+# Per-batch unique pairs are merged once they outgrow the merged set (or this many)
+_COMPACT_PAIRS = 1 << 20
+
+
+def _user_codes(values: pa.Array, users: dict[str, int]) -> np.ndarray:
+    """
+    Integer user codes: dictionary-ingested int codes as-is; labels get the next free
+    code the first time they appear (`users` is updated in place, append-only).
+    """
+    if pa.types.is_integer(values.type):
+        return values.to_numpy(zero_copy_only=False).astype(np.int64)
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(values.type.value_type)
+    # Only the batch's distinct labels are looked up, not every event
+    encoded = pc.dictionary_encode(values)
+    labels = encoded.dictionary.to_pylist()
+    codes = np.fromiter((users.setdefault(u, len(users)) for u in labels), np.int64, len(labels))
+    return codes[encoded.indices.to_numpy(zero_copy_only=False)]
+
+
+def active_pairs(
+    in_path: str | Path,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct (user code, UTC day number) pairs of the events in `in_path`, sorted by
+    user then day, as two int64 arrays.
+
+    Events are scanned batch by batch and only each batch's distinct pairs are kept
+    (merged as they accumulate), so memory follows the number of distinct pairs (plus
+    one dict entry per distinct string user_id), not the number of events.
+    """
+    dataset = open_dataset(in_path)
+    scan_filter = ds.field("user_id").is_valid()
+    pushdown = build_filter(dataset.schema, until=until, features=features)
+    if pushdown is not None:
+        scan_filter &= pushdown
+    users: dict[str, int] = {}
+    chunks: list[np.ndarray] = []
+    pending = merged = 0
+    with metrics.phase("retention.pairs") as ph:
+        for batch in dataset.to_batches(columns=["timestamp", "user_id"], filter=scan_filter):
+            if not batch.num_rows:
+                continue
+            ph.rows_in = (ph.rows_in or 0) + batch.num_rows
+            days = utc_day_numbers(batch.column("timestamp")) + _DAY_SHIFT
+            if days.min() < 0 or days.max() >= 1 << _DAY_BITS:
+                raise ValueError("Timestamps are out of the supported date range.")
+            codes = _user_codes(batch.column("user_id"), users)
+            chunks.append(np.unique((codes << _DAY_BITS) | days))
+            pending += len(chunks[-1])
+            if pending > max(merged, _COMPACT_PAIRS):
+                chunks = [np.unique(np.concatenate(chunks))]
+                merged = pending = len(chunks[0])
+        pairs = np.unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.int64)
+        ph.rows_out = len(pairs)
+    return pairs >> _DAY_BITS, (pairs & ((1 << _DAY_BITS) - 1)) - _DAY_SHIFT
+
+
+def retention_matrix(
+    user: np.ndarray,
+    day: np.ndarray,
+    max_days: int = DEFAULT_RETENTION_DAYS,
+    since: str | pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Cohort retention from distinct (user, day) pairs sorted by user then day (as
+    `active_pairs` returns them): one row per (cohort, day) with `cohort` the first-seen
+    date, `day` the days since first seen (0..max_days), `users` the cohort's users
+    active that day, `cohort_users` its size and `retention` = users / cohort_users.
+
+    Only cells the data can answer are included (cohort + day <= last active day);
+    missing activity inside that range is a 0. `since` keeps cohorts first seen on
+    or after that day.
+    """
+    if max_days < 0:
+        raise ValueError("max_days must be >= 0.")
+    width = max_days + 1
+    with metrics.phase("retention.matrix", rows_in=len(day)) as ph:
+        if len(day) == 0:
+            ph.rows_out = 0
+            return _frame(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), [])
+        # First-seen day per user: the first pair of each user's run
+        starts = np.flatnonzero(np.r_[True, user[1:] != user[:-1]])
+        first = day[starts]
+        offset = day - np.repeat(first, np.diff(np.r_[starts, len(day)]))
+        cohort_days, cohort_idx = np.unique(first, return_inverse=True)
+
+        kept = offset <= max_days
+        user_cohort = np.repeat(cohort_idx, np.diff(np.r_[starts, len(day)]))[kept]
+        counts = np.bincount(
+            user_cohort * width + offset[kept], minlength=len(cohort_days) * width
+        ).reshape(len(cohort_days), width)
+
+        observable = np.arange(width)[None, :] <= (day.max() - cohort_days)[:, None]
+        if since is not None:
+            since_day = (to_utc_day(since) - pd.Timestamp(0, tz="UTC")).days
+            observable &= (cohort_days >= since_day)[:, None]
+        rows, cols = np.nonzero(observable)
+        ph.rows_out = len(rows)
+        return _frame(cohort_days[rows], cols, counts[rows, cols], counts[rows, 0])
+
+
+def _frame(cohort_days, day, users, cohort_users) -> pd.DataFrame:
+    cohort = pd.to_datetime(np.asarray(cohort_days, dtype=np.int64), unit="D", utc=True)
+    users = np.asarray(users, dtype=np.int64)
+    cohort_users = np.asarray(cohort_users, dtype=np.int64)
+    return pd.DataFrame(
+        {
+            "cohort": cohort,
+            "day": np.asarray(day, dtype=np.int64),
+            "users": users,
+            "cohort_users": cohort_users,
+            "retention": users / np.maximum(cohort_users, 1),
+        }
+    )
+
+
+def compute_retention(
+    in_path: str | Path,
+    out_path: str | Path,
+    max_days: int = DEFAULT_RETENTION_DAYS,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    write_options: WriteOptions | None = None,
+) -> Path:
+    """
+    Write the first-seen-date x days-since-first-seen retention matrix of the events
+    in `in_path` (Parquet/IPC file or partitioned directory) to `out_path`, in long
+    form (`RETENTION_COLUMNS`, see `retention_matrix`).
+
+    Users are assigned to the cohort of the first day they appear in the data read:
+    `until` and `features` are pushed down to the scan (with `features`, a user's first
+    use of those features), while `since` only selects cohorts, so users active before
+    it are not counted as new.
+    """
+    out_path = Path(out_path)
+    user, day = active_pairs(in_path, until=until, features=features)
+    matrix = retention_matrix(user, day, max_days, since)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with metrics.phase("retention.write", rows_in=len(matrix)):
+        write_frame(matrix, out_path, write_options)
+    return out_path
+
+
+def read_retention(path: str | Path) -> pd.DataFrame:
+    """A `compute_retention` output; ValueError if `path` is something else."""
+    matrix = read_frame(path)
+    missing = set(RETENTION_COLUMNS) - set(matrix.columns)
+    if missing:
+        raise ValueError(f"{path} is not a retention matrix (missing {sorted(missing)}).")
+    return matrix
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+import numpy as np
+import pandas as pd
+
+from . import metrics, sketch
+from .dataset import open_dataset, read_frame, to_utc_day
+from .fsutil import write_atomic
+from .layout import WriteOptions, write_frame
+
+ROLLUP_VERSION = 1
+MANIFEST = "rollup.json"
+GRANULARITIES = ("hour", "day", "week", "month")
+# Levels each stored level can be rolled up into (weeks straddle months)
+DERIVES = {
+    "hour": ("hour", "day", "week", "month"),
+    "day": ("day", "week", "month"),
+    "week": ("week",),
+    "month": ("month",),
+}
+# Coarser than transform's users_hll: one sketch per (hour, feature) adds up quickly.
+# 2**12 registers -> ~1.6% standard error. Dense that is 4 KiB per sketch (~7 GB a year of
+# hours x 200 features), so sketches of fewer than 1024 set registers, which most hours
+# are, are stored sparse at 4 bytes per register (`sketch.to_bytes`), and built and merged
+# from their set registers only.
+ROLLUP_PRECISION = 12
+QUERY_QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+def floor_period(ts: pd.Series, granularity: str) -> pd.Series:
+    """Start of the UTC hour / day / ISO week (Monday) / month containing each timestamp."""
+    if granularity == "hour":
+        return ts.dt.floor("h")
+    day = ts.dt.floor("D")
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - pd.to_timedelta(day.dt.weekday, unit="D")
+    if granularity == "month":
+        return day - pd.to_timedelta(day.dt.day - 1, unit="D")
+    raise ValueError(f"Unknown granularity {granularity!r}: use one of {list(GRANULARITIES)}.")
+
+
+def _next_period(start: pd.Timestamp, granularity: str) -> pd.Timestamp:
+    if granularity == "month":
+        return start + pd.offsets.MonthBegin(1)
+    return start + pd.Timedelta({"hour": "1h", "day": "1D", "week": "7D"}[granularity])
+
+
+def _parse_levels(levels: str | Iterable[str]) -> list[str]:
+    if isinstance(levels, str):
+        levels = levels.split(",")
+    out = {s.strip() for s in levels if s.strip()}
+    unknown = out - set(GRANULARITIES)
+    if unknown or not out:
+        raise ValueError(f"Unknown rollup levels {sorted(unknown)}: use {list(GRANULARITIES)}.")
+    return [g for g in GRANULARITIES if g in out]
+
+
+def _group_codes(df: pd.DataFrame) -> tuple[np.ndarray, pd.DataFrame]:
+    """Integer code per row for its (period, feature_id), plus the sorted key frame."""
+    grouped = df.groupby(["period", "feature_id"], sort=True, observed=True)
+    keys = grouped.ngroup().to_numpy()
+    key_frame = grouped.size().reset_index()[["period", "feature_id"]]
+    return keys, key_frame
+
+
+def _merge_dd_grouped(
+    blobs: Sequence[bytes | None], keys: np.ndarray, n_groups: int
+) -> list[bytes | None]:
+    parts: list[list[bytes | None]] = [[] for _ in range(n_groups)]
+    for k, blob in zip(keys, blobs):
+        parts[k].append(blob)
+    return [sketch.dd_merge_bytes(p) for p in parts]
+
+
+def aggregate_hourly(events: pd.DataFrame, precision: int = ROLLUP_PRECISION) -> pd.DataFrame:
+    """
+    The finest rollup level, in one pass over raw events: one row per (hour, feature_id)
+    with `events`, `latency_sum` / `latency_count` and the `latency_dd` quantile sketch
+    (when latency_ms is present), and `users_hll`, a HyperLogLog of the hour's users.
+    """
+    with metrics.phase("rollup.hour", rows_in=len(events)) as ph:
+        ts = events["timestamp"]
+        df = pd.DataFrame({"period": floor_period(ts, "hour"), "feature_id": events["feature_id"]})
+        keys, out = _group_codes(df)
+        n = len(out)
+        out["events"] = np.bincount(keys, minlength=n).astype(np.int64)
+        if "latency_ms" in events.columns:
+            latency = pd.to_numeric(events["latency_ms"], errors="coerce").to_numpy(np.float64)
+            ok = ~np.isnan(latency)
+            out["latency_sum"] = np.bincount(keys[ok], weights=latency[ok], minlength=n)
+            out["latency_count"] = np.bincount(keys[ok], minlength=n).astype(np.int64)
+            out["latency_dd"] = sketch.dd_build_grouped(keys, latency, n)
+        hashes = sketch.hash_values(events["user_id"])
+        out["users_hll"] = sketch.build_grouped_bytes(keys, hashes, n, precision=precision)
+        out["feature_id"] = out["feature_id"].astype("string")
+        ph.rows_out = n
+    return out
+
+
+def roll_up(table: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """
+    Re-aggregate a rollup table into a coarser `granularity` without raw events: counts
+    and latency sums add up, and the user / latency sketches merge losslessly.
+    """
+    with metrics.phase(f"rollup.{granularity}", rows_in=len(table)) as ph:
+        df = table.assign(period=floor_period(table["period"], granularity))
+        keys, out = _group_codes(df)
+        n = len(out)
+        out["events"] = np.bincount(keys, weights=df["events"], minlength=n).astype(np.int64)
+        if "latency_sum" in df.columns:
+            out["latency_sum"] = np.bincount(keys, weights=df["latency_sum"], minlength=n)
+            counts = np.bincount(keys, weights=df["latency_count"], minlength=n)
+            out["latency_count"] = counts.astype(np.int64)
+            out["latency_dd"] = _merge_dd_grouped(df["latency_dd"].tolist(), keys, n)
+        if n:
+            out["users_hll"] = sketch.merge_grouped_bytes(df["users_hll"].tolist(), keys, n)
+        else:
+            out["users_hll"] = pd.Series(dtype=object)
+        ph.rows_out = n
+    return out
+
+
+def build_rollup(
+    in_path: str | Path,
+    out_dir: str | Path,
+    levels: str | Iterable[str] = GRANULARITIES,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    write_options: WriteOptions | None = None,
+) -> Path:
+    """
+    Build the rollup cube of raw events: `<level>.parquet` per stored level plus
+    `rollup.json`, in `out_dir`.
+
+    Events are read once and aggregated per (hour, feature_id) (`aggregate_hourly`);
+    day is rolled up from hours, and week and month from days (`roll_up`), so no level
+    re-reads raw data. Every level keeps the same additive measures and mergeable
+    sketches, so `query_rollup` can answer any coarser granularity from it. `levels`
+    selects which levels are written (the finest one always is computed).
+    """
+    in_path, out_dir = Path(in_path), Path(out_dir)
+    levels = _parse_levels(levels)
+    names = open_dataset(in_path).schema.names
+    columns = [c for c in ("timestamp", "user_id", "feature_id", "latency_ms") if c in names]
+    with metrics.phase("rollup.read") as ph:
+        events = read_frame(in_path, columns=columns, since=since, until=until, features=features)
+        ph.rows_out = len(events)
+
+    tables = {"hour": aggregate_hourly(events)}
+    del events
+    tables["day"] = roll_up(tables["hour"], "day")
+    for g in ("week", "month"):
+        if g in levels:
+            tables[g] = roll_up(tables["day"], g)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with metrics.phase("rollup.write"):
+        for g in levels:
+            write_frame(tables[g], out_dir / f"{g}.parquet", write_options)
+    manifest = {
+        "version": ROLLUP_VERSION,
+        "levels": {g: {"file": f"{g}.parquet", "rows": len(tables[g])} for g in levels},
+        "precision": ROLLUP_PRECISION,
+        "latency": "latency_ms" in columns,
+    }
+    write_atomic(out_dir / MANIFEST, json.dumps(manifest, indent=2, sort_keys=True))
+    return out_dir
+
+
+def load_manifest(cube_dir: str | Path) -> dict[str, Any]:
+    path = Path(cube_dir) / MANIFEST
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"{cube_dir} is not a rollup directory (run tlt rollup).") from None
+    if manifest.get("version") != ROLLUP_VERSION:
+        raise ValueError(f"Unsupported rollup version in {path}.")
+    return manifest
+
+
+def is_rollup(path: str | Path) -> bool:
+    return (Path(path) / MANIFEST).is_file()
+
+
+def choose_level(manifest: dict[str, Any], granularity: str) -> str:
+    """The stored level with the fewest rows that `granularity` can be rolled up from."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}: use one of {list(GRANULARITIES)}.")
+    stored = manifest["levels"]
+    usable = [g for g in stored if granularity in DERIVES[g]]
+    if not usable:
+        raise ValueError(
+            f"No stored rollup level can answer {granularity!r} (stored: {sorted(stored)})."
+        )
+    return min(usable, key=lambda g: stored[g]["rows"])
+
+
+def query_rollup(
+    cube_dir: str | Path,
+    granularity: str,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    by_feature: bool = True,
+) -> tuple[pd.DataFrame, str]:
+    """
+    Metrics per `granularity` period (and feature_id unless `by_feature=False`) from the
+    smallest suitable stored level. Returns (frame, level used).
+
+    Columns: period, [feature_id,] events, users (HyperLogLog estimate), latency_mean and
+    p50/p95/p99 (sketch percentiles) when latency was rolled up. `since` / `until` select
+    whole periods: every period that contains a day in [since, until].
+    """
+    cube_dir = Path(cube_dir)
+    level = choose_level(load_manifest(cube_dir), granularity)
+    with metrics.phase("rollup.query_read") as ph:
+        table = read_frame(cube_dir / f"{level}.parquet", features=features)
+        ph.rows_out = len(table)
+    if since is not None:
+        start = floor_period(pd.Series([to_utc_day(since)]), granularity).iloc[0]
+        table = table[table["period"] >= start]
+    if until is not None:
+        last = floor_period(pd.Series([to_utc_day(until)]), granularity).iloc[0]
+        table = table[table["period"] < _next_period(last, granularity)]
+
+    if not by_feature:
+        table = table.assign(feature_id="(all)")
+    if granularity != level or not by_feature:
+        table = roll_up(table, granularity)
+
+    out = table[["period", "feature_id", "events"]].reset_index(drop=True)
+    out["users"] = [round(sketch.estimate(sketch.from_bytes(b))) for b in table["users_hll"]]
+    if "latency_sum" in table.columns:
+        counts = table["latency_count"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["latency_mean"] = table["latency_sum"].to_numpy() / counts
+        qs = [sketch.dd_quantiles(b, QUERY_QUANTILES.values()) for b in table["latency_dd"]]
+        qs = np.array(qs, dtype=np.float64).reshape(len(out), len(QUERY_QUANTILES))
+        for i, name in enumerate(QUERY_QUANTILES):
+            out[name] = qs[:, i]
+    if not by_feature:
+        out = out.drop(columns="feature_id")
+    return out, level
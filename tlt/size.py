@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import tempfile
+import time
 from pathlib import Path
 
 
@@ -13,22 +15,142 @@ def _fmt(n: int) -> str:
     return f"{x:.1f} {units[i]}"
 
 
-def compare(csv_path: str | Path, parquet_path: str | Path) -> str:
+def compare(
+    csv_path: str | Path, parquet_path: str | Path, ipc_path: str | Path | None = None
+) -> str:
     csv_p = Path(csv_path)
     pq_p = Path(parquet_path)
 
-    if not csv_p.exists():
-        raise FileNotFoundError(csv_p)
-    if not pq_p.exists():
-        raise FileNotFoundError(pq_p)
+    for p in (csv_p, pq_p, ipc_path):
+        if p is not None and not Path(p).exists():
+            raise FileNotFoundError(p)
 
     c = csv_p.stat().st_size
     p = pq_p.stat().st_size
     ratio = (p / c) if c else float("inf")
 
-    return (
+    out = (
         "=== Size Comparison ===\n"
         f"CSV:     {_fmt(c)}  ({c} bytes)\n"
         f"Parquet: {_fmt(p)}  ({p} bytes)\n"
-        f"Parquet/CSV ratio: {ratio:.3f}\n"
     )
+    if ipc_path is not None:
+        a = Path(ipc_path).stat().st_size
+        out += f"IPC:     {_fmt(a)}  ({a} bytes)\n"
+    out += f"Parquet/CSV ratio: {ratio:.3f}\n"
+    if ipc_path is not None:
+        out += f"IPC/CSV ratio:     {(a / c) if c else float('inf'):.3f}\n"
+        out += f"IPC/Parquet ratio: {(a / p) if p else float('inf'):.3f}\n"
+    return out
+
+
+# Layouts `tlt size --bench-codecs` compares (tlt.layout.WriteOptions arguments)
+BENCH_CONFIGS: dict[str, dict] = {
+    "none": {"codec": "none"},
+    "snappy": {"codec": "snappy"},
+    "lz4": {"codec": "lz4"},
+    "gzip": {"codec": "gzip"},
+    "brotli": {"codec": "brotli"},
+    "zstd": {"codec": "zstd"},
+    "zstd-1": {"codec": "zstd", "level": 1},
+    "zstd-3": {"codec": "zstd", "level": 3},
+    "zstd-9": {"codec": "zstd", "level": 9},
+    "zstd+rg64k": {"codec": "zstd", "row_group_rows": 1 << 16},
+    "zstd+sorted": {"codec": "zstd", "sort_by": ("feature_id", "timestamp")},
+    "zstd+sorted+rg64k+index": {
+        "codec": "zstd",
+        "sort_by": ("feature_id", "timestamp"),
+        "row_group_rows": 1 << 16,
+        "page_index": True,
+    },
+    "zstd+bloom": {"codec": "zstd", "bloom_filter": ("user_id",)},
+    "zstd-nostats": {"codec": "zstd", "statistics": False},
+    # Arrow IPC files: larger, but read through a memory map (uncompressed: zero-copy)
+    "ipc": {"format": "ipc", "codec": "none"},
+    "ipc+lz4": {"format": "ipc", "codec": "lz4"},
+    "ipc+zstd": {"format": "ipc", "codec": "zstd"},
+}
+
+
+def bench_codecs(
+    parquet_path: str | Path,
+    sample_rows: int = 1_000_000,
+    configs: dict[str, dict] | None = None,
+    repeat: int = 3,
+) -> list[dict]:
+    """
+    Rewrite the first `sample_rows` rows of a Parquet file/dataset with each layout in
+    `configs` (default BENCH_CONFIGS; codecs and bloom filters this pyarrow lacks are
+    skipped) and measure file size, write time, full read time and a filtered read (one
+    feature_id, the kind of read `--feature` does). Times are the best of `repeat` runs.
+
+    A config's `format` ("parquet" by default, or "ipc") picks the file type; reads go
+    through `tlt.dataset.read_table`, so IPC files are memory-mapped as in the pipeline.
+    """
+    import pyarrow as pa
+
+    from .dataset import open_dataset, read_table
+    from .layout import WriteOptions, bloom_filters_supported, write_table
+
+    sample = open_dataset(parquet_path).head(sample_rows)
+    if "date" in sample.column_names and "timestamp" in sample.column_names:
+        sample = sample.drop_columns(["date"])  # partition key of a partitioned dataset
+    feature = None
+    if "feature_id" in sample.column_names and sample.num_rows:
+        feature = sample.column("feature_id").cast(pa.string())[sample.num_rows // 2].as_py()
+
+    def best(fn) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="tlt-codecs-") as tmp:
+        for name, kwargs in (configs or BENCH_CONFIGS).items():
+            codec = kwargs.get("codec", "auto")
+            if codec not in ("auto", "none") and not pa.Codec.is_available(codec):
+                continue
+            if kwargs.get("bloom_filter") and not bloom_filters_supported():
+                continue
+            kwargs = dict(kwargs)
+            fmt = kwargs.pop("format", "parquet")
+            options = WriteOptions(**kwargs)
+            path = Path(tmp) / f"{name}.{'arrow' if fmt == 'ipc' else 'parquet'}"
+            write_s = best(lambda: write_table(sample, path, options))
+            read_s = best(lambda: read_table(path))
+            filter_s = None
+            if feature is not None:
+                filter_s = best(lambda: read_table(path, features=[feature]))
+            results.append(
+                {
+                    "config": name,
+                    "format": fmt,
+                    "options": options.params(),
+                    "rows": sample.num_rows,
+                    "bytes": path.stat().st_size,
+                    "write_s": write_s,
+                    "read_s": read_s,
+                    "filter_read_s": filter_s,
+                }
+            )
+    return results
+
+
+def format_codec_bench(results: list[dict]) -> str:
+    if not results:
+        return "No configurations could be benchmarked.\n"
+    smallest = min(r["bytes"] for r in results)
+    lines = [
+        f"=== Parquet / Arrow IPC layouts ({results[0]['rows']} rows sample) ===",
+        f"{'config':<24} {'size':>10} {'vs best':>8} {'write':>8} {'read':>8} {'filtered':>9}",
+    ]
+    for r in results:
+        filtered = f"{r['filter_read_s']:8.3f}s" if r["filter_read_s"] is not None else "      n/a"
+        lines.append(
+            f"{r['config']:<24} {_fmt(r['bytes']):>10} {r['bytes'] / smallest:7.2f}x "
+            f"{r['write_s']:7.3f}s {r['read_s']:7.3f}s {filtered}"
+        )
+    return "\n".join(lines) + "\n"
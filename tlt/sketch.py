@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+import numpy as np
+import pandas as pd
+
+# 2**14 registers -> ~0.8% standard error, 16 KiB per sketch (less once Parquet compresses it)
+PRECISION = 14
+# Header-byte flag of the sparse serialized form (`_pack`); precisions stay below it
+_SPARSE = 0x80
+
+
+def hash_values(values: pd.Series | np.ndarray) -> np.ndarray:
+    """
+    Stable 64-bit hashes (pandas' keyed SipHash), identical across runs and processes.
+
+    Integer user codes (dictionary-encoded ingest) hash without a trip through Python
+    strings; sketches are only comparable between data using the same user_id encoding.
+    """
+    arr = np.asarray(values)
+    if not np.issubdtype(arr.dtype, np.integer):
+        arr = np.asarray(values, dtype=object)
+    return pd.util.hash_array(arr).astype(np.uint64)
+
+
+def _index_and_rank(hashes: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    """Register index (top `precision` bits) and rank (leading zeros + 1 of the rest)."""
+    hashes = hashes.astype(np.uint64, copy=False)
+    rest_bits = 64 - precision
+    idx = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    # rest < 2**50, so the float conversion is exact and frexp gives its bit length
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    rank = (rest_bits - bit_length + 1).astype(np.uint8)
+    return idx, rank
+
+
+def build(hashes: np.ndarray, precision: int = PRECISION) -> np.ndarray:
+    """One sketch (uint8 registers) over all `hashes`."""
+    regs = np.zeros(1 << precision, dtype=np.uint8)
+    if len(hashes):
+        idx, rank = _index_and_rank(hashes, precision)
+        np.maximum.at(regs, idx, rank)
+    return regs
+
+
+def _grouped_max(
+    flat: np.ndarray, rank: np.ndarray, m: int, n_groups: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Max rank per `flat` = group * m + register, as the sorted non-empty (flat, rank)
+    pairs plus the [bounds[g], bounds[g + 1]) slice of each group code in [0, n_groups).
+    """
+    best = pd.Series(rank).groupby(flat, sort=True).max()
+    flat_u = best.index.to_numpy()
+    ranks = best.to_numpy(dtype=np.uint8)
+    return flat_u, ranks, np.searchsorted(flat_u // m, np.arange(n_groups + 1))
+
+
+def build_grouped(
+    groups: np.ndarray, hashes: np.ndarray, n_groups: int, precision: int = PRECISION
+) -> list[np.ndarray]:
+    """
+    One sketch per group code in [0, n_groups).
+
+    Collapses to the max rank per (group, register) first, so the only per-group
+    Python work is scattering the non-empty registers.
+    """
+    m = 1 << precision
+    idx, rank = _index_and_rank(hashes, precision)
+    flat_u, ranks, bounds = _grouped_max(groups.astype(np.int64) * m + idx, rank, m, n_groups)
+
+    out = []
+    for g in range(n_groups):
+        regs = np.zeros(m, dtype=np.uint8)
+        lo, hi = bounds[g], bounds[g + 1]
+        regs[flat_u[lo:hi] - g * m] = ranks[lo:hi]
+        out.append(regs)
+    return out
+
+
+def build_grouped_bytes(
+    groups: np.ndarray, hashes: np.ndarray, n_groups: int, precision: int = PRECISION
+) -> list[bytes]:
+    """
+    `build_grouped` serialized with `to_bytes`, without holding every group's dense
+    registers at once: memory follows the non-empty registers, not n_groups * 2**precision.
+    """
+    m = 1 << precision
+    idx, rank = _index_and_rank(hashes, precision)
+    flat_u, ranks, bounds = _grouped_max(groups.astype(np.int64) * m + idx, rank, m, n_groups)
+    return [
+        _pack(precision, flat_u[lo:hi] - g * m, ranks[lo:hi])
+        for g, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+
+
+def merge_grouped_bytes(blobs: Sequence[bytes], groups: np.ndarray, n_groups: int) -> list[bytes]:
+    """Per group code in [0, n_groups), the union of the serialized sketches carrying it."""
+    parts = [_unpack(b) for b in blobs]
+    precisions = {p for p, _, _ in parts}
+    if len(precisions) > 1:
+        raise ValueError(f"Cannot merge sketches of different precisions {sorted(precisions)}.")
+    precision = precisions.pop() if precisions else PRECISION
+    m = 1 << precision
+    flat = [np.asarray(idx, dtype=np.int64) + g * m for g, (_, idx, _) in zip(groups, parts)]
+    rank = [r for _, _, r in parts]
+    if not parts:
+        flat, rank = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.uint8)]
+    flat_u, ranks, bounds = _grouped_max(np.concatenate(flat), np.concatenate(rank), m, n_groups)
+    return [
+        _pack(precision, flat_u[lo:hi] - g * m, ranks[lo:hi])
+        for g, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+
+
+def merge(sketches: Iterable[np.ndarray]) -> np.ndarray:
+    """Union of sketches: register-wise max."""
+    sketches = list(sketches)
+    if not sketches:
+        return np.zeros(1 << PRECISION, dtype=np.uint8)
+    return np.maximum.reduce(sketches)
+
+
+def estimate(regs: np.ndarray) -> float:
+    """Cardinality estimate with the linear-counting small-range correction."""
+    m = regs.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -regs.astype(np.int64)))
+    zeros = int(np.count_nonzero(regs == 0))
+    if raw <= 2.5 * m and zeros:
+        return float(m * np.log(m / zeros))
+    return float(raw)
+
+
+def to_bytes(regs: np.ndarray) -> bytes:
+    """
+    Serialize as one precision byte followed by the raw registers, or, when that is
+    smaller (few distinct users), by the non-empty registers only (see `_pack`).
+    """
+    precision = int(regs.shape[-1]).bit_length() - 1
+    idx = np.flatnonzero(regs)
+    return _pack(precision, idx, regs[idx])
+
+
+def _pack(precision: int, idx: np.ndarray, ranks: np.ndarray) -> bytes:
+    """
+    Sparse form: the header byte has `_SPARSE` set and is followed by one little-endian
+    uint32 (register << 8 | rank) per non-empty register, in register order. Used when
+    it beats the 2**precision dense bytes, i.e. below a quarter of the registers set.
+    """
+    m = 1 << precision
+    if 4 * len(idx) < m:
+        pairs = (np.asarray(idx, dtype=np.uint32) << 8) | np.asarray(ranks, dtype=np.uint32)
+        return bytes([precision | _SPARSE]) + pairs.astype("<u4").tobytes()
+    regs = np.zeros(m, dtype=np.uint8)
+    regs[idx] = ranks
+    return bytes([precision]) + regs.tobytes()
+
+
+def _unpack(blob: bytes) -> tuple[int, np.ndarray, np.ndarray]:
+    """(precision, register indexes, ranks) of a serialized sketch's non-empty registers."""
+    precision = blob[0] & ~_SPARSE
+    m = 1 << precision
+    if blob[0] & _SPARSE:
+        if (len(blob) - 1) % 4:
+            raise ValueError("Corrupt HyperLogLog sketch.")
+        pairs = np.frombuffer(blob, dtype="<u4", offset=1)
+        idx = (pairs >> 8).astype(np.int64)
+        if len(idx) and idx[-1] >= m:
+            raise ValueError("Corrupt HyperLogLog sketch.")
+        return precision, idx, (pairs & 0xFF).astype(np.uint8)
+    regs = np.frombuffer(blob, dtype=np.uint8, offset=1)
+    if len(regs) != m:
+        raise ValueError("Corrupt HyperLogLog sketch.")
+    idx = np.flatnonzero(regs)
+    return precision, idx, regs[idx]
+
+
+def from_bytes(blob: bytes) -> np.ndarray:
+    if not blob[0] & _SPARSE:
+        regs = np.frombuffer(blob, dtype=np.uint8, offset=1)
+        if len(regs) != 1 << blob[0]:
+            raise ValueError("Corrupt HyperLogLog sketch.")
+        return regs
+    precision, idx, ranks = _unpack(blob)
+    regs = np.zeros(1 << precision, dtype=np.uint8)
+    regs[idx] = ranks
+    return regs
+
+
+def merge_bytes(blobs: Iterable[bytes | None]) -> np.ndarray:
+    """Union of serialized sketches (nulls ignored)."""
+    return merge(from_bytes(b) for b in blobs if b is not None)
+
+
+# ---------------------------------------------------------------------------
+# Latency quantile sketch (DDSketch-style log buckets)
+# ---------------------------------------------------------------------------
+
+# Every value is reported within 1% of its true value
+DD_RELATIVE_ACCURACY = 0.01
+_DD_ZERO_KEY = np.iinfo(np.int32).min  # bucket for values <= _DD_MIN_VALUE
+_DD_MIN_VALUE = 1e-9
+_DD_HEADER = np.dtype([("gamma", "<f8"), ("n", "<i8")])
+
+
+def _dd_gamma(relative_accuracy: float) -> float:
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+
+
+def dd_build_grouped(
+    groups: np.ndarray,
+    values: np.ndarray,
+    n_groups: int,
+    relative_accuracy: float = DD_RELATIVE_ACCURACY,
+) -> list[bytes | None]:
+    """
+    One serialized quantile sketch per group code in [0, n_groups) (None if no values).
+
+    Values map to log-spaced buckets ceil(log_gamma(v)); a sketch is just the sparse
+    (bucket, count) pairs, so merging is adding counts per bucket.
+    """
+    gamma = _dd_gamma(relative_accuracy)
+    values = np.asarray(values, dtype=np.float64)
+    ok = ~np.isnan(values)
+    groups, values = groups[ok].astype(np.int64), values[ok]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keys = np.where(
+            values > _DD_MIN_VALUE,
+            np.ceil(np.log(np.maximum(values, _DD_MIN_VALUE)) / np.log(gamma)),
+            _DD_ZERO_KEY,
+        ).astype(np.int64)
+    combined = groups * (1 << 32) + (keys - _DD_ZERO_KEY)
+    uniq, counts = np.unique(combined, return_counts=True)
+    owner = uniq >> 32
+    bounds = np.searchsorted(owner, np.arange(n_groups + 1))
+
+    out: list[bytes | None] = []
+    for g in range(n_groups):
+        lo, hi = bounds[g], bounds[g + 1]
+        if lo == hi:
+            out.append(None)
+            continue
+        bucket = ((uniq[lo:hi] & ((1 << 32) - 1)) + _DD_ZERO_KEY).astype(np.int32)
+        out.append(_dd_pack(gamma, bucket, counts[lo:hi].astype(np.int64)))
+    return out
+
+
+def _dd_pack(gamma: float, keys: np.ndarray, counts: np.ndarray) -> bytes:
+    header = np.array([(gamma, len(keys))], dtype=_DD_HEADER).tobytes()
+    return header + keys.astype("<i4").tobytes() + counts.astype("<i8").tobytes()
+
+
+def dd_from_bytes(blob: bytes) -> tuple[float, np.ndarray, np.ndarray]:
+    """(gamma, bucket keys, counts) from a serialized quantile sketch."""
+    header = np.frombuffer(blob, dtype=_DD_HEADER, count=1)[0]
+    gamma, n = float(header["gamma"]), int(header["n"])
+    off = _DD_HEADER.itemsize
+    keys = np.frombuffer(blob, dtype="<i4", count=n, offset=off)
+    counts = np.frombuffer(blob, dtype="<i8", count=n, offset=off + 4 * n)
+    return gamma, keys, counts
+
+
+def dd_merge_bytes(blobs: Iterable[bytes | None]) -> bytes | None:
+    """Merge serialized quantile sketches (nulls ignored); None if nothing to merge."""
+    parts = [dd_from_bytes(b) for b in blobs if b is not None]
+    if not parts:
+        return None
+    gammas = {p[0] for p in parts}
+    if len(gammas) != 1:
+        raise ValueError("Cannot merge quantile sketches with different accuracy.")
+    keys = np.concatenate([p[1] for p in parts]).astype(np.int64)
+    counts = np.concatenate([p[2] for p in parts])
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return _dd_pack(gammas.pop(), uniq, np.bincount(inverse, weights=counts).astype(np.int64))
+
+
+def dd_quantiles(blob: bytes | None, qs: Iterable[float]) -> list[float]:
+    """Quantiles from a serialized sketch (NaN for an empty one)."""
+    qs = list(qs)
+    if blob is None:
+        return [float("nan")] * len(qs)
+    gamma, keys, counts = dd_from_bytes(blob)
+    order = np.argsort(keys, kind="stable")
+    keys, cum = keys[order], np.cumsum(counts[order])
+    out = []
+    for q in qs:
+        i = int(np.searchsorted(cum, q * (cum[-1] - 1), side="right"))
+        k = int(keys[min(i, len(keys) - 1)])
+        out.append(0.0 if k == _DD_ZERO_KEY else float(2 * gamma**k / (gamma + 1)))
+    return out
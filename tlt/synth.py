@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+FEATURES = (
+    "menu",
+    "inventory",
+    "matchmake",
+    "level_load",
+    "importer",
+    "packager",
+    "search",
+    "settings",
+)
+EVENTS = ("open", "click", "close")
+
+# Same model as scripts/add_latency.py: base + |N(0, jitter)| ms, truncated to int
+DEFAULT_LATENCY = (45.0, 10.0)
+LATENCY_MODEL: dict[str, tuple[float, float]] = {
+    "menu": (30.0, 10.0),
+    "inventory": (30.0, 10.0),
+    "matchmake": (60.0, 10.0),
+    "level_load": (60.0, 10.0),
+}
+
+DEFAULT_CHUNK_ROWS = 2_000_000
+
+
+def feature_names(n_features: int) -> list[str]:
+    """The first `n_features` of FEATURES, then `feature_8`, `feature_9`, ..."""
+    extra = [f"feature_{i}" for i in range(len(FEATURES), n_features)]
+    return list(FEATURES[:n_features]) + extra
+
+
+def zipf_weights(n: int, skew: float) -> np.ndarray:
+    """P(rank k) ∝ 1 / k**skew for k = 1..n (skew=0 is uniform)."""
+    w = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** skew
+    return w / w.sum()
+
+
+def _user_labels(n_users: int) -> pa.Array:
+    ids = pa.array(np.arange(n_users, dtype=np.int64)).cast(pa.string())
+    return pc.binary_join_element_wise("u", ids, "")
+
+
+def _chunk(
+    rng: np.random.Generator,
+    n: int,
+    users: pa.Array,
+    user_p: np.ndarray | None,
+    features: list[str],
+    feature_p: np.ndarray,
+    latency: np.ndarray,
+    start: np.datetime64,
+    days: int,
+    sort: bool,
+) -> pa.Table:
+    secs = rng.integers(0, days * 86_400, n)
+    if sort:
+        secs.sort()
+    ts = pa.array(start + secs.astype("timedelta64[s]"))
+    # "YYYY-MM-DD HH:MM:SS" -> "YYYY-MM-DDTHH:MM:SSZ"; much faster than strftime
+    ts = pc.binary_join_element_wise(
+        pc.replace_substring(ts.cast(pa.string()), " ", "T", max_replacements=1), "Z", ""
+    )
+
+    user = rng.choice(len(users), n, p=user_p).astype(np.int32)
+    feat = rng.choice(len(features), n, p=feature_p).astype(np.int32)
+    event = rng.integers(0, len(EVENTS), n).astype(np.int32)
+    base, jitter = latency[feat, 0], latency[feat, 1]
+    latency_ms = (base + np.abs(rng.normal(0.0, 1.0, n)) * jitter).astype(np.int64)
+
+    return pa.table(
+        {
+            "timestamp": ts,
+            "user_id": pa.DictionaryArray.from_arrays(user, users),
+            "event": pa.DictionaryArray.from_arrays(event, pa.array(EVENTS)),
+            "feature_id": pa.DictionaryArray.from_arrays(feat, pa.array(features)),
+            "latency_ms": latency_ms,
+        }
+    )
+
+
+def iter_events(
+    n_rows: int,
+    n_users: int = 100_000,
+    n_features: int = len(FEATURES),
+    days: int = 30,
+    feature_skew: float = 1.1,
+    user_skew: float = 0.0,
+    latency: Mapping[str, tuple[float, float]] | None = None,
+    start: str = "2025-01-01",
+    sort: bool = False,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pa.Table]:
+    """
+    Yield a synthetic event set as Arrow tables of up to `chunk_rows` rows.
+
+    Columns match the ingest CSV (timestamp, user_id, event, feature_id, latency_ms).
+    Feature popularity and (optionally) user activity follow Zipf weights; timestamps
+    are uniform over `days` days from `start` (sorted per chunk with `sort=True`).
+    Latency per feature is base + |N(0, jitter)| ms from `latency` (feature ->
+    (base, jitter)), defaulting to LATENCY_MODEL / DEFAULT_LATENCY. Output is a pure
+    function of the arguments: chunk i uses the generator seeded with (seed, i).
+    """
+    if n_rows < 0 or n_users <= 0 or n_features <= 0 or days <= 0:
+        raise ValueError("n_rows must be >= 0; n_users, n_features and days must be positive.")
+    features = feature_names(n_features)
+    model = {**LATENCY_MODEL, **(latency or {})}
+    lat = np.array([model.get(f, DEFAULT_LATENCY) for f in features], dtype=np.float64)
+    users = _user_labels(n_users)
+    user_p = zipf_weights(n_users, user_skew) if user_skew else None
+    feature_p = zipf_weights(n_features, feature_skew)
+    origin = np.datetime64(start, "s")
+
+    # n_rows=0 still yields one (empty) chunk, so callers always see the schema
+    for i, lo in enumerate(range(0, max(n_rows, 1), chunk_rows)):
+        rng = np.random.default_rng([seed, i])
+        n = min(chunk_rows, n_rows - lo)
+        yield _chunk(rng, n, users, user_p, features, feature_p, lat, origin, days, sort)
+
+
+def generate_events(n_rows: int, **kwargs) -> pa.Table:
+    """The whole synthetic event set as one table (see `iter_events`)."""
+    return pa.concat_tables(list(iter_events(n_rows, **kwargs)))
+
+
+def write_events_csv(path: str | Path, n_rows: int, **kwargs) -> Path:
+    """
+    Stream a synthetic event set to CSV chunk by chunk, so 100M rows need only one
+    chunk in memory (see `iter_events` for the parameters).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    options = pacsv.WriteOptions(include_header=False, quoting_style="none")
+    with open(path, "wb") as f:
+        writer = None
+        for table in iter_events(n_rows, **kwargs):
+            if writer is None:
+                f.write((",".join(table.column_names) + "\n").encode())
+                writer = pacsv.CSVWriter(f, table.schema, write_options=options)
+            writer.write_table(table)
+        writer.close()
+    return path
@@ -1,70 +1,488 @@
 from __future__ import annotations
+import multiprocessing
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from . import metrics, sketch
+from .dataset import (
+    DAY_TABLE,
+    FEATURE_TABLE,
+    as_utc_timestamps,
+    read_frame,
+    to_utc_day,
+    with_partition_key,
+    write_partitioned,
+)
+from .layout import WriteOptions, write_frame
 
-def _compute_mau(events: pd.DataFrame, window_days: int = 30) -> pd.DataFrame:
+# Aggregation backends of `transform_parquet`; pandas is the reference implementation
+ENGINES = ("pandas", "arrow")
+# Per (date, feature_id) latency quantiles; p5..p95 also feed the report's boxplot
+LATENCY_QUANTILES = {"p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+
+def _parse_windows(window_days: int | str | Iterable[int]) -> list[int]:
+    """Normalize 30, "7,28,30" or [7, 28] into a sorted, de-duplicated list of windows."""
+    if isinstance(window_days, str):
+        window_days = [int(w) for w in window_days.split(",") if w.strip()]
+    elif isinstance(window_days, int):
+        window_days = [window_days]
+    windows = sorted({int(w) for w in window_days})
+    if not windows or windows[0] <= 0:
+        raise ValueError("MAU windows must be positive integers.")
+    return windows
+
+
+def _to_day_number(dates: pd.Series) -> np.ndarray:
+    """Days since epoch (int64) for a day-floored datetime series."""
+    return pd.DatetimeIndex(dates).as_unit("s").asi8 // 86_400
+
+
+def _compute_mau(events: pd.DataFrame, window_days: int | Iterable[int] = 30) -> pd.DataFrame:
     """
     Exact MAU per day: count of unique users active in the trailing `window_days` (inclusive).
     Requires 'date' as DatetimeIndex-like column (floored to day).
+
+    Last-seen sweep over the sorted (user_id, day) activity pairs: an active day `d`
+    keeps a user counted on days [d, d + W - 1]. Consecutive active days of the same
+    user only extend that interval, so each pair contributes the half-open interval
+    [max(d, prev_d + W), d + W) and MAU(t) = #starts <= t - #ends <= t. Cost is
+    O(pairs log pairs) with memory proportional to the pairs, whatever the number of
+    days or users. Several windows share one pass over the pairs.
     """
-    active = events[["date", "user_id"]].drop_duplicates().assign(present=1)
-    pivot = active.pivot_table(
-        index="date", columns="user_id", values="present", aggfunc="max", fill_value=0
+    windows = _parse_windows(window_days)
+    with metrics.phase("transform.mau", rows_in=len(events)) as ph:
+        out = _mau_sweep(events, windows)
+        ph.rows_out = len(out)
+    return out
+
+
+def _mau_sweep(events: pd.DataFrame, windows: list[int]) -> pd.DataFrame:
+    active = events[["date", "user_id"]].drop_duplicates()
+    dates = active["date"].drop_duplicates().sort_values().reset_index(drop=True)
+    out = pd.DataFrame({"date": dates})
+    if active.empty:
+        for w in windows:
+            out[f"mau_{w}d"] = pd.Series(dtype="int64")
+        return out
+
+    day = _to_day_number(active["date"])
+    user, _ = pd.factorize(active["user_id"])
+    order = np.lexsort((day, user))
+    day, user = day[order], user[order]
+
+    same_user = np.empty(len(day), dtype=bool)
+    same_user[0] = False
+    same_user[1:] = user[1:] == user[:-1]
+    prev_day = np.empty_like(day)
+    prev_day[0] = 0
+    prev_day[1:] = day[:-1]
+
+    query = _to_day_number(dates)
+    for w in windows:
+        start = np.where(same_user, np.maximum(day, prev_day + w), day)
+        end = day + w
+        keep = start < end
+        starts = np.sort(start[keep])
+        ends = np.sort(end[keep])
+        mau = np.searchsorted(starts, query, side="right") - np.searchsorted(
+            ends, query, side="right"
+        )
+        out[f"mau_{w}d"] = mau.astype("int64")
+    return out  # columns: ['date', 'mau_{w}d' for each window]
+
+
+def _group_keys(df: pd.DataFrame) -> tuple[np.ndarray, pd.DataFrame]:
+    """Integer code per row for its (date, feature_id), plus the sorted key frame."""
+    keys = df.groupby(["date", "feature_id"], sort=True, observed=True).ngroup().to_numpy()
+    key_frame = (
+        df[["date", "feature_id"]]
+        .drop_duplicates()
+        .sort_values(["date", "feature_id"])
+        .reset_index(drop=True)
     )
-    # time-based rolling window (e.g., '30D')
-    rolled = pivot.rolling(f"{window_days}D", min_periods=1).sum()
-    mau = (rolled > 0).sum(axis=1).rename(f"mau_{window_days}d")
-    return mau.reset_index()  # columns: ['date', f'mau_{window_days}d']
+    return keys, key_frame
+
+
+def _latency_quantiles(df: pd.DataFrame) -> pd.DataFrame:
+    """LATENCY_QUANTILES per (date, feature_id) in one vectorized groupby-quantile pass."""
+    with metrics.phase("transform.latency", rows_in=len(df)):
+        q = (
+            pd.to_numeric(df["latency_ms"], errors="coerce")
+            .astype("float64")
+            .groupby([df["date"], df["feature_id"]], observed=True)
+            .quantile(list(LATENCY_QUANTILES.values()))
+            .unstack()
+        )
+    # An empty groupby has no quantile level left to unstack into columns
+    q = q.reindex(columns=list(LATENCY_QUANTILES.values()))
+    q.columns = list(LATENCY_QUANTILES)
+    return q.reset_index()
+
+
+def _feature_sketches(df: pd.DataFrame) -> pd.DataFrame:
+    """Serialized HyperLogLog `users_hll` per (date, feature_id)."""
+    with metrics.phase("transform.users_hll", rows_in=len(df)):
+        keys, key_frame = _group_keys(df)
+        hashes = sketch.hash_values(df["user_id"])
+        return key_frame.assign(users_hll=sketch.build_grouped_bytes(keys, hashes, len(key_frame)))
+
+
+def _approx_dau_mau(
+    per_feature: pd.DataFrame, windows: list[int], only: pd.Series | None = None
+) -> pd.DataFrame:
+    """
+    Approximate `dau` and `mau_{N}d` per date from (date, feature_id) `users_hll` sketches.
+
+    A day's sketch is the register-wise max of its feature sketches (lossless), and MAU
+    is the union of the daily sketches in the trailing window. `only` limits the output
+    to those dates (the window still looks back over every day in `per_feature`).
+    """
+    with metrics.phase("transform.mau", rows_in=len(per_feature)):
+        return _approx_sweep(per_feature, windows, only)
+
+
+def _approx_sweep(
+    per_feature: pd.DataFrame, windows: list[int], only: pd.Series | None
+) -> pd.DataFrame:
+    per_feature = per_feature.sort_values("date", kind="stable")
+    dates = per_feature["date"].drop_duplicates().reset_index(drop=True)
+    bounds = np.searchsorted(per_feature["date"].to_numpy(), dates.to_numpy(), side="left")
+    bounds = np.append(bounds, len(per_feature))
+    if dates.empty:
+        empty = pd.Series(dtype="int64")
+        return pd.DataFrame({"date": dates, "dau": empty, **{f"mau_{w}d": empty for w in windows}})
+    blobs = per_feature["users_hll"].tolist()
+    daily = np.stack([sketch.merge_bytes(blobs[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])])
+
+    rows = np.arange(len(dates)) if only is None else np.flatnonzero(dates.isin(only))
+    per_day = pd.DataFrame({"date": dates.iloc[rows].reset_index(drop=True)})
+    per_day["dau"] = [round(sketch.estimate(daily[i])) for i in rows]
+    day = _to_day_number(dates)
+    for w in windows:
+        lo = np.searchsorted(day, day - w + 1, side="left")
+        per_day[f"mau_{w}d"] = [
+            round(sketch.estimate(np.maximum.reduce(daily[lo[i] : i + 1]))) for i in rows
+        ]
+    return per_day
+
+
+def _load_events(
+    in_path: Path,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    days: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Read raw events and add the day-floored `date` column every aggregate keys on."""
+    with metrics.phase("transform.read") as ph:
+        df = read_frame(in_path, since=since, until=until, features=features, days=days)
+        ph.rows_out = len(df)
+    return with_date(df)
+
+
+def with_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of raw events `df` with the UTC day-floored `date` every aggregate keys on."""
+    # Ensure timestamp and 'date' (floor to day, keep as datetime64 for parquet + rolling ops)
+    with metrics.phase("transform.dates", rows_in=len(df)):
+        ts = as_utc_timestamps(df["timestamp"])
+        if ts.isna().any():
+            raise ValueError("Some timestamps could not be parsed.")
+        df = df.copy()
+        df["date"] = ts.dt.floor("D")
+    return df
+
+
+def feature_metrics(df: pd.DataFrame, approx: bool, latency_sketch: bool) -> pd.DataFrame:
+    """
+    Per (date, feature_id): events, p5/p25/p50/p75/p95, optional `latency_dd` and `users_hll`.
+    Everything here only depends on that day's events.
+    """
+    # events per (date, feature)
+    with metrics.phase("transform.groupby_events", rows_in=len(df)) as ph:
+        events = df.groupby(["date", "feature_id"], observed=True).size()
+        events = events.reset_index(name="events")
+        ph.rows_out = len(events)
+
+    # optional latency metrics if present
+    if "latency_ms" in df.columns:
+        agg = events.merge(_latency_quantiles(df), on=["date", "feature_id"], how="left")
+        if latency_sketch:
+            with metrics.phase("transform.latency_dd", rows_in=len(df)):
+                keys, key_frame = _group_keys(df)
+                blobs = sketch.dd_build_grouped(
+                    keys, pd.to_numeric(df["latency_ms"], errors="coerce"), len(key_frame)
+                )
+            agg = agg.merge(
+                key_frame.assign(latency_dd=blobs), on=["date", "feature_id"], how="left"
+            )
+    else:
+        agg = events.assign(**{col: pd.NA for col in LATENCY_QUANTILES})
+
+    if approx:
+        agg = agg.merge(_feature_sketches(df), on=["date", "feature_id"], how="left")
+
+    if isinstance(agg["feature_id"].dtype, pd.CategoricalDtype):
+        # Dictionary-encoded input: labels only come back for the (small) output table
+        agg["feature_id"] = agg["feature_id"].astype("string")
+        agg = agg.sort_values(["date", "feature_id"], kind="stable").reset_index(drop=True)
+    return agg
+
+
+def _with_user_metrics(agg: pd.DataFrame, per_day: pd.DataFrame) -> pd.DataFrame:
+    """Attach per-day dau/mau columns to (date, feature_id) rows (sketches stay last)."""
+    with metrics.phase("transform.merge", rows_in=len(agg)):
+        tail = [c for c in ("users_hll",) if c in agg.columns]
+        out = agg.drop(columns=tail).merge(per_day, on="date", how="left")
+        return out.join(agg[tail]) if tail else out
+
+
+def _exact_dau(df: pd.DataFrame) -> pd.DataFrame:
+    # DAU per day (distinct users)
+    with metrics.phase("transform.dau", rows_in=len(df)):
+        return df.groupby("date")["user_id"].nunique().reset_index(name="dau")
+
+
+def _user_metrics(
+    agg: pd.DataFrame,
+    dau: pd.DataFrame | None,
+    pairs: pd.DataFrame | None,
+    windows: list[int],
+    approx: bool,
+) -> pd.DataFrame:
+    """Per-day dau/mau_{N}d from exact (date, user_id) pairs, or the rows' sketches if `approx`."""
+    if approx:
+        return _approx_dau_mau(agg, windows)
+    # MAU (rolling exact)
+    return dau.merge(_compute_mau(pairs, window_days=windows), on="date")
+
+
+def _add_user_metrics(
+    agg: pd.DataFrame,
+    dau: pd.DataFrame | None,
+    pairs: pd.DataFrame | None,
+    windows: list[int],
+    approx: bool,
+) -> pd.DataFrame:
+    """DAU/MAU from exact (date, user_id) pairs, or from the rows' sketches if `approx`."""
+    return _with_user_metrics(agg, _user_metrics(agg, dau, pairs, windows, approx))
+
+
+def aggregate_events(
+    events: pd.DataFrame,
+    mau_window: int | str | Iterable[int] = 30,
+    approx: bool = False,
+    latency_sketch: bool = False,
+) -> pd.DataFrame:
+    """
+    In-memory `transform_parquet`: aggregate a raw events frame (as ingest produces it)
+    into the same (date, feature_id) rows, without touching disk.
+    """
+    windows = _parse_windows(mau_window)
+    df = with_date(events)
+    agg = feature_metrics(df, approx, latency_sketch)
+    dau, pairs = (None, None) if approx else (_exact_dau(df), df)
+    return _add_user_metrics(agg, dau, pairs, windows, approx)
+
+
+def _write_agg(
+    agg: pd.DataFrame, out_path: Path, partitioned: bool, options: WriteOptions | None = None
+) -> None:
+    with metrics.phase("transform.write", rows_in=len(agg)):
+        if partitioned:
+            table = pa.Table.from_pandas(
+                with_partition_key(agg, source="date"), preserve_index=False
+            )
+            write_partitioned(table, out_path, options=options)
+        else:
+            write_frame(agg, out_path, options)
+
+
+def _write_normalized(
+    agg: pd.DataFrame,
+    per_day: pd.DataFrame,
+    out_dir: Path,
+    partitioned: bool,
+    options: WriteOptions | None = None,
+) -> None:
+    """The day-level and (date, feature_id) tables as `days` / `features` in `out_dir`."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, table in ((DAY_TABLE, per_day), (FEATURE_TABLE, agg)):
+        _write_agg(
+            table, out_dir / (name if partitioned else f"{name}.parquet"), partitioned, options
+        )
+
+
+def _shard_aggregate(
+    in_path: Path,
+    since: pd.Timestamp,
+    until: pd.Timestamp,
+    features: Sequence[str] | None,
+    approx: bool,
+    latency_sketch: bool,
+) -> tuple[pd.DataFrame, pd.DataFrame | None, pd.DataFrame | None]:
+    """Worker: per-day aggregates for one shard, plus its distinct (date, user_id) pairs."""
+    df = _load_events(in_path, since=since, until=until, features=features)
+    agg = feature_metrics(df, approx, latency_sketch)
+    if approx:
+        return agg, None, None
+    return agg, _exact_dau(df), df[["date", "user_id"]].drop_duplicates()
+
+
+def _aggregate_parallel(
+    in_path: Path,
+    since: pd.Timestamp | None,
+    until: str | pd.Timestamp | None,
+    features: Sequence[str] | None,
+    approx: bool,
+    latency_sketch: bool,
+    workers: int,
+) -> tuple[pd.DataFrame, pd.DataFrame | None, pd.DataFrame | None]:
+    """
+    Aggregate contiguous day shards in a process pool and merge the partials.
+
+    Everything per (date, feature_id) and DAU only depends on one day, so shard
+    results just concatenate. Rolling MAU needs users across shard boundaries: exact
+    mode merges the shards' distinct (date, user_id) pairs, approx mode the sketches.
+    Each worker reads its own shard with pushdown, so rows are never pickled.
+    """
+    ts = read_frame(in_path, columns=["timestamp"], since=since, until=until, features=features)
+    days = np.sort(as_utc_timestamps(ts["timestamp"]).dt.floor("D").unique())
+    if len(days) == 0:
+        shards = [(since, until)]
+    else:
+        shards = [
+            (pd.Timestamp(chunk[0]), pd.Timestamp(chunk[-1]))
+            for chunk in np.array_split(days, min(workers, len(days)))
+        ]
+
+    ctx = multiprocessing.get_context("spawn")  # no fork() under Arrow's thread pools
+    # Shard phases run in the workers: here they show up as this wait
+    with metrics.phase("transform.shards"):
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_shard_aggregate, in_path, lo, hi, features, approx, latency_sketch)
+                for lo, hi in shards
+            ]
+            parts = [f.result() for f in futures]
+
+    with metrics.phase("transform.merge_shards"):
+        agg = pd.concat([p[0] for p in parts], ignore_index=True)
+        if approx:
+            return agg, None, None
+        dau = pd.concat([p[1] for p in parts], ignore_index=True)
+        pairs = pd.concat([p[2] for p in parts], ignore_index=True)
+        return agg, dau, pairs
 
 
 def transform_parquet(
     in_path: str | Path,
     out_path: str | Path,
-    mau_window: int = 30,
+    mau_window: int | str | Iterable[int] = 30,
+    approx: bool = False,
+    latency_sketch: bool = False,
+    since: str | pd.Timestamp | None = None,
+    until: str | pd.Timestamp | None = None,
+    features: Sequence[str] | None = None,
+    partitioned: bool = False,
+    incremental: bool = False,
+    workers: int = 1,
+    write_options: WriteOptions | None = None,
+    normalized: bool = False,
+    engine: str = "pandas",
 ) -> Path:
     """
     Read raw events parquet, compute daily aggregates, and write an aggregated parquet.
 
     Produces one row per (date, feature_id):
       - events
-      - p50 / p95 latency (if latency_ms present)
+      - p5 / p25 / p50 / p75 / p95 latency (if latency_ms present)
       - dau per day (duplicated across features for convenience)
-      - mau_{mau_window}d per day (duplicated across features)
+      - mau_{N}d per day for each window N in `mau_window` (duplicated across features)
+
+    With `approx=True`, DAU/MAU are HyperLogLog estimates (~1% error) and each row also
+    carries `users_hll`, the serialized sketch of that (date, feature_id)'s users, so
+    distinct users over any date range can be merged later without raw events.
+
+    With `latency_sketch=True` (and latency_ms present), each row also carries
+    `latency_dd`, a mergeable quantile sketch (1% relative accuracy) of its latencies,
+    so correct percentiles over any set of days/features can be computed in report.
+
+    `in_path` may be a single Parquet or Arrow IPC file or a date-partitioned directory;
+    an IPC `out_path` (.arrow/.feather) is written as IPC. `since`/`until`
+    (inclusive days) and `features` are pushed down to the reader; events from the MAU
+    lookback before `since` are read too so the first days' MAU stays exact. With
+    `features`, DAU/MAU count users of those features only. `partitioned=True` writes
+    `out_path` as `date=YYYY-MM-DD/` partitions.
+
+    `incremental=True` keeps a state store next to the output and only re-aggregates
+    days whose input partitions changed since the last run (see `tlt.incremental`).
+
+    `workers > 1` splits the days into contiguous shards aggregated in a process pool
+    (see `_aggregate_parallel`); the output is identical to the serial path.
+
+    `write_options` sets the output's Parquet layout (`tlt.layout.WriteOptions`).
+
+    `engine="arrow"` computes the same output on the Arrow table with pyarrow.compute's
+    multithreaded group-by kernels instead of pandas (`tlt.arrow_engine`); it runs in
+    one process, so it does not combine with `workers` or `incremental`.
+
+    `normalized=True` makes `out_path` a directory with two tables instead of repeating
+    the per-day values on every feature row: `days` (date, dau, mau_{N}d) and `features`
+    (date, feature_id, events, latency and sketches), each `<name>.parquet` or, with
+    `partitioned`, a `<name>/` dataset. `tlt.dataset.read_aggregates` joins them back
+    into the flat layout.
     """
     in_path, out_path = Path(in_path), Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_parquet(in_path)
+    windows = _parse_windows(mau_window)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}: use one of {list(ENGINES)}.")
+    if engine == "arrow" and (incremental or workers > 1):
+        raise ValueError("The arrow engine does not support incremental or multi-worker runs.")
+    if incremental:
+        if since is not None or until is not None or features:
+            raise ValueError("Incremental transform does not support --since/--until/--feature.")
+        if normalized:
+            raise ValueError("Incremental transform does not support normalized output.")
+        from .incremental import transform_incremental
 
-    # Ensure timestamp and 'date' (floor to day, keep as datetime64 for parquet + rolling ops)
-    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    if ts.isna().any():
-        raise ValueError("Some timestamps could not be parsed.")
-    df = df.copy()
-    df["date"] = ts.dt.floor("D")
+        return transform_incremental(
+            in_path, out_path, windows, approx, latency_sketch, partitioned, write_options
+        )
 
-    # events per (date, feature)
-    events = df.groupby(["date", "feature_id"]).size().reset_index(name="events")
+    read_since = None
+    if since is not None:
+        read_since = to_utc_day(since) - pd.Timedelta(days=windows[-1] - 1)
 
-    # optional latency metrics if present
-    if "latency_ms" in df.columns:
-        lat = (
-            df.groupby(["date", "feature_id"])["latency_ms"]
-            .agg(p50=lambda s: float(s.quantile(0.5)), p95=lambda s: float(s.quantile(0.95)))
-            .reset_index()
+    if engine == "arrow":
+        from .arrow_engine import aggregate_arrow
+
+        agg, per_day = aggregate_arrow(
+            in_path, windows, approx, latency_sketch, read_since, until, features
         )
-        agg = events.merge(lat, on=["date", "feature_id"], how="left")
     else:
-        agg = events.assign(p50=pd.NA, p95=pd.NA)
+        if workers > 1:
+            agg, dau, pairs = _aggregate_parallel(
+                in_path, read_since, until, features, approx, latency_sketch, workers
+            )
+        else:
+            df = _load_events(in_path, since=read_since, until=until, features=features)
+            agg = feature_metrics(df, approx, latency_sketch)
+            dau, pairs = (None, None) if approx else (_exact_dau(df), df)
+        per_day = _user_metrics(agg, dau, pairs, windows, approx)
 
-    # DAU per day (distinct users)
-    dau = df.groupby("date")["user_id"].nunique().reset_index(name="dau")
-    agg = agg.merge(dau, on="date", how="left")
+    if since is not None:
+        agg = agg[agg["date"] >= to_utc_day(since)].reset_index(drop=True)
+        per_day = per_day[per_day["date"] >= to_utc_day(since)].reset_index(drop=True)
 
-    # MAU (rolling exact)
-    mau = _compute_mau(df, window_days=mau_window)
-    agg = agg.merge(mau, on="date", how="left")
-
-    agg.to_parquet(out_path, index=False)
+    if normalized:
+        _write_normalized(agg, per_day, out_path, partitioned, write_options)
+    else:
+        _write_agg(_with_user_metrics(agg, per_day), out_path, partitioned, write_options)
     return out_path
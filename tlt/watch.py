@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import io
+import json
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+import pandas as pd
+import pyarrow as pa
+
+from . import sketch
+from .dataset import PARTITION_COL, read_frame, with_partition_key, write_partitioned
+from .fsutil import atomic_path, write_atomic
+from .ingest import (
+    check_columns,
+    check_ts_format,
+    chunk_schema,
+    normalize_frame,
+    parse_csv,
+    valid_rows,
+)
+from .layout import WriteOptions, write_frame
+from .transform import LATENCY_QUANTILES, feature_metrics, with_date
+
+CHECKPOINT_VERSION = 1
+# Bytes read from one file per micro-batch (the rest waits for the next poll)
+DEFAULT_MAX_BATCH_BYTES = 64 << 20
+
+
+def checkpoint_path(out_dir: str | Path) -> Path:
+    """Offsets of a watched store live next to it: `<out>.watch.json`."""
+    out_dir = Path(out_dir)
+    return out_dir.parent / f"{out_dir.name}.watch.json"
+
+
+def _resolve_sources(sources: Iterable[str | Path]) -> list[Path]:
+    """Watched files plus every *.csv currently in watched (spool) directories."""
+    files = []
+    for src in sources:
+        path = Path(src)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*.csv") if p.is_file()))
+        elif path.is_file():
+            files.append(path)
+    return list(dict.fromkeys(p.resolve() for p in files))
+
+
+class LiveAggregates:
+    """
+    Events, DAU and latency per (date, feature_id) for the latest `days` event days,
+    updated batch by batch without re-reading older rows.
+
+    Per-feature rows come from transform's `feature_metrics`; event counts add up,
+    latency is kept as mergeable quantile sketches (percentiles within 1%) and DAU as
+    the exact set of each day's users. "Latest" follows event time, so a late event
+    for an older, already dropped day is ignored.
+    """
+
+    def __init__(self, days: int = 1) -> None:
+        if days <= 0:
+            raise ValueError("days must be a positive integer.")
+        self.days = days
+        self._events: dict[tuple[pd.Timestamp, str], int] = {}
+        self._latency: dict[tuple[pd.Timestamp, str], bytes | None] = {}
+        self._users: dict[pd.Timestamp, set] = {}
+
+    def update(self, events: pd.DataFrame) -> None:
+        if events.empty:
+            return
+        df = with_date(events)
+        cutoff = max([*self._users, df["date"].max()]) - pd.Timedelta(days=self.days - 1)
+        df = df[df["date"] >= cutoff]
+
+        rows = feature_metrics(df, approx=False, latency_sketch="latency_ms" in df.columns)
+        for row in rows.itertuples(index=False):
+            key = (row.date, str(row.feature_id))
+            self._events[key] = self._events.get(key, 0) + int(row.events)
+            blob = getattr(row, "latency_dd", None)
+            if isinstance(blob, bytes):
+                self._latency[key] = sketch.dd_merge_bytes([self._latency.get(key), blob])
+        for day, users in df.groupby("date")["user_id"]:
+            self._users.setdefault(day, set()).update(users.unique())
+
+        for key in [k for k in self._events if k[0] < cutoff]:
+            self._events.pop(key)
+            self._latency.pop(key, None)
+        for day in [d for d in self._users if d < cutoff]:
+            self._users.pop(day)
+
+    def frame(self) -> pd.DataFrame:
+        """Current rows in transform's column layout (date, feature_id, events, dau, p5..p95)."""
+        cols = ["date", "feature_id", "events", "dau", *LATENCY_QUANTILES]
+        rows = []
+        for (day, feature), n in sorted(self._events.items()):
+            blob = self._latency.get((day, feature))
+            qs = sketch.dd_quantiles(blob, LATENCY_QUANTILES.values()) if blob else []
+            rows.append(
+                {
+                    "date": day,
+                    "feature_id": feature,
+                    "events": n,
+                    "dau": len(self._users.get(day, ())),
+                    **dict(zip(LATENCY_QUANTILES, qs)),
+                    "latency_dd": blob,
+                }
+            )
+        out = pd.DataFrame(rows, columns=[*cols, "latency_dd"])
+        return out.astype({"events": "int64", "dau": "int64"})
+
+
+class Watcher:
+    """
+    Tail growing CSV files and spool directories into a date-partitioned store.
+
+    Each `poll()` is one micro-batch: the complete lines appended to every source
+    since its checkpointed offset are validated with ingest's rules (rows that fail
+    them are dropped and counted, not fatal), appended to `out_dir` as new
+    `date=YYYY-MM-DD/part-<seq>-<i>.parquet` files and folded into `aggregates`.
+
+    Offsets are checkpointed in two phases so a crash or restart never duplicates or
+    loses rows: the batch's byte ranges are recorded as pending before anything is
+    written, and committed after the files are in place. A pending batch found on
+    startup is replayed from the same ranges into the same file names. A source that
+    shrinks or is replaced (new inode) is read again from its start.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[str | Path],
+        out_dir: str | Path,
+        ts_format: str | None = None,
+        days: int = 1,
+        snapshot_path: str | Path | None = None,
+        write_options: WriteOptions | None = None,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    ) -> None:
+        check_ts_format(ts_format)
+        self.sources = [Path(s) for s in sources]
+        if not self.sources:
+            raise ValueError("Nothing to watch: give at least one file or directory.")
+        self.out_dir = Path(out_dir)
+        self.ts_format = ts_format
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+        self.write_options = write_options
+        self.max_batch_bytes = max_batch_bytes
+        self.checkpoint = self._load_checkpoint()
+
+        pending = self.checkpoint.get("pending")
+        if pending is not None:
+            self.aggregates = LiveAggregates(days)
+            self._apply(pending, self._read_ranges(pending["ranges"]))
+        # Built from the store afterwards, so the replayed rows are counted once
+        self.aggregates = LiveAggregates(days)
+        self._bootstrap()
+
+    # -- checkpoint ---------------------------------------------------------
+
+    def _load_checkpoint(self) -> dict[str, Any]:
+        path = checkpoint_path(self.out_dir)
+        if not path.exists():
+            return {"version": CHECKPOINT_VERSION, "seq": 0, "files": {}, "pending": None}
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported watch checkpoint version in {path}.")
+        return state
+
+    def _save_checkpoint(self) -> None:
+        write_atomic(checkpoint_path(self.out_dir), json.dumps(self.checkpoint, indent=2))
+
+    def _bootstrap(self) -> None:
+        """Rebuild the live aggregates from the store's latest partitions only."""
+        if not self.out_dir.is_dir():
+            return
+        days = sorted(
+            p.name.split("=", 1)[1]
+            for p in self.out_dir.iterdir()
+            if p.is_dir() and p.name.startswith(f"{PARTITION_COL}=")
+        )[-self.aggregates.days :]
+        if days:
+            self.aggregates.update(read_frame(self.out_dir, days=days))
+
+    # -- reading ------------------------------------------------------------
+
+    def _plan(self) -> dict[str, dict[str, Any]]:
+        """New complete lines per source: {path: {start, end, inode, header}}."""
+        ranges = {}
+        for path in _resolve_sources(self.sources):
+            key = str(path)
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # rotated away between listing and stat
+            state = self.checkpoint["files"].get(key)
+            if state is None or state["inode"] != st.st_ino or st.st_size < state["offset"]:
+                state = {"offset": 0, "inode": st.st_ino, "header": None}
+            start = state["offset"]
+            if st.st_size <= start:
+                continue
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(min(st.st_size - start, self.max_batch_bytes))
+            header = state["header"]
+            if header is None:
+                line_end = data.find(b"\n")
+                if line_end < 0:
+                    continue  # header still being written
+                header = list(parse_csv(io.BytesIO(data[: line_end + 1])).columns)
+                start += line_end + 1
+                data = data[line_end + 1 :]
+            end = data.rfind(b"\n")
+            if end < 0 and start == state["offset"]:
+                continue  # only a partial line so far
+            ranges[key] = {
+                "start": start,
+                "end": start + end + 1,
+                "inode": st.st_ino,
+                "header": header,
+            }
+        return ranges
+
+    @staticmethod
+    def _read_ranges(ranges: dict[str, dict[str, Any]]) -> dict[str, bytes]:
+        out = {}
+        for key, r in ranges.items():
+            try:
+                with open(key, "rb") as f:
+                    f.seek(r["start"])
+                    out[key] = f.read(r["end"] - r["start"])
+            except FileNotFoundError:
+                out[key] = b""  # gone before the replay: nothing to redo
+        return out
+
+    def _parse(self, ranges: dict[str, dict[str, Any]], data: dict[str, bytes]):
+        frames, lines = [], 0
+        for key, r in ranges.items():
+            blob = data[key]
+            if not blob.strip():
+                continue
+            check_columns(r["header"])
+            lines += blob.count(b"\n")
+            df = parse_csv(io.BytesIO(blob), names=r["header"])
+            df, _, _ = normalize_frame(df, self.ts_format)
+            frames.append(df[valid_rows(df)])
+        if not frames:
+            return None, lines
+        return pd.concat(frames, ignore_index=True).sort_values("timestamp", kind="stable"), lines
+
+    # -- batches ------------------------------------------------------------
+
+    def poll(self) -> dict[str, Any] | None:
+        """Ingest one micro-batch; None when no source has new complete lines."""
+        ranges = self._plan()
+        if not ranges:
+            return None
+        batch = {"seq": self.checkpoint["seq"], "ranges": ranges}
+        self.checkpoint["pending"] = batch
+        self._save_checkpoint()
+        return self._apply(batch, self._read_ranges(ranges))
+
+    def _apply(self, batch: dict[str, Any], data: dict[str, bytes]) -> dict[str, Any]:
+        start = time.perf_counter()
+        df, lines = self._parse(batch["ranges"], data)
+        rows = 0 if df is None else len(df)
+        days: list[str] = []
+        if rows:
+            keyed = with_partition_key(df)
+            days = sorted(keyed[PARTITION_COL].unique())
+            schema = chunk_schema(keyed)
+            table = pa.Table.from_pandas(keyed, schema=schema, preserve_index=False)
+            write_partitioned(
+                table, self.out_dir, options=self.write_options, batch_id=f"{batch['seq']:08d}"
+            )
+            self.aggregates.update(df)
+
+        for key, r in batch["ranges"].items():
+            self.checkpoint["files"][key] = {
+                "offset": r["end"],
+                "inode": r["inode"],
+                "header": r["header"],
+            }
+        self.checkpoint["seq"] = batch["seq"] + 1
+        self.checkpoint["pending"] = None
+        self._save_checkpoint()
+
+        if self.snapshot_path is not None and rows:
+            self.write_snapshot()
+        return {
+            "seq": batch["seq"],
+            "files": len(batch["ranges"]),
+            "rows": rows,
+            "rejected": lines - rows,
+            "days": days,
+            "wall_s": time.perf_counter() - start,
+        }
+
+    def write_snapshot(self) -> Path:
+        """Write the live aggregates as Parquet (atomically; readable by `tlt report`)."""
+        with atomic_path(self.snapshot_path) as tmp:
+            write_frame(self.aggregates.frame(), tmp, self.write_options)
+        return self.snapshot_path
+
+    def run(
+        self,
+        interval: float = 5.0,
+        once: bool = False,
+        on_batch: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        """
+        Poll every `interval` seconds until interrupted. With `once`, drain what is
+        there now (possibly several batches) and return.
+        """
+        while True:
+            result = self.poll()
+            if result is not None:
+                if on_batch is not None:
+                    on_batch(result)
+                continue  # more may be queued beyond max_batch_bytes
+            if once:
+                return
+            time.sleep(interval)